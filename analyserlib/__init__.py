@@ -7,6 +7,12 @@ OVH) and produce scenario YAML files for the generator:
   export scenario-vm-distribution.yml.
 - usageanalyzer: cluster VMs by usage (avg/p95), compute arrival/departure/
   periodicity rates, and export scenario-vm-usage.yml.
+- tracereader: read csv traces chunk per chunk, for the *_from_chunks functions
+  of both analyzers, which aggregate traces larger than memory incrementally.
+- tracecache: convert a trace once into a columnar cache of compact types
+  (categorical ids, int32 timestamps, float32 usages), memory mapped on load.
+- synthetictrace: build deterministic Azure 2017-like vmtable and cpu readings
+  (DataFrames or csv files) of any size, for tests and benchmarks.
 
 Typical use: load a trace CSV into a pandas DataFrame, call the build_* and
 convert_* functions, then pass the generated YAML files to the generator.
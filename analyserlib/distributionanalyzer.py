@@ -17,6 +17,11 @@ def build_cpu_and_mem_distribution_dataframes(trace_df : pd.DataFrame,
     and records the frequency of each (col_flavor_cpu, col_flavor_mem) value. Returns
     two DataFrames with columns per flavor and a 'timestamp' column.
 
+    Windows are swept in a single pass: each VM is converted to the index of the first
+    window it is alive in (created <= timestamp+timestamp_step) and of the first window
+    after its deletion (deleted < timestamp); per-flavor cumulative sums of these events
+    give alive counts of all windows, without filtering the trace once per window.
+
     Parameters
     ----------
     trace_df : pd.DataFrame
@@ -37,26 +42,69 @@ def build_cpu_and_mem_distribution_dataframes(trace_df : pd.DataFrame,
     mem_df : pd.DataFrame
         Same structure for memory flavors.
     """
-    if timestamp_begin is None: timestamp_begin = trace_df[col_vm_created].min()
-    if timestamp_end is None: timestamp_end = trace_df[col_vm_created].max()
+    return build_cpu_and_mem_distribution_dataframes_from_chunks([trace_df],
+                            col_flavor_cpu=col_flavor_cpu, col_flavor_mem=col_flavor_mem,
+                            col_vm_created=col_vm_created, col_vm_deleted=col_vm_deleted,
+                            timestamp_begin=timestamp_begin, timestamp_end=timestamp_end, timestamp_step=timestamp_step)
+
+def build_cpu_and_mem_distribution_dataframes_from_chunks(trace_chunks,
+                            col_flavor_cpu : str = 'vmcorecount', col_flavor_mem : str = 'vmmemory',
+                            col_vm_created : str = 'vmcreated', col_vm_deleted : str = 'vmdeleted',
+                            timestamp_begin : int = None, timestamp_end : int = None, timestamp_step : int = 3600 ):
+    """Build per-timestamp CPU and memory flavor frequency DataFrames from a VM trace read chunk per chunk.
 
-    keys_core, core_values_per_key = __init_values_per_key(trace_df, col_flavor_cpu)
-    keys_mem, mem_values_per_key = __init_values_per_key(trace_df, col_flavor_mem)
+    Same result as build_cpu_and_mem_distribution_dataframes on the concatenated chunks. Each
+    chunk is reduced to VM counts per (flavor, creation timestamp) and per (flavor, deletion
+    timestamp), so that memory is bounded by the chunk size and the number of distinct
+    timestamps, not by the number of VMs.
 
-    considered_timestamps = list()
-    for timestamp in range(timestamp_begin, timestamp_end, timestamp_step):
-    
-        # Dataset containing all VM alive in current range (deleted after min, created before max)
-        filtered_by_aliveness = trace_df.loc[(trace_df[col_vm_deleted] >= (timestamp)) & (trace_df[col_vm_created] <= (timestamp+timestamp_step) )]
+    Parameters
+    ----------
+    trace_chunks : iterable
+        DataFrame chunks of the VM trace (see tracereader.read_csv_chunks).
+    col_flavor_cpu, col_flavor_mem, col_vm_created, col_vm_deleted : str
+        Column names (see build_cpu_and_mem_distribution_dataframes).
+    timestamp_begin, timestamp_end, timestamp_step : int, optional
+        Time range and step (see build_cpu_and_mem_distribution_dataframes).
 
-        __add_to_result_dict_observed_freq(alive_df=filtered_by_aliveness, metric=col_flavor_cpu, metric_keys=keys_core, result_dict=core_values_per_key)
-        __add_to_result_dict_observed_freq(alive_df=filtered_by_aliveness, metric=col_flavor_mem, metric_keys=keys_mem, result_dict=mem_values_per_key)
-        considered_timestamps.append(timestamp)
+    Returns
+    -------
+    cpu_df : pd.DataFrame
+        Rows = timestamps; columns = flavor values (freq) + 'timestamp'.
+    mem_df : pd.DataFrame
+        Same structure for memory flavors.
+    """
+    metrics = [col_flavor_cpu, col_flavor_mem]
+    keys_per_metric = {metric : list() for metric in metrics}
+    created_counts_per_metric = {metric : None for metric in metrics}
+    deleted_counts_per_metric = {metric : None for metric in metrics}
+    created_min, created_max = None, None
+    for chunk in trace_chunks:
+        if len(chunk) == 0: continue
+        created_min = chunk[col_vm_created].min() if created_min is None else min(created_min, chunk[col_vm_created].min())
+        created_max = chunk[col_vm_created].max() if created_max is None else max(created_max, chunk[col_vm_created].max())
+        for metric in metrics:
+            keys_per_metric[metric].append(chunk[metric].unique())
+            created_counts, deleted_counts = __count_lifecycle_events(chunk, metric=metric,
+                col_vm_created=col_vm_created, col_vm_deleted=col_vm_deleted, timestamp_step=timestamp_step)
+            created_counts_per_metric[metric] = __add_counts(created_counts_per_metric[metric], created_counts)
+            deleted_counts_per_metric[metric] = __add_counts(deleted_counts_per_metric[metric], deleted_counts)
+
+    if timestamp_begin is None: timestamp_begin = created_min
+    if timestamp_end is None: timestamp_end = created_max
+    considered_timestamps = list(range(timestamp_begin, timestamp_end, timestamp_step))
 
-    core_values_per_key['timestamp'] = considered_timestamps
-    mem_values_per_key['timestamp'] = considered_timestamps
+    values_per_metric = list()
+    for metric in metrics:
+        observed_df = pd.DataFrame({metric : np.concatenate(keys_per_metric[metric]) if keys_per_metric[metric] else []})
+        keys, values_per_key = __init_values_per_key(observed_df, metric)
+        __add_observed_freq_per_window(created_counts=created_counts_per_metric[metric], deleted_counts=deleted_counts_per_metric[metric],
+            metric_keys=keys, result_dict=values_per_key,
+            timestamp_begin=timestamp_begin, timestamp_step=timestamp_step, number_of_window=len(considered_timestamps))
+        values_per_key['timestamp'] = considered_timestamps
+        values_per_metric.append(values_per_key)
     
-    return pd.DataFrame(core_values_per_key), pd.DataFrame(mem_values_per_key)
+    return pd.DataFrame(values_per_metric[0]), pd.DataFrame(values_per_metric[1])
     
     
 def get_cpu_and_mem_average_distribution(trace_df : pd.DataFrame,
@@ -84,7 +132,37 @@ def get_cpu_and_mem_average_distribution(trace_df : pd.DataFrame,
     mem_distribution : pd.DataFrame
         Columns col_flavor_mem, 'freq'.
     """
-    cpu_timestamped_df, mem_timestamped_df = build_cpu_and_mem_distribution_dataframes(trace_df=trace_df,
+    return get_cpu_and_mem_average_distribution_from_chunks([trace_df],
+                            col_flavor_cpu=col_flavor_cpu, col_flavor_mem=col_flavor_mem,
+                            col_vm_created=col_vm_created, col_vm_deleted=col_vm_deleted,
+                            timestamp_begin=timestamp_begin, timestamp_end=timestamp_end, timestamp_step=timestamp_step)
+
+def get_cpu_and_mem_average_distribution_from_chunks(trace_chunks,
+                            col_flavor_cpu : str = 'vmcorecount', col_flavor_mem : str = 'vmmemory',
+                            col_vm_created : str = 'vmcreated', col_vm_deleted : str = 'vmdeleted',
+                            timestamp_begin : int = None, timestamp_end : int = None, timestamp_step : int = 3600 ):
+    """Compute average CPU and memory flavor distributions of a VM trace read chunk per chunk.
+
+    Same result as get_cpu_and_mem_average_distribution on the concatenated chunks
+    (see build_cpu_and_mem_distribution_dataframes_from_chunks).
+
+    Parameters
+    ----------
+    trace_chunks : iterable
+        DataFrame chunks of the VM trace (see tracereader.read_csv_chunks).
+    col_flavor_cpu, col_flavor_mem, col_vm_created, col_vm_deleted : str
+        Column names (see build_cpu_and_mem_distribution_dataframes).
+    timestamp_begin, timestamp_end, timestamp_step : int, optional
+        Time range and step (see build_cpu_and_mem_distribution_dataframes).
+
+    Returns
+    -------
+    cpu_distribution : pd.DataFrame
+        Columns col_flavor_cpu, 'freq' (flavors with freq > 0.01).
+    mem_distribution : pd.DataFrame
+        Columns col_flavor_mem, 'freq'.
+    """
+    cpu_timestamped_df, mem_timestamped_df = build_cpu_and_mem_distribution_dataframes_from_chunks(trace_chunks,
                                         col_flavor_cpu=col_flavor_cpu, col_flavor_mem=col_flavor_mem,
                                         col_vm_created=col_vm_created, col_vm_deleted=col_vm_deleted,
                                         timestamp_begin=timestamp_begin, timestamp_end=timestamp_end, timestamp_step=timestamp_step)
@@ -113,18 +191,39 @@ def __init_values_per_key(trace_df : pd.DataFrame, column_name : str):
     for key in keys: values_per_keys[str(key)] = list()
     return keys, values_per_keys
 
-def __add_to_result_dict_observed_freq(alive_df : pd.DataFrame, metric : str, metric_keys : list, result_dict : dict):
-    """Append one observation: for each metric_keys, append its frequency in alive_df to result_dict[key]."""
-    distribution_df = pd.DataFrame(alive_df.groupby(metric).size().rename('count')).reset_index()
-    total = distribution_df['count'].sum()
-    distribution_df['freq'] = round((distribution_df['count']/total),2)
-
-    observed_metric = list(distribution_df[metric] )
-    for key in metric_keys:
-        if key not in observed_metric:
-            result_dict[str(key)].append(0)
-        else:
-            result_dict[str(key)].append(float(distribution_df.loc[distribution_df[metric] == key]['freq'].iloc[0]))
+def __count_lifecycle_events(trace_df : pd.DataFrame, metric : str, col_vm_created : str, col_vm_deleted : str, timestamp_step : int):
+    """Return VM counts per (metric, created) and per (metric, deleted) of VMs that can be alive in a window.
+
+    VMs deleted more than a step before their creation are never alive (deleted >= t and
+    created <= t + step cannot both hold); for all others, the windows of (created, deleted)
+    are those created before minus those deleted before, so counts can be summed over chunks.
+    """
+    lifecycle_df = trace_df[[metric, col_vm_created, col_vm_deleted]].dropna()
+    lifecycle_df = lifecycle_df.loc[lifecycle_df[col_vm_deleted] >= lifecycle_df[col_vm_created] - timestamp_step]
+    return lifecycle_df.groupby([metric, col_vm_created], sort=False).size(), lifecycle_df.groupby([metric, col_vm_deleted], sort=False).size()
+
+def __add_counts(counts : pd.Series, other_counts : pd.Series):
+    """Return the sum of two count Series (counts may be None)."""
+    if counts is None: return other_counts
+    return counts.add(other_counts, fill_value=0)
+
+def __add_observed_freq_per_window(created_counts : pd.Series, deleted_counts : pd.Series, metric_keys : list, result_dict : dict,
+                                    timestamp_begin : int, timestamp_step : int, number_of_window : int):
+    """Set result_dict[key] to the frequency of each metric_keys among VMs alive in each window (rounded to 2 decimals, 0 if absent)."""
+    # A VM is alive in window i (deleted >= t_i and created <= t_i + step) from window first_alive (included) to first_gone (excluded)
+    events = np.zeros(len(metric_keys)*(number_of_window+1))
+    for counts, sign, first_window in [(created_counts, 1, lambda created : -np.floor_divide(timestamp_begin + timestamp_step - created, timestamp_step)),
+                                        (deleted_counts, -1, lambda deleted : np.floor_divide(deleted - timestamp_begin, timestamp_step) + 1)]:
+        if counts is None or len(counts) == 0: continue
+        codes = pd.Index(metric_keys).get_indexer(counts.index.get_level_values(0))
+        windows = np.clip(first_window(counts.index.get_level_values(1).to_numpy()), 0, number_of_window).astype(np.int64)
+        events += sign*np.bincount(codes*(number_of_window+1) + windows, weights=counts.to_numpy(), minlength=len(events))
+    alive_counts = np.cumsum(events.reshape(len(metric_keys), number_of_window+1), axis=1)[:, :number_of_window]
+    total = alive_counts.sum(axis=0)
+    frequencies = np.round(np.divide(alive_counts, total, out=np.zeros(alive_counts.shape), where=total > 0), 2)
+    for index, key in enumerate(metric_keys):
+        # int zeros for never observed keys, as a per-window append of 0 gave
+        result_dict[str(key)] = frequencies[index].tolist() if alive_counts[index].any() else [0]*number_of_window
         
 
 def convert_distribution_to_scenario(cpu_distribution : pd.DataFrame,  mem_distribution : pd.DataFrame,
@@ -0,0 +1,204 @@
+"""Generate deterministic synthetic traces shaped like the Azure 2017 public dataset.
+
+The real vmtable and vm_cpu_readings dumps are too large (and not reachable from
+every machine) for tests and benchmarks. build_synthetic_vmtable draws a VM table
+with the vmtable columns (hashed ids, lifecycle, cpu statistics, category, flavor);
+generate_synthetic_cpu_readings streams cpu readings of its VMs (5 minutes steps,
+some VMs following a daily pattern) as DataFrame chunks, so that billions of
+readings can be produced with a bounded memory. write_synthetic_trace writes both
+as header-less csv files, like the dumps. A given seed always gives the same trace,
+whatever the chunk size.
+"""
+import base64, os
+import pandas as pd
+import numpy as np
+from analyserlib.tracereader import azure2017_vmtable_columns as vmtable_columns, azure2017_cpu_readings_columns as cpu_readings_columns
+
+flavors = [(1, 0.75), (1, 1.75), (2, 3.5), (2, 4), (4, 7), (4, 8), (8, 14), (8, 32), (24, 64), (30, 70)] # (vmcorecount, vmmemory)
+flavors_freq = [0.05, 0.25, 0.25, 0.10, 0.15, 0.05, 0.08, 0.03, 0.03, 0.01]
+categories = ['Delay-insensitive', 'Interactive', 'Unknown']
+categories_freq = [0.35, 0.15, 0.50]
+
+def build_synthetic_vmtable(number_of_vm : int, seed : int = 0, duration : int = 30*86400,
+                            initial_ratio : float = 0.3, periodic_ratio : float = 0.3, invalid_lifetime_ratio : float = 0.0):
+    """Build a vmtable-like DataFrame (Azure 2017 columns plus a 'periodic' ground truth column).
+
+    A share of VMs (initial_ratio) exists since the trace begin (vmcreated is 0), others are created
+    uniformly over the trace. Lifetimes are log-normal (hours to weeks), VMs alive at the end
+    are deleted at duration. A share of VMs (invalid_lifetime_ratio) gets a deletion timestamp
+    prior to its creation, as found in some real dumps.
+
+    Parameters
+    ----------
+    number_of_vm : int
+        Number of VMs (rows).
+    seed : int
+        Seed of the random generator.
+    duration : int
+        Trace duration in seconds (30 days by default, as Azure 2017).
+    initial_ratio : float
+        Share of VMs existing since trace begin.
+    periodic_ratio : float
+        Share of VMs whose cpu readings follow a daily pattern (see generate_synthetic_cpu_readings).
+    invalid_lifetime_ratio : float
+        Share of VMs with vmdeleted < vmcreated.
+
+    Returns
+    -------
+    vmtable_df : pd.DataFrame
+        One row per VM with vmtable_columns and 'periodic' (bool).
+    """
+    rng = np.random.default_rng(seed)
+    vmid = __draw_ids(rng, number_of_vm)
+    subscriptions = __draw_ids(rng, max(1, number_of_vm // 50))
+    deployments = __draw_ids(rng, max(1, number_of_vm // 5))
+
+    created = np.where(rng.random(number_of_vm) < initial_ratio, 0, rng.integers(0, duration, number_of_vm))
+    lifetime = np.exp(rng.normal(np.log(6*3600), 2.0, number_of_vm)).astype(np.int64) + 300
+    deleted = np.minimum(created + lifetime, duration)
+    invalid = (rng.random(number_of_vm) < invalid_lifetime_ratio) & (created > 0)
+    deleted[invalid] = np.maximum(created[invalid] - rng.integers(300, 86400, np.count_nonzero(invalid)), 0)
+
+    avgcpu = np.round(100*rng.beta(0.8, 4.0, number_of_vm), 4)
+    p95maxcpu = np.round(np.minimum(100, avgcpu + 100*rng.beta(1.0, 3.0, number_of_vm)), 4)
+    maxcpu = np.round(np.minimum(100, p95maxcpu + 100*rng.beta(1.0, 8.0, number_of_vm)), 4)
+    flavor_index = rng.choice(len(flavors), size=number_of_vm, p=flavors_freq)
+    category_index = rng.choice(len(categories), size=number_of_vm, p=categories_freq)
+
+    return pd.DataFrame({
+        'vmid' : vmid,
+        'subscriptionid' : subscriptions[rng.integers(0, len(subscriptions), number_of_vm)],
+        'deploymentid' : deployments[rng.integers(0, len(deployments), number_of_vm)],
+        'vmcreated' : created,
+        'vmdeleted' : deleted,
+        'maxcpu' : maxcpu,
+        'avgcpu' : avgcpu,
+        'p95maxcpu' : p95maxcpu,
+        'vmcategory' : np.array(categories, dtype=object)[category_index],
+        'vmcorecount' : np.array([flavor[0] for flavor in flavors])[flavor_index],
+        'vmmemory' : np.array([flavor[1] for flavor in flavors])[flavor_index],
+        'periodic' : rng.random(number_of_vm) < periodic_ratio})
+
+def __draw_ids(rng : np.random.Generator, count : int):
+    """Return count random ids shaped like Azure hashed ids (44 base64 characters), as an object array."""
+    encoded = base64.b64encode(rng.bytes(33*count)) # 33 bytes give 44 characters, without padding
+    return np.frombuffer(encoded, dtype='S44').astype(str).astype(object)
+
+def generate_synthetic_cpu_readings(vmtable_df : pd.DataFrame, seed : int = 0, timestamp_step : int = 300,
+                            timestamp_begin : int = 0, timestamp_end : int = None, chunk_size : int = 1000000,
+                            col_vm_id : str = 'vmid', col_vm_created : str = 'vmcreated', col_vm_deleted : str = 'vmdeleted',
+                            col_cpu_avg : str = 'avgcpu', col_periodic : str = 'periodic'):
+    """Generate cpu readings of the VMs of a vmtable, by increasing timestamp, as DataFrame chunks.
+
+    Each VM alive at a timestamp (created before, deleted after) gets one reading. Its average
+    cpu is drawn around the VM avgcpu; periodic VMs add a daily sine of random phase and amplitude.
+    Chunks hold whole timestamps and about chunk_size readings (more if more VMs are alive at a
+    single timestamp). Readings only depend on seed, not on chunk_size.
+
+    Parameters
+    ----------
+    vmtable_df : pd.DataFrame
+        VM table (see build_synthetic_vmtable), possibly a subset of it.
+    seed : int
+        Seed of the random generators.
+    timestamp_step : int
+        Seconds between two readings of a VM (300 as Azure 2017).
+    timestamp_begin, timestamp_end : int
+        Time range of readings; timestamp_end defaults to max of col_vm_deleted.
+    chunk_size : int
+        Approximate number of readings per chunk.
+    col_vm_id, col_vm_created, col_vm_deleted, col_cpu_avg, col_periodic : str
+        Column names in vmtable_df.
+
+    Returns
+    -------
+    chunks : generator
+        DataFrames with cpu_readings_columns.
+    """
+    if len(vmtable_df) == 0: return
+    if timestamp_end is None: timestamp_end = int(vmtable_df[col_vm_deleted].max())
+    vm_rng = np.random.default_rng([seed, 0])
+    vmid = vmtable_df[col_vm_id].to_numpy()
+    created = vmtable_df[col_vm_created].to_numpy()
+    deleted = vmtable_df[col_vm_deleted].to_numpy()
+    base = vmtable_df[col_cpu_avg].to_numpy(dtype=np.float64)
+    amplitude = np.where(vmtable_df[col_periodic].to_numpy(), vm_rng.uniform(10, 40, len(vmtable_df)), 0)
+    phase = vm_rng.uniform(0, 2*np.pi, len(vmtable_df))
+
+    columns, buffered = list(), 0
+    for step, timestamp in enumerate(range(timestamp_begin, timestamp_end, timestamp_step)):
+        alive = np.flatnonzero((created <= timestamp) & (deleted > timestamp))
+        if len(alive) == 0: continue
+        rng = np.random.default_rng([seed, 1, step])
+        cpu_avg = base[alive] + amplitude[alive]*np.sin(2*np.pi*timestamp/86400 + phase[alive]) + rng.normal(0, 3, len(alive))
+        cpu_avg = np.clip(cpu_avg, 0, 100)
+        columns.append((np.full(len(alive), timestamp, dtype=np.int64), alive,
+            np.clip(cpu_avg - np.abs(rng.normal(0, 5, len(alive))), 0, 100),
+            np.clip(cpu_avg + np.abs(rng.normal(0, 10, len(alive))), 0, 100),
+            cpu_avg))
+        buffered += len(alive)
+        if buffered >= chunk_size:
+            yield __build_readings_chunk(columns, vmid)
+            columns, buffered = list(), 0
+    if columns:
+        yield __build_readings_chunk(columns, vmid)
+
+def __build_readings_chunk(columns : list, vmid : np.ndarray):
+    """Return a readings DataFrame from per-timestamp (timestamp, VM index, cpu_min, cpu_max, cpu_avg) arrays."""
+    timestamp, alive, cpu_min, cpu_max, cpu_avg = [np.concatenate(column) for column in zip(*columns)]
+    return pd.DataFrame({'timestamp' : timestamp, 'vmid' : vmid[alive],
+        'cpu_min' : np.round(cpu_min, 4), 'cpu_max' : np.round(cpu_max, 4), 'cpu_avg' : np.round(cpu_avg, 4)})
+
+def write_synthetic_trace(output_folder : str, number_of_vm : int, seed : int = 0, readings_vm_count : int = None,
+                            readings_per_file : int = 10000000, chunk_size : int = 1000000, **kwargs):
+    """Write a synthetic trace as header-less csv files named like the Azure 2017 dumps.
+
+    vmtable.csv holds all VMs (without the 'periodic' column), vm_cpu_readings-file-{i}-of-{n}.csv
+    the readings of the first readings_vm_count VMs (all if None), split in files of about
+    readings_per_file rows, written chunk per chunk.
+
+    Parameters
+    ----------
+    output_folder : str
+        Folder (created if needed).
+    number_of_vm : int
+        Number of VMs of the vmtable.
+    seed : int
+        Seed of the random generators.
+    readings_vm_count : int, optional
+        Number of VMs with cpu readings.
+    readings_per_file : int
+        Approximate number of readings per file.
+    chunk_size : int
+        Approximate number of readings generated at once.
+    kwargs : dict
+        Other build_synthetic_vmtable arguments (duration, initial_ratio, periodic_ratio, invalid_lifetime_ratio).
+
+    Returns
+    -------
+    vmtable_path : str
+        vmtable file location.
+    readings_paths : list
+        cpu readings file locations.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    vmtable_df = build_synthetic_vmtable(number_of_vm, seed=seed, **kwargs)
+    vmtable_path = os.path.join(output_folder, 'vmtable.csv')
+    vmtable_df[vmtable_columns].to_csv(vmtable_path, header=False, index=False)
+
+    readings_vm_df = vmtable_df if readings_vm_count is None else vmtable_df.iloc[:readings_vm_count]
+    temporary_paths, current, current_rows = list(), None, 0
+    for chunk in generate_synthetic_cpu_readings(readings_vm_df, seed=seed, chunk_size=chunk_size):
+        if (current is None) or (current_rows >= readings_per_file):
+            if current is not None: current.close()
+            temporary_paths.append(os.path.join(output_folder, 'vm_cpu_readings-file-' + str(len(temporary_paths)+1) + '.part'))
+            current, current_rows = open(temporary_paths[-1], 'w'), 0
+        chunk.to_csv(current, header=False, index=False)
+        current_rows += len(chunk)
+    if current is not None: current.close()
+
+    readings_paths = list()
+    for index, temporary_path in enumerate(temporary_paths):
+        readings_paths.append(os.path.join(output_folder, 'vm_cpu_readings-file-' + str(index+1) + '-of-' + str(len(temporary_paths)) + '.csv'))
+        os.replace(temporary_path, readings_paths[-1])
+    return vmtable_path, readings_paths
@@ -0,0 +1,168 @@
+"""Convert a trace once into an on-disk columnar cache, then memory map it in later analyses.
+
+Parsing multi-GB csv traces takes minutes and default pandas types (object strings,
+int64/float64) take several times the memory the data needs. build_trace_cache reads a
+trace chunk per chunk (see tracereader.read_csv_chunks) and stores each column of a known
+schema as a .npy file of a compact type: ids as int32 codes of a categories file, timestamps
+as int32, CPU usages as float32 and core counts as uint8. load_trace_cache memory maps the
+columns into a DataFrame without copying them, so that reloading is near-instant and pages
+are only read from disk when accessed.
+"""
+import json, os, shutil
+import pandas as pd
+import numpy as np
+from analyserlib.tracereader import read_csv_chunks, azure2017_vmtable_columns, azure2017_cpu_readings_columns
+
+cache_format = "cloudfactory-trace-cache"
+
+trace_schemas = {
+    "azure2017-vmtable" : dict(zip(azure2017_vmtable_columns,
+        ['category', 'category', 'category', 'int32', 'int32', 'float32', 'float32', 'float32', 'category', 'uint8', 'float32'])),
+    "azure2017-cpu-readings" : dict(zip(azure2017_cpu_readings_columns,
+        ['int32', 'category', 'float32', 'float32', 'float32'])),
+    # One row per VM session, as built from Chameleon instance events (see build_chameleon_distribution.ipynb)
+    "chameleon-vm" : {'instance' : 'category', 'cpu' : 'uint8', 'mem' : 'float32', 'disk' : 'float32', 'start' : 'int32', 'stop' : 'int32'},
+}
+
+def build_trace_cache(sources, folder : str, schema, chunk_size : int = 1000000, **kwargs):
+    """Convert a trace into a columnar cache folder, chunk per chunk.
+
+    Each column of the schema is written as {column}.npy with its schema type. Category columns
+    are written as int32 codes ({column}.npy, -1 for missing values) and their values as
+    {column}-categories.npy (utf-8 strings, by order of first appearance). trace.json holds
+    the schema and the row count.
+
+    Parameters
+    ----------
+    sources : str, pd.DataFrame or iterable
+        Header-less csv file locations (columns in schema order) or DataFrames (see tracereader.read_csv_chunks).
+    folder : str
+        Cache folder location (created if needed).
+    schema : str or dict
+        Name of a trace_schemas entry, or a dict of column name to type
+        ('category' or a numpy numeric type name).
+    chunk_size : int
+        Maximum number of csv rows parsed at once.
+    kwargs : dict
+        Other pd.read_csv arguments (delimiter, compression, ...).
+
+    Raises
+    ------
+    ValueError
+        If schema is unknown, or a value does not fit its column type (missing value in a numeric
+        column, or out of range of an integer type)
+
+    Returns
+    -------
+    count : int
+        Number of rows cached.
+    """
+    schema_name, columns_types = __get_schema(schema)
+    os.makedirs(folder, exist_ok=True)
+    count = 0
+    categories_per_column = {column : dict() for column, column_type in columns_types.items() if column_type == 'category'}
+    # ids are kept as strings, even when they look like numbers
+    dtype = dict({column : str for column in categories_per_column}, **kwargs.pop("dtype", dict()))
+    part_files = {column : open(os.path.join(folder, column + ".npy.part"), 'wb') for column in columns_types}
+    try:
+        for chunk in read_csv_chunks(sources, names=list(columns_types.keys()), chunk_size=chunk_size, dtype=dtype, **kwargs):
+            for column, column_type in columns_types.items():
+                if column_type == 'category':
+                    values = __encode_categories(chunk[column], categories_per_column[column])
+                else:
+                    values = __convert_numeric(chunk[column], column, np.dtype(column_type))
+                part_files[column].write(values.tobytes())
+            count += len(chunk)
+    except:
+        for column, part_file in part_files.items():
+            part_file.close()
+            os.remove(os.path.join(folder, column + ".npy.part"))
+        raise
+    for part_file in part_files.values(): part_file.close()
+
+    for column, column_type in columns_types.items():
+        dtype = np.dtype('int32') if column_type == 'category' else np.dtype(column_type)
+        with open(os.path.join(folder, column + ".npy"), 'wb') as f:
+            np.lib.format.write_array_header_1_0(f, {'descr' : np.lib.format.dtype_to_descr(dtype), 'fortran_order' : False, 'shape' : (count,)})
+            with open(os.path.join(folder, column + ".npy.part"), 'rb') as part_file:
+                shutil.copyfileobj(part_file, f)
+        os.remove(os.path.join(folder, column + ".npy.part"))
+    for column, categories in categories_per_column.items():
+        np.save(os.path.join(folder, column + "-categories.npy"), np.array([str(value).encode() for value in categories], dtype=bytes))
+    with open(os.path.join(folder, "trace.json"), 'w') as f:
+        json.dump({"format" : cache_format, "schema" : schema_name, "columns" : columns_types, "count" : count}, f)
+    return count
+
+def load_trace_cache(folder : str, columns : list = None, mmap_mode : str = 'c'):
+    """Load a trace cache as a DataFrame whose columns are memory mapped (not copied in memory).
+
+    Parameters
+    ----------
+    folder : str
+        Cache folder location (see build_trace_cache).
+    columns : list, optional
+        Columns to load (all by default).
+    mmap_mode : str
+        np.load memory map mode (copy-on-write by default: the DataFrame may be modified, files are not).
+
+    Raises
+    ------
+    ValueError
+        If folder does not hold a trace cache, or a requested column is not cached
+
+    Returns
+    -------
+    trace_df : pd.DataFrame
+        Cached columns, category columns as pd.Categorical.
+    """
+    with open(os.path.join(folder, "trace.json"), 'r') as f:
+        metadata = json.load(f)
+    if metadata.get("format") != cache_format: raise ValueError("Not a trace cache folder", folder)
+    columns_types = metadata["columns"]
+    if columns is None: columns = list(columns_types.keys())
+    values_per_column = dict()
+    for column in columns:
+        if column not in columns_types: raise ValueError("Column not cached", column, "cached ones :", list(columns_types.keys()))
+        values = np.load(os.path.join(folder, column + ".npy"), mmap_mode=mmap_mode)
+        if len(values) != metadata["count"]: raise ValueError("Cached column does not match row count", column)
+        if columns_types[column] == 'category':
+            categories = np.load(os.path.join(folder, column + "-categories.npy"))
+            values = pd.Categorical.from_codes(values, categories=pd.Index(np.char.decode(categories)), validate=False)
+        values_per_column[column] = values
+    return pd.DataFrame(values_per_column, copy=False)
+
+def get_trace_cache_schema(folder : str):
+    """Return schema name and column types of a trace cache (without loading it).
+
+    Returns
+    -------
+    schema : str
+        Schema name (None for a custom schema).
+    columns : dict
+        Column name to type.
+    """
+    with open(os.path.join(folder, "trace.json"), 'r') as f:
+        metadata = json.load(f)
+    if metadata.get("format") != cache_format: raise ValueError("Not a trace cache folder", folder)
+    return metadata["schema"], metadata["columns"]
+
+def __get_schema(schema):
+    """Return (schema name or None, column types) of a schema name or dict."""
+    if isinstance(schema, dict): return None, schema
+    if schema not in trace_schemas: raise ValueError("Unknown trace schema", schema, "expected ones :", list(trace_schemas.keys()))
+    return schema, trace_schemas[schema]
+
+def __encode_categories(values : pd.Series, categories : dict):
+    """Return int32 codes of values in categories (value to code, extended with new values; -1 for missing values)."""
+    codes, uniques = pd.factorize(values)
+    mapping = np.array([categories.setdefault(value, len(categories)) for value in uniques] + [-1], dtype=np.int32)
+    return mapping[codes] # code -1 (missing value) takes the last mapping entry
+
+def __convert_numeric(values : pd.Series, column : str, dtype : np.dtype):
+    """Return values as an array of dtype, checking that no value is lost."""
+    if values.isna().any(): raise ValueError("Missing value in column", column, "of type", str(dtype))
+    if dtype.kind in 'iu' and len(values) > 0:
+        if values.dtype.kind == 'f' and (values % 1 != 0).any(): raise ValueError("Non integer value in column", column, "of type", str(dtype))
+        limits = np.iinfo(dtype)
+        if values.min() < limits.min or values.max() > limits.max: raise ValueError("Value out of", str(dtype), "range in column", column)
+    return values.to_numpy().astype(dtype)
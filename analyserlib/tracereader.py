@@ -0,0 +1,48 @@
+"""Read trace datasets chunk per chunk, to analyse traces larger than memory.
+
+The *_from_chunks functions of distributionanalyzer and usageanalyzer take an
+iterable of DataFrame chunks and aggregate them incrementally. read_csv_chunks
+builds such an iterable from csv files (such as the ten vm_cpu_readings files of
+Azure 2017), reading one chunk at a time, so that peak memory is bounded by the
+chunk size instead of the trace size.
+"""
+import os
+import pandas as pd
+
+azure2017_vmtable_columns = ['vmid', 'subscriptionid', 'deploymentid', 'vmcreated', 'vmdeleted', 'maxcpu', 'avgcpu', 'p95maxcpu', 'vmcategory', 'vmcorecount', 'vmmemory']
+azure2017_cpu_readings_columns = ['timestamp', 'vmid', 'cpu_min', 'cpu_max', 'cpu_avg']
+
+def read_csv_chunks(sources, names : list = None, chunk_size : int = 1000000, usecols : list = None, dtype : dict = None, **kwargs):
+    """Iterate over DataFrame chunks of csv files (or of already loaded chunks).
+
+    Parameters
+    ----------
+    sources : str, pd.DataFrame or iterable
+        A csv file location, a DataFrame, or an iterable of them (read in order).
+        DataFrames are yielded as is (restricted to usecols).
+    names : list, optional
+        Column names of header-less files (e.g. azure2017_cpu_readings_columns); None to read the header.
+    chunk_size : int
+        Maximum number of rows per chunk.
+    usecols : list, optional
+        Columns kept (others are not parsed), to reduce memory.
+    dtype : dict, optional
+        Column types, to keep types identical from one chunk to another (a chunk holding only
+        integer memory values would be read as int otherwise).
+    kwargs : dict
+        Other pd.read_csv arguments (delimiter, compression, ...).
+
+    Returns
+    -------
+    chunks : generator
+        DataFrames of at most chunk_size rows.
+    """
+    if isinstance(sources, (str, os.PathLike, pd.DataFrame)): sources = [sources]
+    for source in sources:
+        if isinstance(source, pd.DataFrame):
+            yield source if usecols is None else source[usecols]
+            continue
+        with pd.read_csv(source, header=None if names is not None else 'infer', names=names, index_col=False, usecols=usecols,
+                        dtype=dtype, chunksize=chunk_size, **kwargs) as reader:
+            for chunk in reader:
+                yield chunk
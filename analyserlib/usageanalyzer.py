@@ -4,7 +4,7 @@ Analyses a trace DataFrame (VM metadata and optional CPU time series) to produce
 usage distributions and rates, then convert_usage_to_scenario writes a
 scenario-vm-usage.yml suitable for the generator.
 """
-import yaml, math, time
+import yaml, math, time, heapq
 import pandas as pd
 import numpy as np
 from scipy import signal
@@ -49,6 +49,41 @@ def build_n_scenario(trace_df : pd.DataFrame, n_profile : int,
                     col_cpu_avg=col_cpu_avg, col_cpu_per=col_cpu_per)
     return usage_distribution, trace_df_labeled
 
+def build_n_scenario_from_chunks(trace_chunks, n_profile : int,
+                    col_cpu_avg : str = 'avgcpu', col_cpu_per : str = 'p95maxcpu',
+                    kept_columns : list = ['vmid', 'vmcreated', 'vmdeleted']):
+    """Cluster VMs of a trace read chunk per chunk into n_profile usage profiles (see build_n_scenario).
+
+    Only col_cpu_avg, col_cpu_per and kept_columns (lifecycle columns used by
+    build_arrival_and_departure_rates_per_label and build_periodicity_rate_per_label)
+    of each chunk are kept, other columns (subscription and deployment ids, category...)
+    are dropped as soon as a chunk is read.
+
+    Parameters
+    ----------
+    trace_chunks : iterable
+        DataFrame chunks of the VM trace (see tracereader.read_csv_chunks).
+    n_profile : int
+        Number of usage profiles (clusters).
+    col_cpu_avg, col_cpu_per : str
+        Column names for average and percentile CPU.
+    kept_columns : list
+        Other columns kept in trace_df_labeled (ignored if absent).
+
+    Returns
+    -------
+    usage_distribution : pd.DataFrame
+        Per-label count, freq, bound_avg_lower/higher, bound_per_lower/higher.
+    trace_df_labeled : pd.DataFrame
+        kept_columns, col_cpu_avg, col_cpu_per and 'label' of all VMs.
+    """
+    frames = list()
+    for chunk in trace_chunks:
+        frames.append(chunk[[column for column in kept_columns if column in chunk.columns] + [col_cpu_avg, col_cpu_per]])
+    trace_df = pd.concat(frames, ignore_index=True)
+    del frames
+    return build_n_scenario(trace_df, n_profile, col_cpu_avg=col_cpu_avg, col_cpu_per=col_cpu_per)
+
 def __compute_cpu_bounds_per_label(usage_distribution : pd.DataFrame, trace_df_labeled : pd.DataFrame,
                     col_cpu_avg : str, col_cpu_per : str):
     """Fill usage_distribution with freq and bound_avg_*/bound_per_* from trace_df_labeled. Modifies usage_distribution in place."""
@@ -192,6 +227,80 @@ def build_periodicity_rate_per_label(usage_distribution : pd.DataFrame, label_da
         
     usage_distribution["ratio_periodicity"] = periodicity_ratio_list
 
+def build_periodicity_rate_per_label_from_chunks(usage_distribution : pd.DataFrame, label_dataset : pd.DataFrame, cpu_traces_chunks,
+                                        timestamp_per_hour : int,
+                                        detect_periodicity_on_hour : int = 24,
+                                        lifetime_condition : int = -np.inf,
+                                        max_number_of_tests : int = 500,
+                                        sensibility : int = 1,
+                                        col_vm_created : str = 'vmcreated', col_vm_deleted : str = 'vmdeleted',
+                                        col_vm_id : str = "vmid", col_vm_cpu : str = "cpu_avg"):
+    """Detect periodicity in CPU traces read chunk per chunk, per label; add ratio_periodicity to usage_distribution.
+
+    Same result as build_periodicity_rate_per_label on the concatenated chunks, in a single
+    pass over cpu_traces_chunks (which may be an iterator). Per label, only readings of the
+    tested VMs are kept: the first max_number_of_tests VMs of label_dataset order matching
+    lifetime_condition among those seen in the traces so far. A VM replaced by a former one
+    can never be tested again, so its readings are dropped. Memory is bounded by the chunk
+    size and the readings of max_number_of_tests VMs per label. Modifies usage_distribution in place.
+
+    Parameters
+    ----------
+    usage_distribution : pd.DataFrame
+        Must have 'label'; will get ratio_periodicity.
+    label_dataset : pd.DataFrame
+        VM metadata with label, col_vm_created, col_vm_deleted, col_vm_id.
+    cpu_traces_chunks : iterable
+        DataFrame chunks of col_vm_id and col_vm_cpu time-series (see tracereader.read_csv_chunks).
+    timestamp_per_hour, detect_periodicity_on_hour, lifetime_condition, max_number_of_tests, sensibility : int
+        See build_periodicity_rate_per_label.
+    col_vm_created, col_vm_deleted, col_vm_id, col_vm_cpu : str
+        Column names.
+    """
+    labels = [int(label) for label in usage_distribution["label"]]
+    matching = label_dataset[col_vm_deleted] - label_dataset[col_vm_created] >= lifetime_condition
+    matching_vms_count = label_dataset.loc[matching].groupby("label").size()
+    excluded_vms_count = label_dataset.loc[~matching].groupby("label").size()
+    # Position of each matching VM in label_dataset order, within its label
+    candidates_df = label_dataset.loc[matching, [col_vm_id, "label"]].drop_duplicates(subset=col_vm_id)
+    candidates_df = candidates_df.assign(position=candidates_df.groupby("label").cumcount()).set_index(col_vm_id)
+
+    seen_per_label = defaultdict(set)
+    tested_per_label = defaultdict(list) # heap of (-position, vmid) of currently tested VMs
+    values_per_vm = dict()
+    for chunk in cpu_traces_chunks:
+        readings_df = chunk[[col_vm_id, col_vm_cpu]].join(candidates_df, on=col_vm_id, how="inner")
+        if len(readings_df) == 0: continue
+        for vmid, label, position in readings_df.drop_duplicates(subset=col_vm_id)[[col_vm_id, "label", "position"]].itertuples(index=False):
+            if vmid in seen_per_label[label]: continue
+            seen_per_label[label].add(vmid)
+            tested = tested_per_label[label]
+            if len(tested) < max_number_of_tests:
+                heapq.heappush(tested, (-position, vmid))
+                values_per_vm[vmid] = list()
+            elif position < -tested[0][0]:
+                del values_per_vm[heapq.heapreplace(tested, (-position, vmid))[1]]
+                values_per_vm[vmid] = list()
+        readings_df = readings_df.loc[readings_df[col_vm_id].isin(values_per_vm.keys())]
+        for vmid, values in readings_df.groupby(col_vm_id, sort=False)[col_vm_cpu]:
+            values_per_vm[vmid].append(values.to_numpy())
+
+    periodicity_ratio_list = list()
+    for label in labels:
+        considered_vms_count = len(tested_per_label[label])
+        if len(seen_per_label[label]) > considered_vms_count:
+            print(">Number of VM exceeds max number of test, reducing to", max_number_of_tests, "instead of", len(seen_per_label[label]))
+        if considered_vms_count < 10:
+            print(">Warning : low number of VM matching condition (", considered_vms_count, ")")
+        values_per_tested_vm = {vmid : np.concatenate(values_per_vm[vmid]) for _, vmid in tested_per_label[label]}
+        periodic_r = __compute_periodicity_ratio(values_per_vm=values_per_tested_vm, considered_vms_count=considered_vms_count,
+                                    matching_vms_count=matching_vms_count.get(label, 0), excluded_vms_count=excluded_vms_count.get(label, 0),
+                                    timestamp_per_hour=timestamp_per_hour, detect_periodicity_on_hour=detect_periodicity_on_hour, sensibility=sensibility)
+        periodicity_ratio_list.append(periodic_r)
+        print("Ratio computed for label", label, ":", periodic_r)
+
+    usage_distribution["ratio_periodicity"] = periodicity_ratio_list
+
 def __compute_periodicity_rate_for_given_label(label_dataset : pd.DataFrame, cpu_traces_dataset : pd.DataFrame,
                                          label : int,
                                          timestamp_per_hour : int,
@@ -229,9 +338,16 @@ def __compute_periodicity_rate_for_given_label(label_dataset : pd.DataFrame, cpu
     filtered_cpu_traces_df = cpu_traces_dataset.loc[cpu_traces_dataset[col_vm_id].isin(considered_vms)][[col_vm_id, col_vm_cpu]]
     for index, row in filtered_cpu_traces_df.iterrows():
         filtered_cpu_traces_dict[row[col_vm_id]].append(row[col_vm_cpu])
+    return __compute_periodicity_ratio(values_per_vm=filtered_cpu_traces_dict, considered_vms_count=considered_vms_count,
+                                    matching_vms_count=matching_vms_count, excluded_vms_count=excluded_vms_count,
+                                    timestamp_per_hour=timestamp_per_hour, detect_periodicity_on_hour=detect_periodicity_on_hour, sensibility=sensibility)
+
+def __compute_periodicity_ratio(values_per_vm : dict, considered_vms_count : int, matching_vms_count : int, excluded_vms_count : int,
+                                timestamp_per_hour : int, detect_periodicity_on_hour : int, sensibility : int):
+    """Return the fraction of VMs of a label that exhibit periodicity (0--1), from the cpu values of its tested VMs."""
     # Iterate through vmid to compute periodicity
     considered_vms_periodic_count = 0
-    for vmid, values in filtered_cpu_traces_dict.items():
+    for vmid, values in values_per_vm.items():
         mean_val = np.mean(values)
         bool_res = __is_periodic([val - mean_val for val in values], scope=detect_periodicity_on_hour, timestamp_per_hour=timestamp_per_hour, percentile=(100-sensibility))
         if bool_res: considered_vms_periodic_count+=1
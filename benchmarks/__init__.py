@@ -0,0 +1,11 @@
+"""CloudFactory generator benchmark suite.
+
+Runs the generation pipeline (scenario load, generation, outputs and export)
+over a matrix of fleet sizes and temporalities, using the shipped scenarios,
+and records per-stage throughput and peak memory in a JSON results file. Two
+results files are compared with the diff command, which reports regressions.
+
+Run from the project root: ``python -m benchmarks run`` then
+``python -m benchmarks diff baseline.json current.json`` (see benchmarks/__main__.py).
+Core types: GeneratorBenchmark (runs cases), BenchmarkComparison (diffs results).
+"""
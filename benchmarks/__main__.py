@@ -0,0 +1,160 @@
+"""CloudFactory generator benchmark entry point.
+
+This module is run as ``python -m benchmarks`` from the project root. The run
+command generates each case of a matrix of VM counts and temporalities (see
+GeneratorBenchmark), writes its outputs and export, and records per-stage
+throughput and peak memory in a JSON results file. The analyser command does the
+same for analyserlib scenario building on synthetic traces (see AnalyserBenchmark).
+The diff command compares two results files and exits with status 1 if a metric
+regressed above threshold.
+"""
+import getopt, sys
+from benchmarks.generatorbenchmark import GeneratorBenchmark
+from benchmarks.analyserbenchmark import AnalyserBenchmark
+from benchmarks.benchmarkcomparison import BenchmarkComparison
+
+def print_usage():
+    print("Benchmark the generator over fleet sizes and temporalities, the analyser over synthetic trace sizes, or compare two benchmark runs")
+    print("python3 -m benchmarks run [options]")
+    print("[--sizes={n1,n2,...}]          : VM count objectives. Default :", ",".join([str(size) for size in GeneratorBenchmark.default_sizes]))
+    print("[--temporalities={t1,t2,...}]  : temporality presets among", ",".join(GeneratorBenchmark.temporality_presets.keys()), "(slice,scope,iteration:",
+        ", ".join([name + "=" + ",".join([str(value) for value in values]) for name, values in GeneratorBenchmark.temporality_presets.items()]) + "). Default : all")
+    print("[--outputs={bash/cloudsim/cbtool}] : output formats written for each case, separated by comma (none for no output). Default :", ",".join(GeneratorBenchmark.default_outputs))
+    print("[--export-format={json/jsonl/npy/none}] : export written for each case. Default : npy")
+    print("[--lazy-commands]              : generate workload commands on demand while writing outputs")
+    print("[--max-cells={cells}]          : skip cases whose usage matrix (VM count x slices) is larger. Default :", 2**30)
+    print("[--seed={integer}]             : seed of each case. Default : 1")
+    print("[--no-memory-trace]            : do not trace stage peak memory with tracemalloc (faster, process peak memory is still recorded)")
+    print("[--result={results.json}]      : results file location. Default : benchmark.json")
+    print("python3 -m benchmarks analyser [options]")
+    print("[--sizes={n1,n2,...}]          : VM counts of synthetic vmtables. Default :", ",".join([str(size) for size in AnalyserBenchmark.default_sizes]))
+    print("[--trace-days={integer}]       : duration of synthetic traces. Default : 30")
+    print("[--readings-vm={integer}]      : number of VMs living at least 2 days with cpu readings. Default : 1000")
+    print("[--readings-days={integer}]    : days of cpu readings (5 minutes steps). Default : 7")
+    print("[--profiles={integer}]         : number of usage profiles built. Default : 4")
+    print("[--seed={integer}]             : seed of synthetic traces. Default : 1")
+    print("[--no-memory-trace]            : do not trace stage peak memory with tracemalloc")
+    print("[--result={results.json}]      : results file location. Default : benchmark-analyser.json")
+    print("python3 -m benchmarks diff {baseline.json} {current.json} [--threshold={ratio}]")
+    print("[--threshold={ratio}]          : relative change of time or memory considered as a regression. Default : 0.1")
+    sys.exit(0)
+
+def manage_list_arg(argument : str):
+    """Parse a comma separated list; return it (empty for none)."""
+    if argument == "none": return list()
+    return [value for value in argument.split(',') if value]
+
+def manage_outputs_arg(argument : str):
+    """Parse --outputs (cloudsim being an alias of cloudsimplus); return output format list. Raises ValueError for an invalid format."""
+    outputs = ["cloudsimplus" if output == "cloudsim" else output for output in manage_list_arg(argument)]
+    for output in outputs:
+        if output not in GeneratorBenchmark.default_outputs:
+            print("Invalid output selected", output, "expected ones :", GeneratorBenchmark.default_outputs)
+            raise ValueError("Invalid output argument")
+    return outputs
+
+def run_benchmark(arguments : list):
+    """Parse run options, run the benchmark and write its results."""
+    long_options = ["help", "sizes=", "temporalities=", "outputs=", "export-format=", "lazy-commands", "max-cells=", "seed=", "no-memory-trace", "result="]
+    try:
+        options, values = getopt.getopt(arguments, "h", long_options)
+    except getopt.error as err:
+        print(str(err))
+        print_usage()
+    settings = dict()
+    result_location = "benchmark.json"
+    for current_argument, current_value in options:
+        if current_argument in ('-h', '--help'):
+            print_usage()
+        elif current_argument == '--sizes':
+            settings["sizes"] = [int(value) for value in manage_list_arg(current_value)]
+        elif current_argument == '--temporalities':
+            settings["temporalities"] = manage_list_arg(current_value)
+        elif current_argument == '--outputs':
+            settings["outputs"] = manage_outputs_arg(current_value)
+        elif current_argument == '--export-format':
+            settings["export_format"] = None if current_value == "none" else current_value
+        elif current_argument == '--lazy-commands':
+            settings["lazy_commands"] = True
+        elif current_argument == '--max-cells':
+            settings["max_cells"] = int(current_value)
+        elif current_argument == '--seed':
+            settings["seed"] = int(current_value)
+        elif current_argument == '--no-memory-trace':
+            settings["trace_memory"] = False
+        elif current_argument == '--result':
+            result_location = current_value
+    benchmark = GeneratorBenchmark(**settings)
+    results = benchmark.run()
+    GeneratorBenchmark.write(results, result_location)
+    print("Benchmark results wrote in", result_location)
+
+def run_analyser_benchmark(arguments : list):
+    """Parse analyser options, run the analyser benchmark and write its results."""
+    long_options = ["help", "sizes=", "trace-days=", "readings-vm=", "readings-days=", "profiles=", "seed=", "no-memory-trace", "result="]
+    try:
+        options, values = getopt.getopt(arguments, "h", long_options)
+    except getopt.error as err:
+        print(str(err))
+        print_usage()
+    settings = dict()
+    result_location = "benchmark-analyser.json"
+    for current_argument, current_value in options:
+        if current_argument in ('-h', '--help'):
+            print_usage()
+        elif current_argument == '--sizes':
+            settings["sizes"] = [int(value) for value in manage_list_arg(current_value)]
+        elif current_argument == '--trace-days':
+            settings["trace_days"] = int(current_value)
+        elif current_argument == '--readings-vm':
+            settings["readings_vm_count"] = int(current_value)
+        elif current_argument == '--readings-days':
+            settings["readings_days"] = int(current_value)
+        elif current_argument == '--profiles':
+            settings["number_of_profile"] = int(current_value)
+        elif current_argument == '--seed':
+            settings["seed"] = int(current_value)
+        elif current_argument == '--no-memory-trace':
+            settings["trace_memory"] = False
+        elif current_argument == '--result':
+            result_location = current_value
+    benchmark = AnalyserBenchmark(**settings)
+    results = benchmark.run()
+    GeneratorBenchmark.write(results, result_location)
+    print("Benchmark results wrote in", result_location)
+
+def diff_benchmarks(arguments : list):
+    """Parse diff options, print comparison of two results files; return number of regressions."""
+    try:
+        options, values = getopt.gnu_getopt(arguments, "h", ["help", "threshold="])
+    except getopt.error as err:
+        print(str(err))
+        print_usage()
+    threshold = 0.1
+    for current_argument, current_value in options:
+        if current_argument in ('-h', '--help'):
+            print_usage()
+        elif current_argument == '--threshold':
+            threshold = float(current_value)
+    if len(values) != 2:
+        print("diff expects a baseline and a current results file")
+        print_usage()
+    comparison = BenchmarkComparison.load(values[0], values[1], threshold=threshold)
+    print(comparison.format())
+    regressions = comparison.get_regressions()
+    print(len(regressions), "regression(s) above", "{:.0%}".format(threshold))
+    return len(regressions)
+
+if __name__ == '__main__':
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ["run", "analyser", "diff"]:
+        print_usage()
+    try:
+        if sys.argv[1] == "run":
+            run_benchmark(sys.argv[2:])
+        elif sys.argv[1] == "analyser":
+            run_analyser_benchmark(sys.argv[2:])
+        elif diff_benchmarks(sys.argv[2:]) > 0:
+            sys.exit(1)
+    except KeyboardInterrupt:
+        print("Program interrupted")
@@ -0,0 +1,143 @@
+"""Analyser benchmark: time analyserlib scenario building on synthetic traces.
+
+Real Azure/Chameleon dumps are not needed: each case builds a deterministic
+synthetic vmtable of the requested VM count and cpu readings of a subset of its
+long-lived VMs (see analyserlib.synthetictrace), then runs the scenario building
+functions of the notebooks one after the other: get_cpu_and_mem_average_distribution,
+build_n_scenario, build_arrival_and_departure_rates_per_label and
+build_periodicity_rate_per_label. Each function is a StageProfiler stage, so
+results files share the generator benchmark format and can be compared with the
+same diff command.
+"""
+import platform, random, resource, time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from generator.stageprofiler import StageProfiler
+from analyserlib import distributionanalyzer, usageanalyzer, synthetictrace
+from benchmarks.generatorbenchmark import run_isolated_case
+
+class AnalyserBenchmark(object):
+    """
+    A class used to benchmark analyserlib functions on synthetic traces of increasing size
+    ...
+
+    Attributes
+    ----------
+    sizes : list
+        VM counts of synthetic vmtables
+    trace_days : int
+        duration of synthetic traces (days)
+    readings_vm_count : int
+        number of VMs with cpu readings, among those living at least lifetime_condition
+    lifetime_condition : int
+        minimum lifetime (seconds) of VMs with cpu readings, also used for periodicity detection
+    readings_days : int
+        days of cpu readings (5 minutes steps)
+    number_of_profile : int
+        usage profiles (clusters) built
+    timestamp_step : int
+        window of flavor distribution (seconds)
+    seed : int
+        seed of synthetic traces
+    trace_memory : bool
+        measure stages peak memory with tracemalloc (slows allocations down)
+
+    Public Methods
+    -------
+    get_cases():
+        Return cases (one per size)
+    run():
+        Run all cases, each in a fresh process, return results
+    run_case(case):
+        Run a single case in current process, return its measures
+    """
+
+    default_sizes = [10000, 100000, 1000000]
+    results_format = "cloudfactory-benchmark"
+
+    def __init__(self, **kwargs):
+        self.sizes = kwargs["sizes"] if "sizes" in kwargs else list(self.default_sizes)
+        self.trace_days = kwargs["trace_days"] if "trace_days" in kwargs else 30
+        self.lifetime_condition = kwargs["lifetime_condition"] if "lifetime_condition" in kwargs else 2*86400
+        self.readings_vm_count = kwargs["readings_vm_count"] if "readings_vm_count" in kwargs else 1000
+        self.readings_days = kwargs["readings_days"] if "readings_days" in kwargs else 7
+        self.number_of_profile = kwargs["number_of_profile"] if "number_of_profile" in kwargs else 4
+        self.timestamp_step = kwargs["timestamp_step"] if "timestamp_step" in kwargs else 3600
+        self.seed = kwargs["seed"] if "seed" in kwargs else 1
+        self.trace_memory = kwargs["trace_memory"] if "trace_memory" in kwargs else True
+
+    def get_cases(self):
+        """Return cases, by increasing VM count
+
+        Returns
+        -------
+        cases : list
+            cases as dict (name, vm_number)
+        """
+        return [{"name" : "analyser-vm-" + str(vm_number), "vm_number" : vm_number} for vm_number in sorted(self.sizes)]
+
+    def run(self):
+        """Run all cases, each in a fresh process
+
+        Returns
+        -------
+        results : dict
+            format, environment (python, numpy, platform), benchmark settings and case measures
+        """
+        results = {"format" : self.results_format,
+            "created" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python" : platform.python_version(),
+            "numpy" : np.__version__,
+            "platform" : platform.platform(),
+            "settings" : {"seed" : self.seed, "trace_days" : self.trace_days, "lifetime_condition" : self.lifetime_condition, "readings_vm_count" : self.readings_vm_count, "readings_days" : self.readings_days,
+                "number_of_profile" : self.number_of_profile, "timestamp_step" : self.timestamp_step, "trace_memory" : self.trace_memory},
+            "cases" : list()}
+        for case in self.get_cases():
+            print("Running", case["name"])
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                measures = executor.submit(run_isolated_case, self, case).result()
+            print(case["name"] + ":", measures["readings_count"], "readings,", round(measures["wall_time"], 3), "s overall, peak RSS", measures["max_rss"] >> 20, "MB")
+            results["cases"].append(dict(case, **measures))
+        return results
+
+    def run_case(self, case : dict):
+        """Run a single case in current process: build synthetic traces, then the scenario building functions
+
+        Parameters
+        ----------
+        case : dict
+            case from get_cases
+
+        Returns
+        -------
+        measures : dict
+            vm_count, readings_count, wall_time (whole case), max_rss (peak resident memory of process, in bytes)
+            and stages (StageProfiler report stages)
+        """
+        profiler = StageProfiler(trace_memory=self.trace_memory)
+        case_start = time.perf_counter()
+        random.seed(self.seed)
+        np.random.seed(self.seed)
+        with profiler.stage("synthetic_vmtable", items=case["vm_number"]):
+            vmtable_df = synthetictrace.build_synthetic_vmtable(case["vm_number"], seed=self.seed, duration=self.trace_days*86400)
+        with profiler.stage("synthetic_readings") as measure:
+            long_lived = vmtable_df.loc[vmtable_df['vmdeleted'] - vmtable_df['vmcreated'] >= self.lifetime_condition].iloc[:self.readings_vm_count]
+            readings_df = pd.concat(synthetictrace.generate_synthetic_cpu_readings(long_lived, seed=self.seed,
+                timestamp_end=self.readings_days*86400), ignore_index=True)
+            measure["items"] = len(readings_df)
+
+        with profiler.stage("get_cpu_and_mem_average_distribution", items=len(vmtable_df)):
+            distributionanalyzer.get_cpu_and_mem_average_distribution(vmtable_df, timestamp_step=self.timestamp_step)
+        with profiler.stage("build_n_scenario", items=len(vmtable_df)):
+            usage_distribution, vmtable_labeled = usageanalyzer.build_n_scenario(vmtable_df, self.number_of_profile)
+        with profiler.stage("build_arrival_and_departure_rates_per_label", items=len(vmtable_labeled)):
+            usageanalyzer.build_arrival_and_departure_rates_per_label(usage_distribution, vmtable_labeled)
+        with profiler.stage("build_periodicity_rate_per_label", items=len(readings_df)):
+            usageanalyzer.build_periodicity_rate_per_label(usage_distribution, vmtable_labeled, readings_df,
+                timestamp_per_hour=12, detect_periodicity_on_hour=24, lifetime_condition=self.lifetime_condition)
+        return {"vm_count" : len(vmtable_df),
+            "readings_count" : len(readings_df),
+            "wall_time" : time.perf_counter() - case_start,
+            "max_rss" : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024, # kB on Linux
+            "stages" : profiler.get_report()["stages"]}
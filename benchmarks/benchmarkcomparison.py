@@ -0,0 +1,151 @@
+"""Benchmark comparison: diff two benchmark results files.
+
+Cases are matched by name and stages by name within a case. For each metric
+(wall time, peak memory) the relative change of the current run over the
+baseline is computed; a change above threshold is a regression (below its
+opposite, an improvement). Measures smaller than a noise floor (min_wall_time,
+min_memory) in both runs are ignored, as their relative change is meaningless.
+"""
+import json
+
+class BenchmarkComparison(object):
+    """
+    A class used to compare a benchmark run to a baseline run
+    ...
+
+    Attributes
+    ----------
+    baseline : dict
+        baseline results
+    current : dict
+        current results
+    threshold : float
+        relative change above which a metric is a regression (0.1 is +10%)
+    min_wall_time : float
+        wall times (seconds) under which a time change is ignored
+    min_memory : int
+        memory peaks (bytes) under which a memory change is ignored
+
+    Public Methods
+    -------
+    load(baseline_location, current_location, **kwargs):
+        Compare two results files (class method)
+    compare():
+        Return compared metrics of cases and stages present in both runs
+    get_regressions():
+        Return compared metrics exceeding threshold
+    format():
+        Return comparison as a text table
+    """
+
+    results_format = "cloudfactory-benchmark"
+    time_metrics = ["wall_time", "generation_time"]
+    memory_metrics = ["max_rss", "peak_memory"]
+
+    def __init__(self, **kwargs):
+        required_attributes = ["baseline", "current"]
+        for required_attribute in required_attributes:
+            if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
+        self.baseline = kwargs["baseline"]
+        self.current = kwargs["current"]
+        for results in [self.baseline, self.current]:
+            if results.get("format") != self.results_format: raise ValueError("Invalid benchmark results format", results.get("format"))
+        self.threshold = kwargs["threshold"] if "threshold" in kwargs else 0.1
+        self.min_wall_time = kwargs["min_wall_time"] if "min_wall_time" in kwargs else 0.05
+        self.min_memory = kwargs["min_memory"] if "min_memory" in kwargs else 1 << 20
+
+    @classmethod
+    def load(cls, baseline_location : str, current_location : str, **kwargs):
+        """Compare two results files
+
+        Parameters
+        ----------
+        baseline_location : str
+            baseline results file location
+        current_location : str
+            current results file location
+        kwargs : dict
+            threshold, min_wall_time, min_memory
+
+        Returns
+        -------
+        comparison : BenchmarkComparison
+            comparison of loaded results
+        """
+        with open(baseline_location, 'r') as f:
+            baseline = json.load(f)
+        with open(current_location, 'r') as f:
+            current = json.load(f)
+        return cls(baseline=baseline, current=current, **kwargs)
+
+    def compare(self):
+        """Return compared metrics of cases (and their stages) run in both results
+
+        Returns
+        -------
+        rows : list
+            dict with case, stage (None for whole case), metric, baseline, current and change (relative, None if under noise floor)
+        """
+        rows = list()
+        baseline_cases = {case["name"] : case for case in self.baseline["cases"] if not case.get("skipped")}
+        for current_case in self.current["cases"]:
+            if current_case.get("skipped") or current_case["name"] not in baseline_cases: continue
+            baseline_case = baseline_cases[current_case["name"]]
+            rows.extend(self.__compare_measures(current_case["name"], None, baseline_case, current_case))
+            baseline_stages = {stage["name"] : stage for stage in baseline_case["stages"]}
+            for current_stage in current_case["stages"]:
+                if current_stage["name"] not in baseline_stages: continue
+                rows.extend(self.__compare_measures(current_case["name"], current_stage["name"], baseline_stages[current_stage["name"]], current_stage))
+        return rows
+
+    def __compare_measures(self, case : str, stage : str, baseline : dict, current : dict):
+        """Return compared time and memory metrics of a case or a stage
+
+        Returns
+        -------
+        rows : list
+            see compare
+        """
+        rows = list()
+        for metric in self.time_metrics + self.memory_metrics:
+            if (metric not in baseline) or (metric not in current): continue
+            floor = self.min_wall_time if metric in self.time_metrics else self.min_memory
+            change = None
+            if max(baseline[metric], current[metric]) >= floor and baseline[metric] > 0:
+                change = current[metric]/baseline[metric] - 1
+            rows.append({"case" : case, "stage" : stage, "metric" : metric, "baseline" : baseline[metric], "current" : current[metric], "change" : change})
+        return rows
+
+    def get_regressions(self):
+        """Return compared metrics whose relative change exceeds threshold
+
+        Returns
+        -------
+        rows : list
+            see compare
+        """
+        return [row for row in self.compare() if (row["change"] is not None) and (row["change"] > self.threshold)]
+
+    def format(self):
+        """Return comparison as a text table, regressions and improvements being flagged
+
+        Returns
+        -------
+        table : str
+            one line per compared metric
+        """
+        lines = ["{:<28} {:<22} {:<16} {:>14} {:>14} {:>9}".format("case", "stage", "metric", "baseline", "current", "change")]
+        for row in self.compare():
+            flag, change = "", "-"
+            if row["change"] is not None:
+                change = "{:+.1%}".format(row["change"])
+                if row["change"] > self.threshold: flag = " REGRESSION"
+                elif row["change"] < -self.threshold: flag = " improvement"
+            lines.append("{:<28} {:<22} {:<16} {:>14} {:>14} {:>9}{}".format(row["case"], row["stage"] if row["stage"] is not None else "(case)",
+                row["metric"], self.__format_value(row["metric"], row["baseline"]), self.__format_value(row["metric"], row["current"]), change, flag))
+        return "\n".join(lines)
+
+    def __format_value(self, metric : str, value):
+        """Format a measure: seconds for times, MB for memory"""
+        if metric in self.time_metrics: return "{:.3f}s".format(value)
+        return "{:.1f}MB".format(value/(1 << 20))
@@ -0,0 +1,188 @@
+"""Generator benchmark: pipeline throughput and memory over sizes and temporalities.
+
+Each case (VM count objective, temporality) runs in a fresh process so that its
+peak resident memory is its own: scenarios are loaded, a fleet is generated with
+a fixed seed, then each requested output and the export are written one after
+the other (in a temporary folder) from the same fleet. Stages are measured by a
+StageProfiler (wall time, CPU time, tracemalloc peak, VMs processed), so each
+stage of the pipeline gets its own throughput in the results file.
+
+Cases whose usage matrix (VM count x slices) exceeds max_cells are recorded as
+skipped instead of being run, which keeps the largest combinations (such as a
+million VMs with minute slices over 30 days) out of reach of small machines.
+"""
+import os, platform, random, resource, tempfile, time, json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from generator.distributionbuilder import DistributionBuilder
+from generator.usagebuilder import UsageBuilder
+from generator.workloadbuilder import WorkloadBuilder
+from generator.experimentgenerator import ExperimentGenerator
+from generator.stageprofiler import StageProfiler
+from generator.vmmodel import VmModel
+
+class GeneratorBenchmark(object):
+    """
+    A class used to benchmark the generator over a matrix of fleet sizes and temporalities
+    ...
+
+    Attributes
+    ----------
+    sizes : list
+        VM count objectives
+    temporalities : list
+        temporality names (keys of temporality_presets)
+    outputs : list
+        output formats written for each case (bash, cloudsimplus, cbtool)
+    export_format : str
+        export format written for each case (json, jsonl, npy), None for no export
+    lazy_commands : bool
+        generate workload commands on demand while writing outputs (measured in output stages) instead of storing them
+    seed : int
+        seed of random and np.random for each case
+    max_cells : int
+        cases with more usage matrix cells (VM count x slices) are skipped
+    trace_memory : bool
+        measure stages peak memory with tracemalloc (slows allocations down)
+    distribution, usage, workload : str
+        scenario files locations
+
+    Public Methods
+    -------
+    get_cases():
+        Return cases of the matrix
+    run():
+        Run all cases, each in a fresh process, return results
+    run_case(case):
+        Run a single case in current process, return its measures
+    write(results, location):
+        Write results as a JSON file (static method)
+    """
+
+    temporality_presets = {
+        "hour-day-7" : (3600, 86400, 7),
+        "hour-day-30" : (3600, 86400, 30),
+        "quarter-day-30" : (900, 86400, 30),
+        "minute-day-30" : (60, 86400, 30)}
+    default_sizes = [100, 1000, 10000, 100000, 1000000]
+    default_outputs = ["bash", "cloudsimplus", "cbtool"]
+    results_format = "cloudfactory-benchmark"
+
+    def __init__(self, **kwargs):
+        self.sizes = kwargs["sizes"] if "sizes" in kwargs else list(self.default_sizes)
+        self.temporalities = kwargs["temporalities"] if "temporalities" in kwargs else list(self.temporality_presets.keys())
+        self.outputs = kwargs["outputs"] if "outputs" in kwargs else list(self.default_outputs)
+        self.export_format = kwargs["export_format"] if "export_format" in kwargs else "npy"
+        self.lazy_commands = kwargs["lazy_commands"] if "lazy_commands" in kwargs else False
+        self.seed = kwargs["seed"] if "seed" in kwargs else 1
+        self.max_cells = kwargs["max_cells"] if "max_cells" in kwargs else 2**30
+        self.trace_memory = kwargs["trace_memory"] if "trace_memory" in kwargs else True
+        self.distribution = kwargs["distribution"] if "distribution" in kwargs else "examples-scenario/scenario-vm-distribution-azure2017.yml"
+        self.usage = kwargs["usage"] if "usage" in kwargs else "examples-scenario/scenario-vm-usage-azure2017.yml"
+        self.workload = kwargs["workload"] if "workload" in kwargs else "examples-workload/scenario-vm-workload.yml"
+        for temporality in self.temporalities:
+            if temporality not in self.temporality_presets:
+                raise ValueError("Invalid temporality", temporality, "expected ones :", list(self.temporality_presets.keys()))
+
+    def get_cases(self):
+        """Return cases of the matrix, by temporality then by increasing VM count
+
+        Returns
+        -------
+        cases : list
+            cases as dict (name, vm_number, temporality name, slice duration, scope duration, number of scope)
+        """
+        cases = list()
+        for temporality in self.temporalities:
+            slice_duration, scope_duration, number_of_scope = self.temporality_presets[temporality]
+            for vm_number in sorted(self.sizes):
+                cases.append({"name" : "vm-" + str(vm_number) + "_" + temporality, "vm_number" : vm_number, "temporality" : temporality,
+                    "slice_duration" : slice_duration, "scope_duration" : scope_duration, "number_of_scope" : number_of_scope})
+        return cases
+
+    def run(self):
+        """Run all cases, each in a fresh process (skipped if its usage matrix exceeds max_cells)
+
+        Returns
+        -------
+        results : dict
+            format, environment (python, numpy, platform), benchmark settings and case measures
+        """
+        results = {"format" : self.results_format,
+            "created" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python" : platform.python_version(),
+            "numpy" : np.__version__,
+            "platform" : platform.platform(),
+            "settings" : {"seed" : self.seed, "outputs" : self.outputs, "export_format" : self.export_format, "lazy_commands" : self.lazy_commands, "trace_memory" : self.trace_memory,
+                "scenarios" : {"distribution" : self.distribution, "usage" : self.usage, "workload" : self.workload}},
+            "cases" : list()}
+        for case in self.get_cases():
+            cells = case["vm_number"]*int(case["scope_duration"]/case["slice_duration"])*case["number_of_scope"]
+            if cells > self.max_cells:
+                print("Skipping", case["name"], "(" + str(cells), "usage cells exceed", str(self.max_cells) + ")")
+                results["cases"].append(dict(case, skipped=True))
+                continue
+            print("Running", case["name"])
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                measures = executor.submit(run_isolated_case, self, case).result()
+            print(case["name"] + ":", measures["vm_count"], "VMs generated in", round(measures["generation_time"], 3), "s,",
+                round(measures["wall_time"], 3), "s overall, peak RSS", measures["max_rss"] >> 20, "MB")
+            results["cases"].append(dict(case, **measures))
+        return results
+
+    def run_case(self, case : dict):
+        """Run a single case in current process: load scenarios, generate, write outputs and export in a temporary folder
+
+        Parameters
+        ----------
+        case : dict
+            case from get_cases
+
+        Returns
+        -------
+        measures : dict
+            vm_count, generation_time, vm_per_second, wall_time (whole case), max_rss (peak resident memory of process, in bytes)
+            and stages (StageProfiler report stages)
+        """
+        profiler = StageProfiler(trace_memory=self.trace_memory)
+        slices_per_scope = int(case["scope_duration"]/case["slice_duration"])
+        case_start = time.perf_counter()
+        VmModel.vm_count = 0
+        random.seed(self.seed)
+        np.random.seed(self.seed)
+        distribution_builder = DistributionBuilder(yaml_file=self.distribution, profiler=profiler)
+        usage_builder = UsageBuilder(yaml_file=self.usage, slices_per_scope=slices_per_scope, number_of_scope=case["number_of_scope"], profiler=profiler)
+        workload_builder = WorkloadBuilder(yaml_file=self.workload, slice_duration=case["slice_duration"], lazy_commands=self.lazy_commands, profiler=profiler)
+        generator = ExperimentGenerator(distribution_builder=distribution_builder, usage_builder=usage_builder, workload_builder=workload_builder, profiler=profiler)
+        generation_start = time.perf_counter()
+        fleet = generator.gen_fleet(vm_number=case["vm_number"], number_of_scope=case["number_of_scope"])
+        generation_time = time.perf_counter() - generation_start
+        with tempfile.TemporaryDirectory() as output_folder:
+            for output_type in self.outputs:
+                generator.write(output_type=output_type, vm_list=fleet, slice_duration=case["slice_duration"], compact=True, output_folder=output_folder)
+            if self.export_format is not None:
+                generator.export(fleet, os.path.join(output_folder, "export"), self.export_format)
+        return {"vm_count" : len(fleet),
+            "generation_time" : generation_time,
+            "vm_per_second" : len(fleet)/generation_time if generation_time > 0 else None,
+            "wall_time" : time.perf_counter() - case_start,
+            "max_rss" : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024, # kB on Linux
+            "stages" : profiler.get_report()["stages"]}
+
+    @staticmethod
+    def write(results : dict, location : str):
+        """Write results as a JSON file
+
+        Parameters
+        ----------
+        results : dict
+            run results
+        location : str
+            results file location
+        """
+        with open(location, 'w') as f:
+            json.dump(results, f, indent=2)
+
+def run_isolated_case(benchmark : GeneratorBenchmark, case : dict):
+    """Pool task: run a case in a fresh worker process"""
+    return benchmark.run_case(case)
@@ -10,12 +10,20 @@ dataset="$2"
 vm="$3"
 prev="$4"
 max="$5"
+script_folder=$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )
 echo "label,dataset,vm,host" > output.csv
+# Largest workload is generated once, smaller ones are nested subsets of it (one vm-{count} folder per step)
+echo "overall: Generating from $vm to $max"
+python3 -m generator --distribution=examples-data/scenario-vm-distribution-"$dataset".yml --usage=examples-data/scenario-vm-usage-"$label".yml --sweep-vm="$vm,$max,10" --output=cloudsimplus --temporality=360,8640,7 --export="experiment-$label-$dataset.txt"
 while :
 do
   echo "overall: Launching with $vm"
-  python3 -m generator --distribution=examples-data/scenario-vm-distribution-"$dataset".yml --usage=examples-data/scenario-vm-usage-"$label".yml --vm="$vm" --output=cloudsimplus --temporality=360,8640,7 --export="experiment-$label-$dataset-$vm.txt"
-  prev=$( source examples-data/deduct-min.sh "$label" "$dataset" "$vm" "$prev" )
+  # Fleets are nested: once a size has no host count (e.g. a VM larger than a host), larger ones have none either
+  if ! prev=$( cd "vm-$vm" && source "$script_folder/deduct-min.sh" "$label" "$dataset" "$vm" "$prev" )
+  then
+    echo "overall: no host count for $vm" >&2
+    exit 1
+  fi
   echo "overall: found min with $prev"
   echo "$label,$dataset,$vm,$prev" >> output.csv
   vm=$(( vm + 10 ))
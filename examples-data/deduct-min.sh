@@ -11,16 +11,15 @@ label="$1"
 dataset="$2"
 vm="$3"
 host_count="$4"
-while :
-do
-  #echo "Exp $label-$dataset-$vm : Trying with $host_count"
-  java -cp /usr/local/src/cloudsimplus-examples/target/cloudsimplus-examples-*-with-dependencies.jar org.cloudsimplus.examples.CloudFactoryGeneratedWorkload "$host_count" "$cpu_config" "$mem_config" > temp
-  if ! grep -q 'No suitable host found' temp; then
-    # Everything went fine
-    #echo "Exp $label-$dataset-$vm : Match with $host_count"
-    mv temp "solution-$label-$dataset-$vm.txt"
-    break
-  fi
-  host_count=$(( host_count + 1 ))
-done
+# Workload is loaded once, host counts are searched (exponential then binary search) within the JVM
+# Search exits with status 1 if a VM does not fit on a host of cpu_config/mem_config
+if ! java -cp /usr/local/src/cloudsimplus-examples/target/cloudsimplus-examples-*-with-dependencies.jar org.cloudsimplus.examples.CloudFactoryGeneratedWorkload search "$cpu_config" "$mem_config" "$host_count" > temp
+then
+  echo "deduct-min.sh No host count found for $label $dataset $vm" 1>&2
+  rm -f temp
+  exit 1
+fi
+host_count=$( grep 'Minimum host count:' temp | awk '{print $NF}' )
+grep 'Probe:' temp 1>&2
+mv temp "solution-$label-$dataset-$vm.txt"
 echo "$host_count"
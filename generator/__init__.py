@@ -1,10 +1,13 @@
 """CloudFactory workload generator package.
 
 This package turns scenario files (distribution, usage, workload YAML) and
-generation targets (CPU/mem or VM count) into a set of VmModel instances with
-usage and workload commands, and exports them to bash, CloudSim Plus, or CBTOOL.
+generation targets (CPU/mem or VM count) into a set of VMs with usage and
+workload commands, and exports them to bash, CloudSim Plus, or CBTOOL. VMs are
+stored as columns in a VmFleet; VmModel views remain available for list users.
 
 Main entry point: run as ``python -m generator`` (see generator/__main__.py).
-Core types: DistributionBuilder, UsageBuilder, WorkloadBuilder, ExperimentGenerator, VmModel.
+Core types: DistributionBuilder, UsageBuilder, WorkloadBuilder, ExperimentGenerator, VmFleet, VmModel.
+Batch runs: ExperimentBatch (experiments of a manifest, scenarios loaded once).
 Exporters: generator.exporter (ExporterBash, ExporterCloudSimPlus, ExporterCBTool).
+Cluster sizing: ClusterSimulator (native placement replay, alternative to CloudSim Plus runs).
 """
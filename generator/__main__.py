@@ -3,16 +3,31 @@
 This module is run as ``python -m generator``. It parses command-line options
 for distribution/usage/workload scenario files, VM generation targets (CPU/mem
 or VM count), temporality (slice/scope/iteration), and output format (bash,
-cloudsimplus, cbtool). It builds an ExperimentGenerator, generates a list of
-VmModel instances, and writes them in the requested format(s) and optionally
-exports the VM list as JSON.
+cloudsimplus, cbtool). It builds an ExperimentGenerator, generates a VmFleet
+(columnar set of VMs), and writes them in the requested format(s), optionally
+simulates their placement on a cluster (--sizing) and exports the VM list as JSON
+(or JSON lines, streamed VM per VM on load).
+A VM count sweep (--sweep-vm) generates the largest set once and writes nested
+subsets of it, one folder per VM count. A batch of experiments (--sweep) is run
+from a manifest with scenarios loaded once, optionally on a pool of processes.
+A single set can also be generated in independent shards (--shards) on a pool.
+Generation is deterministic for a given seed (--seed): a small reproducibility
+manifest (--save-manifest) regenerates the identical set of VMs (--replay).
+Time and memory of each stage of a run can be written as a JSON report (--profile).
 """
-import getopt, sys, json
+import getopt, sys, json, os, random
+import numpy as np
 from generator.distributionbuilder import DistributionBuilder
 from generator.usagebuilder import UsageBuilder
 from generator.workloadbuilder import WorkloadBuilder
 from generator.experimentgenerator import ExperimentGenerator
+from generator.clustersimulator import ClusterSimulator
+from generator.experimentbatch import ExperimentBatch
+from generator.reproducibilitymanifest import ReproducibilityManifest
 from generator.vmmodel import *
+from generator.vmfleet import VmFleet
+from generator.jsonlinesvmlist import JsonLinesVmList
+from generator.stageprofiler import StageProfiler
 
 # Default values
 yaml_file_distrib_default = "examples-scenario/scenario-vm-distribution-azure2017.yml"
@@ -36,13 +51,27 @@ def print_usage():
     print("Generating set options:")
     print("[--cpu={cores}] [--mem={gb}] : initialize a set of VM based on requested usage (as cpu cores and mem gigabytes provisioned quantities)")
     print("[--vm={number_of_vm}]        : initialize a set of requested amount of VM")
-    print("[--load={vm_list.json}]      : alternatively, load a previously generated set of VM (using --export option)")
+    print("[--load={vm_list.json/.jsonl/folder}] : alternatively, load a previously generated set of VM (using --export option, .jsonl files are streamed VM per VM)")
+    print("[--replay={manifest.yml}]    : alternatively, regenerate the set of VM described by a reproducibility manifest (using --save-manifest option)")
+    print("[--sweep-vm={start,stop,step}] : alternatively, generate nested sets of VM for each count from start to stop (included), written in vm-{count} folders")
+    print("[--sweep={manifest.yml}]    : alternatively, run a batch of experiments (vm or cpu/mem objective, temporality, seed) listed in a manifest, each written in its own folder")
+    print("[--shards={number}]          : split --cpu/--mem or --vm objective in independently generated shards (merged, with deterministic ids)")
+    print("[--workers={number}]         : number of processes running --sweep experiments or --shards. Default : 1")
+    print("[--seed={integer}]           : seed of random generators, generation is deterministic for a given seed")
     print("Temporality option:")
     print("[--temporality={slice,scope,iteration}] :  virtual hour duration (seconds), virtual day duration (seconds), number of experiment vdays. Default:", 
         str("--temporality=" + str(temporality_slice_duration_default) + "," + str(temporality_scope_duration_default) + "," + str(temporality_scope_number_default)))
     print("Output options:")
     print("[--output={bash/cloudsim/cbtool}] : output format list, separated by comma (can be single)")
-    print("[--export={vm_list.json}]         : if specified, export generated set of VM to the location (for reproductibility purposes)")
+    print("[--export={vm_list.json/folder}]  : if specified, export generated set of VM to the location (for reproductibility purposes)")
+    print("[--export-format={json/jsonl/npy}] : export as a json list, as json lines (one VM per line, loaded VM per VM), or as a folder of binary columns loaded as memory maps (much faster for large sets). Default : json")
+    print("[--save-manifest={manifest.yml}]  : if specified, write seed, scenario hashes, temporality and objective of generated set of VM (a few lines replacing --export for reproductibility purposes)")
+    print("[--compress]                      : gzip compress written output files (.gz suffix)")
+    print("[--compact]                       : cloudsimplus output as compact csv files (run length encoded usage) instead of properties")
+    print("[--sizing={cpu,mem[,ffd/bfd]}]      : simulate placement on hosts of given cores/GB (first/best fit decreasing), print minimum host count and write sizing.csv")
+    print("[--search]                        : cloudsimplus program searches the minimum host count (single JVM) instead of simulating a fixed one")
+    print("[--lazy-commands]                 : generate workload commands on demand while exporting instead of storing them (lower memory)")
+    print("[--profile={profile.json}]        : if specified, write wall time, CPU time, peak memory (tracemalloc, slower run) and VM count of each stage as a JSON report")
     print("")
     print(">Specific examples : To generate a bash script from a CPU/mem objective :")
     print("python3 -m generator [--cpu={used_cores}] [--mem={used_gb}] --output=bash [--temporality={slice,scope,iteration}]")
@@ -76,8 +105,62 @@ def manage_output_args(argument : str):
         output_selected.append(format)
     return output_selected
 
+def manage_sizing_args(argument : str):
+    """Parse --sizing=cpu,mem[,strategy] into ClusterSimulator arguments. Raises ValueError if format is invalid."""
+    values = argument.split(',')
+    if len(values) not in [2, 3]:
+        print("Invalid length on sizing arguments. Refer to format")
+        print_usage()
+    sizing = {"host_cpu" : int(values[0]), "host_mem" : float(values[1])}
+    if len(values) == 3: sizing["strategy"] = values[2]
+    return sizing
+
+def manage_sweep_args(argument : str):
+    """Parse --sweep-vm=start,stop,step into the list of VM counts (stop included). Raises ValueError if format is invalid."""
+    values = argument.split(',')
+    if len(values) != 3:
+        print("Invalid length on sweep arguments. Refer to format")
+        print_usage()
+    start, stop, step = int(values[0]), int(values[1]), int(values[2])
+    if start <= 0 or step <= 0 or stop < start:
+        raise ValueError("Sweep must be positive and increasing")
+    return list(range(start, stop + 1, step))
+
+def write_sizing(sizing : dict, vm_list, output_folder : str = "."):
+    """Simulate placement of vm_list on hosts, print minimum host count and write per-slice utilization in sizing.csv (in output_folder)."""
+    simulator = ClusterSimulator(**sizing)
+    result = simulator.simulate(vm_list)
+    print("Cluster sizing:", result["host_count"], "host(s) of", simulator.host_cpu, "vCPU and", simulator.host_mem, "GB (" + simulator.strategy + ")")
+    simulator.write_utilization(result, os.path.join(output_folder, 'sizing.csv'))
+    print("Per-slice utilization wrote in", os.path.join(output_folder, 'sizing.csv'))
+
+def write_outputs(generator : ExperimentGenerator, vm_list, output_folder : str = "."):
+    """Write requested output formats, sizing and JSON export of vm_list in output_folder (uses command-line options)."""
+    for format in output_format:
+        generator.write(output_type=format, vm_list=vm_list, slice_duration=temporality_slice_duration, compress=output_compress, compact=output_compact, search=output_search, output_folder=output_folder)
+    os.makedirs(output_folder, exist_ok=True)
+    if sizing is not None:
+        with profiler.stage("cluster_sizing", items=len(vm_list)):
+            write_sizing(sizing, vm_list, output_folder)
+    if output_export is not None:
+        export_location = os.path.join(output_folder, output_export)
+        generator.export(vm_list, export_location, export_format)
+        print("CloudFactory VM workload exported as", export_format, "in", export_location)
+
+def manage_export_format_arg(argument : str):
+    """Parse --export-format; return it. Raises ValueError if format is invalid."""
+    if argument not in ExperimentGenerator.valid_export_formats:
+        print("Invalid export format selected", argument, "expected ones :", ExperimentGenerator.valid_export_formats)
+        raise ValueError("Invalid export format argument")
+    return argument
+
 def manage_vm_load_arg(argument : str):
-    """Load a list of VmModel from a JSON file path; return the list."""
+    """Load a list of VmModel from a JSON file path, a JsonLinesVmList (VMs read on demand) from a .jsonl file path,
+    or a VmFleet (memory mapped) from a folder of .npy columns; return it."""
+    if os.path.isdir(argument):
+        return VmFleet.load(argument)
+    if argument.endswith(".jsonl"):
+        return JsonLinesVmList(argument)
     vm_list = list()
     with open(argument, 'r') as f:
         raw_list = json.load(f)
@@ -85,10 +168,21 @@ def manage_vm_load_arg(argument : str):
             vm_list.append(VmModel(**raw_vm))
     return vm_list
 
+def manage_fleet_temporality(fleet : VmFleet, temporality : tuple = None):
+    """Return (slice_duration, scope_duration, number) of a VmFleet loaded from .npy columns: the saved one if temporality is None
+    (--temporality unspecified), temporality otherwise. Raises ValueError if temporality does not match the saved one, or if fleet
+    was saved without slice duration and workload hash (commands could not be generated again as exported)."""
+    if (fleet.slice_duration is None) or (fleet.workload_hash is None):
+        raise ValueError("Loaded VmFleet has no slice duration or workload hash, export it again")
+    saved_temporality = (fleet.slice_duration, fleet.slice_duration*fleet.slices_per_scope, fleet.number_of_scope)
+    if (temporality is not None) and (tuple(temporality) != saved_temporality):
+        raise ValueError("Temporality", tuple(temporality), "does not match loaded VmFleet one", saved_temporality)
+    return saved_temporality
+
 if __name__ == '__main__':
 
     short_options = "hd:u:w:c:m:v:l:t:o:e:"
-    long_options = ["help", "distribution=", "usage=", "workload=", 'cpu=', 'mem=', 'vm=', 'load=', 'temporality=', 'output=', 'export=']
+    long_options = ["help", "distribution=", "usage=", "workload=", 'cpu=', 'mem=', 'vm=', 'load=', 'temporality=', 'output=', 'export=', 'lazy-commands', 'compress', 'compact', 'search', 'sizing=', 'sweep-vm=', 'sweep=', 'workers=', 'shards=', 'seed=', 'save-manifest=', 'replay=', 'export-format=', 'profile=']
 
     #Load default options values
     yaml_file_distrib = yaml_file_distrib_default
@@ -102,8 +196,23 @@ if __name__ == '__main__':
     temporality_scope_duration = temporality_scope_duration_default
     temporality_scope_number = temporality_scope_number_default
     temporality_slices_per_scope= int(temporality_scope_duration / temporality_slice_duration)
+    temporality_argument = None
     output_format = list()
     output_export = None
+    export_format = "json"
+    lazy_commands = False
+    output_compress = False
+    output_compact = False
+    output_search = False
+    sizing = None
+    sweep = None
+    sweep_manifest = None
+    workers = 1
+    shards = None
+    seed = None
+    save_manifest = None
+    replay_manifest = None
+    profile_report = None
 
     # Arguments management
     try:
@@ -132,41 +241,127 @@ if __name__ == '__main__':
             output_format = manage_output_args(current_value)
         elif current_argument in('-e', '--export'):
             output_export = current_value
+        elif current_argument == '--export-format':
+            export_format = manage_export_format_arg(current_value)
+        elif current_argument == '--lazy-commands':
+            lazy_commands = True
+        elif current_argument == '--compress':
+            output_compress = True
+        elif current_argument == '--compact':
+            output_compact = True
+        elif current_argument == '--search':
+            output_search = True
+        elif current_argument == '--sizing':
+            sizing = manage_sizing_args(current_value)
+        elif current_argument == '--sweep-vm':
+            sweep = manage_sweep_args(current_value)
+        elif current_argument == '--sweep':
+            sweep_manifest = current_value
+        elif current_argument == '--workers':
+            workers = int(current_value)
+        elif current_argument == '--shards':
+            shards = int(current_value)
+        elif current_argument == '--seed':
+            seed = int(current_value)
+        elif current_argument == '--save-manifest':
+            save_manifest = current_value
+        elif current_argument == '--replay':
+            replay_manifest = current_value
+        elif current_argument == '--profile':
+            profile_report = current_value
         elif current_argument in('-t', '--temporality'):
             temporality_slice_duration, temporality_scope_duration, temporality_scope_number = manage_temporality_args(current_value)
             temporality_slices_per_scope= int(temporality_scope_duration / temporality_slice_duration)
+            temporality_argument = (temporality_slice_duration, temporality_scope_duration, temporality_scope_number)
         else:
             print_usage()
             
+    # Replay: scenarios, temporality, objective and seed from a reproducibility manifest
+    if replay_manifest is not None:
+        manifest = ReproducibilityManifest.load(replay_manifest)
+        manifest.verify()
+        yaml_file_distrib, yaml_file_usage, yaml_file_workload = [manifest.scenarios[kind] for kind in ReproducibilityManifest.scenario_kinds]
+        temporality_slice_duration, temporality_scope_duration, temporality_scope_number = manifest.temporality
+        temporality_slices_per_scope= int(temporality_scope_duration / temporality_slice_duration)
+        temporality_argument = manifest.temporality
+        init_vm, init_cpu, init_mem, sweep, shards = [manifest.objective.get(key) for key in ["vm", "cpu", "mem", "sweep_vm", "shards"]]
+        seed = manifest.seed
+
+    # Set loaded from binary columns: its commands are generated again with its saved temporality
+    if isinstance(vm_list, VmFleet):
+        temporality_slice_duration, temporality_scope_duration, temporality_scope_number = manage_fleet_temporality(vm_list, temporality_argument)
+        temporality_slices_per_scope= int(temporality_scope_duration / temporality_slice_duration)
+
+    # Stage measures (--profile), no-op otherwise
+    profiler = StageProfiler(enabled=profile_report is not None)
+
     # Entrypoint
     try:
 
-        # Initialization
-        distribution_builder = DistributionBuilder(yaml_file=yaml_file_distrib)
-        usage_builder = UsageBuilder(yaml_file=yaml_file_usage, slices_per_scope=temporality_slices_per_scope, number_of_scope=temporality_scope_number)
-        workload_builder = WorkloadBuilder(yaml_file=yaml_file_workload, slice_duration=temporality_slice_duration)
-        generator = ExperimentGenerator(distribution_builder=distribution_builder, usage_builder=usage_builder, workload_builder=workload_builder)
-
-        # Generation
-        if not vm_list:
-            if (init_cpu is not None) and (init_mem is not None) :
-                vm_list = generator.gen(cpu=init_cpu, mem=init_mem, number_of_scope=temporality_scope_number)
-            elif (init_vm is not None):
-                vm_list = generator.gen(vm_number=init_vm, number_of_scope=temporality_scope_number)
-            else:
-                print("Warning, no set of VM specified")
-                print_usage()
-
-        # Output
-        if vm_list:
-            for format in output_format:
-                generator.write(output_type=format, vm_list=vm_list, slice_duration=temporality_slice_duration)
-            if output_export is not None:
-                with open(output_export, 'w') as f:
-                    for vm in vm_list:
-                        if not hasattr(vm, 'cpu'): print(vm, type(vm))
-                    f.write(json.dumps(vm_list, cls=VmModelEncoder))
-                    print("CloudFactory VM workload exported as json in", output_export)
+        # Batch: experiments of a manifest, scenarios loaded once (per process)
+        if sweep_manifest is not None:
+            batch = ExperimentBatch(manifest=sweep_manifest, distribution=yaml_file_distrib, usage=yaml_file_usage, workload=yaml_file_workload,
+                temporality=(temporality_slice_duration, temporality_scope_duration, temporality_scope_number), lazy_commands=lazy_commands,
+                output_format=output_format, compress=output_compress, compact=output_compact, search=output_search, sizing=sizing, export=output_export, export_format=export_format, profiler=profiler)
+            for output_folder, vm_count in batch.run(workers=workers):
+                print("Experiment wrote in", output_folder, "(" + str(vm_count), "VMs)")
+
+        else:
+            # Initialization
+            distribution_builder = DistributionBuilder(yaml_file=yaml_file_distrib, profiler=profiler)
+            usage_builder = UsageBuilder(yaml_file=yaml_file_usage, slices_per_scope=temporality_slices_per_scope, number_of_scope=temporality_scope_number, profiler=profiler)
+            workload_builder = WorkloadBuilder(yaml_file=yaml_file_workload, slice_duration=temporality_slice_duration, lazy_commands=lazy_commands, profiler=profiler)
+            generator = ExperimentGenerator(distribution_builder=distribution_builder, usage_builder=usage_builder, workload_builder=workload_builder, profiler=profiler)
+
+            # Seed: drawn if unspecified, so that a written manifest can reproduce generation
+            generated = (sweep is not None) or (not vm_list)
+            if (seed is None) and (save_manifest is not None) and generated:
+                seed = random.SystemRandom().randrange(2**32)
+            if seed is not None:
+                random.seed(seed)
+                np.random.seed(seed)
+
+            # Commands of a set loaded from binary columns are generated again, on demand
+            if isinstance(vm_list, VmFleet) and not generated:
+                workload_builder.generate_workload_commands(vm_list, lazy=True)
+
+            # Sweep: nested sets of VM generated at once, written in a folder per VM count
+            if sweep is not None:
+                for vm_number, fleet in generator.gen_sweep(vm_numbers=sweep, number_of_scope=temporality_scope_number):
+                    print("Writing sweep step of", vm_number, "VMs")
+                    write_outputs(generator, fleet, "vm-" + str(vm_number))
+
+            # Generation
+            elif not vm_list:
+                if (init_cpu is not None) and (init_mem is not None) and (shards is not None):
+                    vm_list = generator.gen_sharded(shards=shards, workers=workers, seed=seed, cpu=init_cpu, mem=init_mem, number_of_scope=temporality_scope_number)
+                elif (init_vm is not None) and (shards is not None):
+                    vm_list = generator.gen_sharded(shards=shards, workers=workers, seed=seed, vm_number=init_vm, number_of_scope=temporality_scope_number)
+                elif (init_cpu is not None) and (init_mem is not None) :
+                    vm_list = generator.gen_fleet(cpu=init_cpu, mem=init_mem, number_of_scope=temporality_scope_number)
+                elif (init_vm is not None):
+                    vm_list = generator.gen_fleet(vm_number=init_vm, number_of_scope=temporality_scope_number)
+                else:
+                    print("Warning, no set of VM specified")
+                    print_usage()
+
+            # Output
+            if vm_list:
+                write_outputs(generator, vm_list)
+
+            # Reproducibility manifest
+            if (save_manifest is not None) and generated:
+                manifest = ReproducibilityManifest(seed=seed,
+                    scenarios={"distribution" : yaml_file_distrib, "usage" : yaml_file_usage, "workload" : yaml_file_workload},
+                    temporality=(temporality_slice_duration, temporality_scope_duration, temporality_scope_number),
+                    objective={"vm" : init_vm, "cpu" : init_cpu, "mem" : init_mem, "sweep_vm" : sweep, "shards" : shards})
+                manifest.write(save_manifest)
+                print("Reproducibility manifest wrote in", save_manifest, "(seed", str(seed) + ")")
+
+        # Per-stage measures
+        if profile_report is not None:
+            profiler.write_report(profile_report)
+            print("Stage profile wrote in", profile_report)
 
     except KeyboardInterrupt:
         print("Program interrupted")
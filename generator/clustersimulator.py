@@ -0,0 +1,180 @@
+"""Cluster sizing simulator: place a generated fleet on identical hosts.
+
+ClusterSimulator replays VM arrivals and departures slice per slice (from VM
+postponed start and lifetime) and packs arriving VMs on hosts of a given
+cpu/mem size, using first-fit or best-fit decreasing. Hosts are opened on
+demand, so a single replay gives the minimum host count for which the
+placement strategy never fails, along with per-slice utilization. It is a
+native alternative to CloudSim Plus runs for cluster sizing experiments.
+"""
+import numpy as np
+from generator.vmfleet import VmFleet
+
+class ClusterSimulator(object):
+    """
+    A class used to simulate VM placement on a cluster of identical hosts
+    ...
+
+    Attributes
+    ----------
+    host_cpu : int
+        cores of a host
+    host_mem : float
+        memory (GB) of a host
+    strategy : str
+        placement strategy: ffd (first-fit decreasing) or bfd (best-fit decreasing)
+
+    Public Methods
+    -------
+    simulate(vm_list):
+        Replay fleet arrivals and departures, return minimum host count, placement and per-slice utilization
+    write_utilization(result, location):
+        Write per-slice utilization of a simulation result as csv
+    """
+
+    valid_strategies = ["ffd", "bfd"]
+    max_cells_per_chunk = 2**22 # bound memory used when summing usage matrix (in VM x slices cells)
+
+    def __init__(self, **kwargs):
+        required_attributes = ["host_cpu", "host_mem"]
+        for required_attribute in required_attributes:
+            if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
+        self.host_cpu = kwargs["host_cpu"]
+        self.host_mem = kwargs["host_mem"]
+        self.strategy = kwargs["strategy"] if "strategy" in kwargs else "ffd"
+        if self.strategy not in self.valid_strategies: raise ValueError("Invalid placement strategy", self.strategy, "expected ones :", self.valid_strategies)
+
+    def simulate(self, vm_list):
+        """Replay arrivals and departures of VMs slice per slice and place arriving VMs on hosts
+        On each slice, leaving VMs free their host first, then arriving VMs are placed by decreasing size (cpu, then mem)
+
+        Parameters
+        ----------
+        vm_list : VmFleet or list
+            VMs to be placed (lists of VmModel are converted to a fleet)
+
+        Returns
+        -------
+        result : dict
+            host_count : minimum number of hosts (hosts opened during replay)
+            placement : host index of each VM (-1 if never present)
+            allocated_cpu, allocated_mem : per-slice ratio of allocated cores/memory on host_count hosts
+            cpu_utilization : per-slice ratio of used cores (following VM usage) on host_count hosts
+            active_hosts : per-slice number of hosts with at least one VM
+        """
+        fleet = vm_list if isinstance(vm_list, VmFleet) else VmFleet.from_vm_list(vm_list)
+        if np.any(fleet.cpu > self.host_cpu) or np.any(fleet.mem > self.host_mem):
+            raise ValueError("Some VMs are larger than host configuration", self.host_cpu, self.host_mem)
+        number_of_slices = fleet.get_number_of_slices()
+        start = fleet.postponed_start.astype(np.int64)
+        end = fleet.get_end()
+        present = end > start
+
+        # Arrivals sorted by slice, then by decreasing size. Departures grouped by slice
+        arrivals = np.flatnonzero(present)
+        arrivals = arrivals[np.lexsort((-fleet.mem[arrivals], -fleet.cpu[arrivals], start[arrivals]))]
+        arrival_bounds = np.searchsorted(start[arrivals], np.arange(number_of_slices + 1))
+        departures = np.flatnonzero(present & (end < number_of_slices))
+        departures = departures[np.argsort(end[departures], kind='stable')]
+        departure_bounds = np.searchsorted(end[departures], np.arange(number_of_slices + 1))
+
+        placement = np.full(len(fleet), -1, dtype=np.int64)
+        free_cpu = np.zeros(0, dtype=np.float64)
+        free_mem = np.zeros(0, dtype=np.float64)
+        host_count = 0
+        active_hosts = np.zeros(number_of_slices, dtype=np.int64)
+        for slice_number in range(number_of_slices):
+            for vm_index in departures[departure_bounds[slice_number]:departure_bounds[slice_number+1]]:
+                free_cpu[placement[vm_index]] += fleet.cpu[vm_index]
+                free_mem[placement[vm_index]] += fleet.mem[vm_index]
+            for vm_index in arrivals[arrival_bounds[slice_number]:arrival_bounds[slice_number+1]]:
+                cpu, mem = fleet.cpu[vm_index], fleet.mem[vm_index]
+                host = self.__choose_host(free_cpu[:host_count], free_mem[:host_count], cpu, mem)
+                if host < 0:
+                    if host_count >= len(free_cpu): # open a new host, growing host arrays by doubling
+                        free_cpu = np.concatenate((free_cpu, np.full(max(host_count, 16), float(self.host_cpu))))
+                        free_mem = np.concatenate((free_mem, np.full(max(host_count, 16), float(self.host_mem))))
+                    host = host_count
+                    host_count += 1
+                free_cpu[host] -= cpu
+                free_mem[host] -= mem
+                placement[vm_index] = host
+            active_hosts[slice_number] = np.count_nonzero((free_cpu[:host_count] < self.host_cpu) | (free_mem[:host_count] < self.host_mem))
+
+        return self.__build_result(fleet, placement, host_count, active_hosts, start, end)
+
+    def write_utilization(self, result : dict, location : str):
+        """Write per-slice utilization of a simulation result as csv (slice, active hosts, allocated cpu/mem and cpu utilization ratios)
+
+        Parameters
+        ----------
+        result : dict
+            simulate result
+        location : str
+            csv file location
+        """
+        with open(location, 'w') as f:
+            f.write("slice,active_hosts,allocated_cpu,allocated_mem,cpu_utilization\n")
+            for slice_number in range(len(result["active_hosts"])):
+                f.write(','.join([str(slice_number), str(result["active_hosts"][slice_number])] +\
+                    [str(round(float(result[column][slice_number]), 4)) for column in ["allocated_cpu", "allocated_mem", "cpu_utilization"]]) + "\n")
+
+    def __choose_host(self, free_cpu : np.ndarray, free_mem : np.ndarray, cpu : int, mem : float):
+        """Return host index chosen for a VM following placement strategy, -1 if no opened host fits
+
+        Parameters
+        ----------
+        free_cpu : np.ndarray
+            free cores of opened hosts
+        free_mem : np.ndarray
+            free memory of opened hosts
+        cpu : int
+            VM cores
+        mem : float
+            VM memory
+
+        Returns
+        -------
+        host : int
+            chosen host index, -1 if none
+        """
+        fits = (free_cpu >= cpu) & (free_mem >= mem)
+        if not fits.any(): return -1
+        if self.strategy == "ffd": return int(np.argmax(fits))
+        # Best fit: smallest remaining capacity (cpu and mem relative to host size) after placement
+        remaining = (free_cpu - cpu)/self.host_cpu + (free_mem - mem)/self.host_mem
+        return int(np.argmin(np.where(fits, remaining, np.inf)))
+
+    def __build_result(self, fleet : VmFleet, placement : np.ndarray, host_count : int, active_hosts : np.ndarray, start : np.ndarray, end : np.ndarray):
+        """Compute per-slice utilization from VM presence and usage
+
+        Returns
+        -------
+        result : dict
+            see simulate
+        """
+        number_of_slices = fleet.get_number_of_slices()
+        # Per-slice sums of allocated resources, from +/- presence deltas
+        allocated_cpu = np.zeros(number_of_slices + 1)
+        allocated_mem = np.zeros(number_of_slices + 1)
+        present = end > start
+        np.add.at(allocated_cpu, start[present], fleet.cpu[present])
+        np.add.at(allocated_cpu, end[present], -fleet.cpu[present])
+        np.add.at(allocated_mem, start[present], fleet.mem[present])
+        np.add.at(allocated_mem, end[present], -fleet.mem[present])
+        allocated_cpu = np.cumsum(allocated_cpu)[:number_of_slices]
+        allocated_mem = np.cumsum(allocated_mem)[:number_of_slices]
+        used_cpu = np.zeros(number_of_slices)
+        if fleet.usage.shape[1] == number_of_slices:
+            rows_per_chunk = max(1, self.max_cells_per_chunk // max(1, number_of_slices))
+            for chunk_begin in range(0, len(fleet), rows_per_chunk):
+                chunk = slice(chunk_begin, chunk_begin + rows_per_chunk)
+                used_cpu += fleet.cpu[chunk].astype(np.int64) @ fleet.usage[chunk].astype(np.int64) / 100
+        cpu_capacity = max(host_count, 1)*self.host_cpu
+        mem_capacity = max(host_count, 1)*self.host_mem
+        return {"host_count" : host_count,
+            "placement" : placement,
+            "allocated_cpu" : allocated_cpu/cpu_capacity,
+            "allocated_mem" : allocated_mem/mem_capacity,
+            "cpu_utilization" : used_cpu/cpu_capacity,
+            "active_hosts" : active_hosts}
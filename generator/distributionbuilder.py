@@ -8,6 +8,8 @@ import yaml
 import scipy.optimize
 import numpy as np
 from generator.vmmodel import *
+from generator.vmfleet import VmFleet
+from generator.stageprofiler import disabled_profiler
 
 class DistributionBuilder(object):
     """
@@ -20,6 +22,8 @@ class DistributionBuilder(object):
         cpu config (flavor) distribution
     config_mem : dict
         mem config (flavor) distribution
+    profiler : StageProfiler
+        measures scenario load (disabled by default)
 
     Public Methods
     -------
@@ -27,13 +31,19 @@ class DistributionBuilder(object):
         Generate a list of scenario-compliant VMs of the requested count.
     generate_set_from_config(cpu : int, mem : int):
         Generate a list of scenario-compliant VMs matching target CPU and memory totals.
+    generate_fleet_from_vm_number(number_of_vm : int):
+        Same as generate_set_from_vm_number, as a VmFleet
+    generate_fleet_from_config(cpu : int, mem : int):
+        Same as generate_set_from_config, as a VmFleet
     """
 
     def __init__(self, **kwargs):
         required_attributes = ["yaml_file"]
         for required_attribute in required_attributes:
             if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
-        self.__load_from_yaml(kwargs["yaml_file"])
+        self.profiler = kwargs["profiler"] if "profiler" in kwargs else disabled_profiler
+        with self.profiler.stage("yaml_load"):
+            self.__load_from_yaml(kwargs["yaml_file"])
     
     def __load_from_yaml(self, yaml_file : str):
         """Initiate attributes from yaml config file
@@ -74,15 +84,51 @@ class DistributionBuilder(object):
         display : bool 
             Display information to the operator
         """
+        flavor_list = self.__generate_flavor_list_from_vm_number(number_of_vm)
+        vm_list = self.__generate_set_from_flavor_list(flavor_list)
+        if display: self.__display_list(vm_list)
+        return vm_list
+
+    def generate_fleet_from_vm_number(self, number_of_vm : int, display : bool = True):
+        """ Generate a fleet of n (number_of_vm) VMs while respecting builder constraints
+
+        Parameters
+        ----------
+        number_of_vm : int
+            number of requested VM
+        display : bool 
+            Display information to the operator
+
+        Returns
+        -------
+        fleet : VmFleet
+            generated VMs as columns
+        """
+        flavor_list = self.__generate_flavor_list_from_vm_number(number_of_vm)
+        fleet = self.__generate_fleet_from_flavor_list(flavor_list)
+        if display: self.__display_fleet(fleet)
+        return fleet
+
+    def __generate_flavor_list_from_vm_number(self, number_of_vm : int):
+        """ Generate list of VM flavor as a list of tuple (cpu, mem) for n (number_of_vm) VMs
+
+        Parameters
+        ----------
+        number_of_vm : int
+            number of requested VM
+
+        Returns
+        -------
+        flavor_list
+            list of tuple (cpu, mem)
+        """
         flavor_list = list()
         for cpu_flavor, cpu_freq in self.config_cpu.items():
             number_of_required_vms = int(cpu_freq*number_of_vm)
             flavor_list.extend([(cpu_flavor, None) for x in range(number_of_required_vms)])
 
         self.__update_flavor_mem_distribution(flavor_list=flavor_list) # Update list with memory intel
-        vm_list = self.__generate_set_from_flavor_list(flavor_list)
-        if display: self.__display_list(vm_list)
-        return vm_list
+        return flavor_list
 
     def generate_set_from_config(self, cpu : int, mem : int, display : bool = True):
         """ Generate a list of VM from the cpu and memory node configuration while respecting builder constraints
@@ -102,6 +148,29 @@ class DistributionBuilder(object):
         if display: self.__display_list(vm_list, cpu, mem)
         return vm_list
 
+    def generate_fleet_from_config(self, cpu : int, mem : int, display : bool = True):
+        """ Generate a fleet of VM from the cpu and memory node configuration while respecting builder constraints
+
+        Parameters
+        ----------
+        cpu : int
+            number of virtual CPU available
+        mem : int
+            number of Go available
+        display : bool 
+            Display information to the operator
+
+        Returns
+        -------
+        fleet : VmFleet
+            generated VMs as columns
+        """
+        flavor_list = self.__generate_flavor_cpu_distribution(cpu=cpu) # Generate list of flavor with CPU intel
+        self.__update_flavor_mem_distribution(flavor_list=flavor_list) # Update list with memory intel
+        fleet = self.__generate_fleet_from_flavor_list(flavor_list)
+        if display: self.__display_fleet(fleet, cpu, mem)
+        return fleet
+
     def __generate_flavor_cpu_distribution(self, cpu : int):
         """ Generate list of potential VM as a list of tuple (cpu, mem) where mem is not initialized. 
         List is generated with a research operational approach where we maximise CPU usage while respecting VM size distribution
@@ -225,6 +294,16 @@ class DistributionBuilder(object):
             vm_list.append(VmModel(cpu=flavor_cpu, mem=flavor_mem))
         return vm_list
 
+    def __generate_fleet_from_flavor_list(self, flavor_list : list):
+        """ Generate a fleet of VM from a flavor list.
+
+        Parameters
+        ----------
+        flavor_list : list
+            list of flavor implemented
+        """
+        return VmFleet(cpu=[flavor_cpu for flavor_cpu, flavor_mem in flavor_list], mem=[flavor_mem for flavor_cpu, flavor_mem in flavor_list])
+
     def __display_list(self, vm_list : list, cpu_objective : int = None, mem_objective : int = None):
         """ Print informations on generated vm list
         Parameters
@@ -251,6 +330,26 @@ class DistributionBuilder(object):
         print("Total vcpu", cpu_total) if cpu_objective is None else print("Total vcpu", cpu_total, "/", cpu_objective)
         print("Total mem", mem_total) if mem_objective is None else print("Total mem", mem_total, "/", mem_objective) 
 
+    def __display_fleet(self, fleet : VmFleet, cpu_objective : int = None, mem_objective : int = None):
+        """ Print informations on generated fleet
+        Parameters
+        ----------
+        fleet : VmFleet
+            fleet of VMs
+        cpu_objective : int
+            sum of cores specified at the generation
+        mem_objective : int
+            sum of mem specified at the generation step
+        """
+        configs, counts = np.unique(np.stack((fleet.cpu, fleet.mem), axis=1), axis=0, return_counts=True)
+        for (cpu_config, mem_config), count in zip(configs, counts):
+            mem_config = int(mem_config) if float(mem_config).is_integer() else mem_config
+            print(str(int(cpu_config)) + "c-" + str(mem_config) + "gb :", count, "vm")
+        cpu_total, mem_total = (int(np.sum(fleet.cpu)), float(np.sum(fleet.mem)))
+        print("Total VM", len(fleet))
+        print("Total vcpu", cpu_total) if cpu_objective is None else print("Total vcpu", cpu_total, "/", cpu_objective)
+        print("Total mem", mem_total) if mem_objective is None else print("Total mem", mem_total, "/", mem_objective) 
+
     def __reduce_freq_to_one(self, dict_to_reduce):
         """ Reduce a dict of frequencies so its values are equals to one
         Parameters
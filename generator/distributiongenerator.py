@@ -2,22 +2,53 @@
 
 Provides Gaussian (from avg/percentile) and heavy-tail (Weibull) distributions
 used when building per-VM CPU usage and when spreading VM start times over slices.
+Gaussian distributions are folded (absolute value of a normal variable): their
+sigma is solved by bisection on the folded-normal CDF so that the requested
+percentile matches, then values are sampled directly. Quantile tables of these
+distributions are kept in a bounded LRU cache keyed by (avg, percentile), so
+drawing a value is a table lookup plus an inverse-CDF draw.
 """
+from collections import OrderedDict
 import numpy as np
+from scipy.special import ndtr
 
 class DistributionGenerator(object):
     """
     A class used to generate an statistic distribution
     ...
 
+    Attributes
+    ----------
+    quantile_cache : OrderedDict
+        (avg, percentile) -> quantile table of the folded gaussian, least recently used first
+
     Public Methods
     -------
     generate_gaussian_distribution_from_avg(workload_avg, workload_95th):
         Generate a gaussian distribution
+    generate_gaussian_distributions_from_avg(workload_avg, workload_95th):
+        Generate a gaussian distribution for each (avg, percentile) couple
+    solve_folded_normal_sigma(workload_avg, workload_95th):
+        Compute gaussian parameters matching avg and percentile
+    sample_folded_normal(mu, sigma, size):
+        Draw values from a folded gaussian
+    get_gaussian_quantiles(workload_avg, workload_95th):
+        Return (cached) quantile table of the gaussian matching avg and percentile
+    get_gaussian_quantiles_table(workload_avg, workload_95th):
+        Return (cached) quantile tables of several (avg, percentile) couples
     generate_heavy_tail_gaussian_for_deployments(number_of_vms, number_of_values):
         Generate an heavy tail distribution
     """
 
+    distribution_size = 1000 # number of values drawn per gaussian distribution
+    solver_iterations = 60 # bisection steps used to solve sigma
+    quantile_cache_size = 2048 # (avg, percentile) couples kept in cache (avg and percentile are in 0..100)
+    quantile_batch_size = 256 # couples whose quantiles are computed at once
+    quantile_grid_size = 4096 # points on which folded gaussian CDF is evaluated before inversion
+
+    def __init__(self):
+        self.quantile_cache = OrderedDict()
+
     def generate_gaussian_distribution_from_avg(self, workload_avg : int, workload_95th : int):
         """Generate a gaussian distribution matching vm model specifications
 
@@ -33,19 +64,155 @@ class DistributionGenerator(object):
         x : list
             list of cpu usage value following a gaussian distribution
         """
-        mu, sigma = workload_avg, workload_95th
-        if mu<=0: mu=1
-        while True:
-            s = np.random.normal(mu, sigma, 1000)
-            x = [abs(item) for item in s]
-            if (np.percentile(x,95)<=workload_95th):
-                break
-            sigma-=0.25
-            if(sigma<=0):
-                sigma=1
-                s = np.random.normal(mu, sigma, 100)
-                break
-        return x
+        mu, sigma = self.solve_folded_normal_sigma(workload_avg, workload_95th)
+        return self.sample_folded_normal(float(mu), float(sigma), self.distribution_size).tolist()
+
+    def generate_gaussian_distributions_from_avg(self, workload_avg : np.ndarray, workload_95th : np.ndarray):
+        """Generate a gaussian distribution for each (avg, percentile) couple at once
+
+        Parameters
+        ----------
+        workload_avg : np.ndarray
+            average values for gaussian distributions
+        workload_95th : np.ndarray
+            percentile values for gaussian distributions
+
+        Returns
+        -------
+        x : np.ndarray
+            matrix of cpu usage values, one distribution per row
+        """
+        mu, sigma = self.solve_folded_normal_sigma(workload_avg, workload_95th)
+        return self.sample_folded_normal(mu[:, None], sigma[:, None], (len(mu), self.distribution_size))
+
+    def solve_folded_normal_sigma(self, workload_avg, workload_95th, percentile : float = 95):
+        """Compute (mu, sigma) of a gaussian whose absolute value has its percentile at workload_95th
+        Largest sigma in ]0; workload_95th] is kept. When unreachable (percentile too close to average), sigma is set to 1
+
+        Parameters
+        ----------
+        workload_avg : int or np.ndarray
+            average value(s) for gaussian distribution
+        workload_95th : int or np.ndarray
+            percentile value(s) for gaussian distribution
+        percentile : float
+            percentile considered
+
+        Returns
+        -------
+        mu : np.ndarray
+            gaussian mean(s), average being forced to be at least 1
+        sigma : np.ndarray
+            gaussian standard deviation(s)
+        """
+        mu = np.maximum(np.asarray(workload_avg, dtype=float), 1)
+        bound = np.asarray(workload_95th, dtype=float)
+        mu, bound = np.broadcast_arrays(mu, bound)
+        target = percentile/100
+        folded_cdf = lambda sigma : ndtr((bound - mu)/sigma) - ndtr((-bound - mu)/sigma)
+        # Folded normal cdf at bound decreases with sigma: bisect between ~0 and bound
+        low = np.full(mu.shape, 1e-9)
+        high = np.maximum(bound, low)
+        for _ in range(self.solver_iterations):
+            middle = (low + high)/2
+            matching = folded_cdf(middle) >= target
+            low = np.where(matching, middle, low)
+            high = np.where(matching, high, middle)
+        sigma = np.where(folded_cdf(np.maximum(bound, 1e-9)) >= target, bound, low)
+        sigma = np.where((bound > 0) & (folded_cdf(low) >= target), sigma, 1.)
+        return mu, sigma
+
+    def sample_folded_normal(self, mu, sigma, size):
+        """Draw values from a folded gaussian (absolute values of a gaussian)
+
+        Parameters
+        ----------
+        mu : float or np.ndarray
+            gaussian mean(s)
+        sigma : float or np.ndarray
+            gaussian standard deviation(s)
+        size : int or tuple
+            output shape
+
+        Returns
+        -------
+        x : np.ndarray
+            drawn values
+        """
+        return np.abs(np.random.normal(mu, sigma, size))
+
+    def get_gaussian_quantiles(self, workload_avg : int, workload_95th : int):
+        """Return quantile table of the folded gaussian matching avg and percentile.
+        Drawing a uniform index in this table is an inverse-CDF draw of the distribution
+
+        Parameters
+        ----------
+        workload_avg : int
+            average value for gaussian distribution
+        workload_95th : int
+            percentile value for gaussian distribution
+
+        Returns
+        -------
+        quantiles : np.ndarray
+            distribution_size quantiles (at probabilities (i+0.5)/distribution_size), a copy: cache is not affected if modified
+        """
+        return self.get_gaussian_quantiles_table([workload_avg], [workload_95th])[0]
+
+    def get_gaussian_quantiles_table(self, workload_avg, workload_95th):
+        """Return quantile tables of several (avg, percentile) couples, computing missing ones at once
+
+        Parameters
+        ----------
+        workload_avg : list or np.ndarray
+            average values for gaussian distributions
+        workload_95th : list or np.ndarray
+            percentile values for gaussian distributions
+
+        Returns
+        -------
+        quantiles : np.ndarray
+            matrix of quantiles, one distribution per row
+        """
+        keys = [(int(avg), int(per)) for avg, per in zip(workload_avg, workload_95th)]
+        missing = list(dict.fromkeys([key for key in keys if key not in self.quantile_cache]))
+        computed = dict()
+        for batch_begin in range(0, len(missing), self.quantile_batch_size):
+            batch = np.array(missing[batch_begin:batch_begin+self.quantile_batch_size])
+            mu, sigma = self.solve_folded_normal_sigma(batch[:, 0], batch[:, 1])
+            for key, quantiles in zip(missing[batch_begin:batch_begin+self.quantile_batch_size], self.__compute_folded_normal_quantiles(mu, sigma)):
+                computed[key] = quantiles
+        table = np.empty((len(keys), self.distribution_size))
+        for row, key in enumerate(keys):
+            table[row] = computed[key] if key in computed else self.quantile_cache[key]
+        for key in keys: # refresh usage order, evicting least recently used tables
+            self.quantile_cache[key] = computed[key] if key in computed else self.quantile_cache[key]
+            self.quantile_cache.move_to_end(key)
+        while len(self.quantile_cache) > self.quantile_cache_size:
+            self.quantile_cache.popitem(last=False)
+        return table
+
+    def __compute_folded_normal_quantiles(self, mu : np.ndarray, sigma : np.ndarray):
+        """Compute quantiles of folded gaussians by inverting their CDF evaluated on a regular grid
+
+        Parameters
+        ----------
+        mu : np.ndarray
+            gaussian means
+        sigma : np.ndarray
+            gaussian standard deviations
+
+        Returns
+        -------
+        quantiles : np.ndarray
+            matrix of quantiles at probabilities (i+0.5)/distribution_size, one distribution per row
+        """
+        probabilities = (np.arange(self.distribution_size) + 0.5)/self.distribution_size
+        grid = np.linspace(0, 1, self.quantile_grid_size)
+        upper = np.abs(mu) + 10*sigma # folded cdf is ~1 there
+        x = grid[None, :]*upper[:, None]
+        cdf = ndtr((x - mu[:, None])/sigma[:, None]) - ndtr((-x - mu[:, None])/sigma[:, None])
+        return np.stack([np.interp(probabilities, row_cdf, row_x) for row_cdf, row_x in zip(cdf, x)])
 
     def generate_heavy_tail_gaussian_for_deployments(self, number_of_vms: int, number_of_values : int, weibull_form : float = 1.):
         """ Generate an heavy tail gaussian to spread a certain number of VMs through a number of deployments (in our context, slices of a scope)
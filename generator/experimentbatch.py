@@ -0,0 +1,239 @@
+"""Batch of experiments sharing loaded scenarios.
+
+ExperimentBatch runs every experiment listed in a YAML manifest (VM count or
+cpu/mem objective, temporality, seed) while parsing distribution, usage and
+workload scenarios only once: builders are kept between experiments and only
+their temporality and state are updated. Experiments may be spread on a pool of
+processes, each worker loading scenarios once. Every experiment is written in
+its own output folder.
+
+Manifest example:
+
+    experiments:
+      - name: azure-100            # output folder (default: experiment-{index})
+        vm: 100
+        seed: 1                    # optional, seeds random and np.random
+      - name: azure-256-512
+        cpu: 256
+        mem: 512
+        temporality: 360,8640,7    # optional, slice,scope,iteration
+"""
+import os, random, yaml
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from generator.distributionbuilder import DistributionBuilder
+from generator.usagebuilder import UsageBuilder
+from generator.workloadbuilder import WorkloadBuilder
+from generator.experimentgenerator import ExperimentGenerator
+from generator.clustersimulator import ClusterSimulator
+from generator.stageprofiler import disabled_profiler
+from generator.vmmodel import *
+
+class ExperimentBatch(object):
+    """
+    A class used to run a batch of experiments with scenarios loaded once
+    ...
+
+    Attributes
+    ----------
+    experiments : list
+        experiments (as dict) loaded from manifest
+    distribution_file : str
+        distribution scenario location
+    usage_file : str
+        usage scenario location
+    workload_file : str
+        workload scenario location
+    temporality : tuple
+        default (slice duration, scope duration, number of scope) of experiments
+    lazy_commands : bool
+        generate workload commands on demand while exporting
+    output_format : list
+        output formats written for each experiment (bash, cloudsimplus, cbtool)
+    compress : bool
+        gzip compress written outputs
+    compact : bool
+        cloudsimplus output as compact csv files
+    search : bool
+        cloudsimplus program searches the minimum host count
+    sizing : dict
+        ClusterSimulator arguments if placement must be simulated for each experiment, None otherwise
+    export : str
+        export file (or folder) name written in each experiment folder, None otherwise
+    export_format : str
+        export format (json, jsonl or npy)
+    profiler : StageProfiler
+        measures stages of experiments run in current process (disabled by default)
+    generator : ExperimentGenerator
+        generator holding loaded builders (built on first experiment of a process)
+
+    Public Methods
+    -------
+    run(workers):
+        Run all experiments, sequentially or on a pool of processes
+    run_experiment(experiment):
+        Generate and write a single experiment
+    """
+
+    def __init__(self, **kwargs):
+        required_attributes = ["manifest", "distribution", "usage", "workload"]
+        for required_attribute in required_attributes:
+            if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
+        self.distribution_file = kwargs["distribution"]
+        self.usage_file = kwargs["usage"]
+        self.workload_file = kwargs["workload"]
+        self.temporality = kwargs["temporality"] if "temporality" in kwargs else (3600, 86400, 12)
+        self.lazy_commands = kwargs["lazy_commands"] if "lazy_commands" in kwargs else False
+        self.output_format = kwargs["output_format"] if "output_format" in kwargs else list()
+        self.compress = kwargs["compress"] if "compress" in kwargs else False
+        self.compact = kwargs["compact"] if "compact" in kwargs else False
+        self.search = kwargs["search"] if "search" in kwargs else False
+        self.sizing = kwargs["sizing"] if "sizing" in kwargs else None
+        self.export = kwargs["export"] if "export" in kwargs else None
+        self.export_format = kwargs["export_format"] if "export_format" in kwargs else "json"
+        self.profiler = kwargs["profiler"] if "profiler" in kwargs else disabled_profiler
+        self.generator = None
+        self.__load_from_yaml(kwargs["manifest"])
+
+    def __load_from_yaml(self, yaml_file : str):
+        """Load experiments from manifest
+
+        Parameters
+        ----------
+        yaml_file : str
+            Yaml file location
+
+        Raises
+        ------
+        ValueError
+            If an experiment has no objective or if two experiments share an output folder
+        """
+        with open(yaml_file, 'r') as file:
+            yaml_as_dict = yaml.full_load(file)
+
+        self.experiments = list()
+        for index, experiment in enumerate(yaml_as_dict["experiments"]):
+            experiment = dict(experiment)
+            if ("vm" not in experiment) and not (("cpu" in experiment) and ("mem" in experiment)):
+                raise ValueError("Experiment must specify either [cpu and mem] or [vm] objective", experiment)
+            if "name" not in experiment: experiment["name"] = "experiment-" + str(index)
+            experiment["temporality"] = self.__get_temporality(experiment)
+            self.experiments.append(experiment)
+        names = [experiment["name"] for experiment in self.experiments]
+        if len(set(names)) != len(names): raise ValueError("Experiments must have distinct names", names)
+
+    def __get_temporality(self, experiment : dict):
+        """Return (slice duration, scope duration, number of scope) of an experiment, batch default if unspecified
+
+        Raises
+        ------
+        ValueError
+            If format is invalid or constraints are violated
+        """
+        if "temporality" not in experiment: return tuple(self.temporality)
+        values = experiment["temporality"]
+        if isinstance(values, str): values = values.split(',')
+        if len(values) != 3: raise ValueError("Invalid length on temporality", values)
+        slice_duration, scope_duration, number_of_scope = [int(value) for value in values]
+        if slice_duration > scope_duration:
+            raise ValueError("Model scope must be greater than slice scope")
+        if scope_duration % slice_duration !=0:
+            raise ValueError("Model scope must be a slice multiple")
+        return slice_duration, scope_duration, number_of_scope
+
+    def __getstate__(self):
+        """Loaded builders are not sent to pool workers: each worker loads its own"""
+        state = self.__dict__.copy()
+        state["generator"] = None
+        return state
+
+    def run(self, workers : int = 1):
+        """Run all experiments of the manifest
+
+        Parameters
+        ----------
+        workers : int
+            number of processes (experiments are run in current process if 1)
+
+        Returns
+        -------
+        results : list
+            (output folder, generated VM count) of each experiment, in manifest order
+        """
+        if workers <= 1 or len(self.experiments) <= 1:
+            return [self.run_experiment(experiment) for experiment in self.experiments]
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(self,)) as executor:
+            return list(executor.map(run_worker_experiment, range(len(self.experiments))))
+
+    def run_experiment(self, experiment : dict):
+        """Generate an experiment and write its outputs in a folder named after it
+        VM ids start from 0 in each experiment. If a seed is specified, random and np.random are seeded before generation
+
+        Parameters
+        ----------
+        experiment : dict
+            experiment from manifest
+
+        Returns
+        -------
+        result : tuple
+            (output folder, generated VM count)
+        """
+        slice_duration, scope_duration, number_of_scope = experiment["temporality"]
+        generator = self.__get_generator(slice_duration, int(scope_duration / slice_duration), number_of_scope)
+        VmModel.vm_count = 0
+        if "seed" in experiment:
+            random.seed(experiment["seed"])
+            np.random.seed(experiment["seed"])
+        print("Running experiment", experiment["name"])
+        if "vm" in experiment:
+            fleet = generator.gen_fleet(vm_number=experiment["vm"], number_of_scope=number_of_scope)
+        else:
+            fleet = generator.gen_fleet(cpu=experiment["cpu"], mem=experiment["mem"], number_of_scope=number_of_scope)
+        self.__write_outputs(generator, fleet, slice_duration, experiment["name"])
+        return experiment["name"], len(fleet)
+
+    def __get_generator(self, slice_duration : int, slices_per_scope : int, number_of_scope : int):
+        """Return generator with builders set for the given temporality. Scenarios are loaded on first call only
+
+        Returns
+        -------
+        generator : ExperimentGenerator
+            generator with loaded builders
+        """
+        if self.generator is None:
+            distribution_builder = DistributionBuilder(yaml_file=self.distribution_file, profiler=self.profiler)
+            usage_builder = UsageBuilder(yaml_file=self.usage_file, slices_per_scope=slices_per_scope, number_of_scope=number_of_scope, profiler=self.profiler)
+            workload_builder = WorkloadBuilder(yaml_file=self.workload_file, slice_duration=slice_duration, lazy_commands=self.lazy_commands, profiler=self.profiler)
+            self.generator = ExperimentGenerator(distribution_builder=distribution_builder, usage_builder=usage_builder, workload_builder=workload_builder, profiler=self.profiler)
+            return self.generator
+        self.generator.usage_builder.set_temporality(slices_per_scope, number_of_scope)
+        self.generator.usage_builder.reset()
+        self.generator.workload_builder.set_slice_duration(slice_duration)
+        return self.generator
+
+    def __write_outputs(self, generator : ExperimentGenerator, fleet, slice_duration : int, output_folder : str):
+        """Write requested formats, sizing (sizing.csv) and export of an experiment in its output folder"""
+        for output_type in self.output_format:
+            generator.write(output_type=output_type, vm_list=fleet, slice_duration=slice_duration,
+                compress=self.compress, compact=self.compact, search=self.search, output_folder=output_folder)
+        os.makedirs(output_folder, exist_ok=True)
+        if self.sizing is not None:
+            simulator = ClusterSimulator(**self.sizing)
+            with self.profiler.stage("cluster_sizing", items=len(fleet)):
+                result = simulator.simulate(fleet)
+            print("Cluster sizing of", output_folder + ":", result["host_count"], "host(s)")
+            simulator.write_utilization(result, os.path.join(output_folder, 'sizing.csv'))
+        if self.export is not None:
+            generator.export(fleet, os.path.join(output_folder, self.export), self.export_format)
+
+worker_batch = None # ExperimentBatch of a pool worker process
+
+def init_worker(batch : ExperimentBatch):
+    """Pool initializer: keep batch in worker process (scenarios are loaded on its first experiment)"""
+    global worker_batch
+    worker_batch = batch
+
+def run_worker_experiment(index : int):
+    """Pool task: run experiment of given manifest index in worker process"""
+    return worker_batch.run_experiment(worker_batch.experiments[index])
@@ -1,9 +1,17 @@
+import os, random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from generator.vmmodel import VmModel, VmModelEncoder
+from generator.vmfleet import VmFleet
 from generator.distributionbuilder import DistributionBuilder
 from generator.usagebuilder import UsageBuilder
 from generator.workloadbuilder import WorkloadBuilder
 from generator.exporter.exporterbash import ExporterBash
 from generator.exporter.exportercloudsimplus import ExporterCloudSimPlus
 from generator.exporter.exportercbtool import ExporterCBTool
+from generator.exporter.exporterwriter import ExporterWriter
+from generator.jsonlinesvmlist import JsonLinesVmList
+from generator.stageprofiler import disabled_profiler
 
 class ExperimentGenerator(object):
     """
@@ -17,15 +25,29 @@ class ExperimentGenerator(object):
         Used to assign usage profiles and CPU usage over time to VMs.
     workload_builder : WorkloadBuilder
         Used to assign workload types and generate per-VM workload commands.
+    profiler : StageProfiler
+        Measures flavor solving, outputs and exports (disabled by default). Builders hold their own.
 
     Public Methods
     -------
     gen(**kwargs)
         Generate the list of VmModel for the experiment.
+    gen_fleet(**kwargs)
+        Generate the experiment as a VmFleet.
+    gen_sweep(vm_numbers, number_of_scope)
+        Generate nested fleets of increasing VM counts from a single generation.
+    gen_sharded(shards, workers, seed, **kwargs)
+        Generate the experiment as a VmFleet from independent shards, possibly on a pool of processes.
+    gen_shard(seed_sequence, **kwargs)
+        Generate a single shard from its own random substream.
     write(output_type, vm_list, slice_duration)
         Export the VM list to bash, cloudsimplus, or cbtool format.
+    export(vm_list, location, export_format)
+        Save the VM list as json, json lines or as a folder of .npy columns (to be loaded again).
     """
 
+    valid_export_formats = ["json", "jsonl", "npy"]
+
     def __init__(self, **kwargs):
         required_attributes = ["distribution_builder", "usage_builder", "workload_builder"]
         for required_attribute in required_attributes:
@@ -33,6 +55,7 @@ class ExperimentGenerator(object):
         self.distribution_builder=kwargs["distribution_builder"]
         self.usage_builder=kwargs["usage_builder"]
         self.workload_builder=kwargs["workload_builder"]
+        self.profiler = kwargs["profiler"] if "profiler" in kwargs else disabled_profiler
 
     def gen(self, **kwargs):
         """Generate experiment related scripts
@@ -48,41 +71,264 @@ class ExperimentGenerator(object):
         ------
         ValueError
             If (cpu,mem) and vm_number are not specified (one of the two must be)
+
+        Returns
+        -------
+        vm_list : list
+            list of VmModel (views on the generated fleet)
         """
-        # Configuration on first round based on vm number or cpu/mem objective
-        print("Building initial distribution")
-        if ("cpu" in kwargs) and ("mem" in kwargs):
-            vm_list = self.distribution_builder.generate_set_from_config(kwargs["cpu"], kwargs["mem"])
-        elif ("vm_number" in kwargs):
-            vm_list = self.distribution_builder.generate_set_from_vm_number(kwargs["vm_number"])
+        return self.gen_fleet(**kwargs).to_vm_list()
+
+    def gen_fleet(self, **kwargs):
+        """Generate experiment VMs as a columnar VmFleet (see gen for arguments)
+
+        Returns
+        -------
+        fleet : VmFleet
+            generated VMs
+        """
+        fleet_parts = self.__gen_fleet_parts(**kwargs)
+        fleet = fleet_parts[0]
+        for additional_fleet in fleet_parts[1:]:
+            fleet.extend(additional_fleet)
+        return fleet
+
+    def gen_sharded(self, shards : int, workers : int = 1, seed : int = None, **kwargs):
+        """Generate experiment VMs as a columnar VmFleet, splitting the objective (vm_number, or cpu and mem) in shards
+        generated independently, sequentially or on a pool of processes (see gen for arguments)
+        Each shard draws from its own random substream, spawned from seed, and numbers its VMs from 0: ids are offset
+        when shards are merged (in shard order). For a given seed and shard count, fleet does not depend on workers count.
+        As flavor counts and arrivals are computed per shard (rounded down), sharded fleets may have slightly less VMs than unsharded ones.
+
+        Parameters
+        ----------
+        shards : int
+            number of shards (reduced to objective if larger)
+        workers : int
+            number of processes (shards are generated in current process if 1)
+        seed : int
+            root of random substreams (taken from system entropy if None)
+
+        Returns
+        -------
+        fleet : VmFleet
+            generated VMs
+        """
+        shard_objectives = self.__split_objective(shards, **kwargs)
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(shard_objectives))
+        first_id = VmModel.vm_count
+        if workers <= 1 or len(shard_objectives) <= 1:
+            shard_fleets = [self.gen_shard(seed_sequence, **shard_objective) for shard_objective, seed_sequence in zip(shard_objectives, seed_sequences)]
         else:
-            raise ValueError("You must specified either [cpu and mem] or [vm_number] objective")
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_shard_worker, initargs=(self,)) as executor:
+                shard_fleets = list(executor.map(gen_worker_shard, shard_objectives, seed_sequences))
+        fleet = shard_fleets[0]
+        fleet.id += first_id
+        for shard_fleet in shard_fleets[1:]:
+            shard_fleet.id += first_id + len(fleet)
+            fleet.extend(shard_fleet)
+        VmModel.vm_count = first_id + len(fleet)
+        return fleet
+
+    def gen_shard(self, seed_sequence : np.random.SeedSequence, **kwargs):
+        """Generate a shard as a VmFleet (see gen for arguments), from a fresh state: VM ids start from 0,
+        usage builder forgets previous generations, random and np.random are seeded from seed_sequence
+
+        Returns
+        -------
+        fleet : VmFleet
+            generated VMs
+        """
+        VmModel.vm_count = 0
+        self.usage_builder.reset()
+        state = seed_sequence.generate_state(5)
+        random.seed(int(state[0]))
+        np.random.seed(state[1:])
+        return self.gen_fleet(**kwargs)
+
+    def __split_objective(self, shards : int, **kwargs):
+        """Split generation objective (vm_number, or cpu and mem) in (at most) shards parts, as even as possible
+
+        Returns
+        -------
+        shard_objectives : list
+            gen arguments of each shard
+
+        Raises
+        ------
+        ValueError
+            If (cpu,mem) and vm_number are not specified (one of the two must be)
+        """
+        if shards <= 0: raise ValueError("Shard count must be positive", shards)
+        if ("cpu" in kwargs) and ("mem" in kwargs): split_keys = ["cpu", "mem"]
+        elif ("vm_number" in kwargs): split_keys = ["vm_number"]
+        else: raise ValueError("You must specified either [cpu and mem] or [vm_number] objective")
+        shards = max(1, min([shards] + [int(kwargs[key]) for key in split_keys]))
+        shard_objectives = list()
+        for shard_index in range(shards):
+            shard_objective = dict(kwargs)
+            for key in split_keys:
+                shard_objective[key] = int(kwargs[key]) // shards + (1 if shard_index < int(kwargs[key]) % shards else 0)
+            shard_objectives.append(shard_objective)
+        return shard_objectives
+
+    def gen_sweep(self, vm_numbers : list, number_of_scope : int):
+        """Generate fleets for a sweep on VM count (e.g. cluster sizing experiments) from a single generation
+        The largest fleet is generated once, smaller ones are nested prefixes of it: each VM of a smaller fleet
+        belongs to all larger ones. Prefixes are stratified on flavor, usage profile and workload so that each
+        of them keeps the generated distribution. VMs created on later scopes are kept in proportion of VM count.
 
-        self.usage_builder.attribute_usage_to_vm_list(vm_list)
-        self.workload_builder.attribute_workload_commands_to_vm_list(vm_list)
+        Parameters
+        ----------
+        vm_numbers : list
+            VM counts objectives at initialisation
+        number_of_scope : int
+            number of scopes of the experiment
+
+        Returns
+        -------
+        sweep : generator
+            (vm_number, fleet) couples, by increasing VM count (fleets are generated on first iteration)
+
+        Raises
+        ------
+        ValueError
+            If vm_numbers is empty or holds a non-positive count (on call), or if no initial VM is generated (on first iteration)
+        """
+        vm_numbers = sorted(vm_numbers)
+        if (not vm_numbers) or vm_numbers[0] <= 0:
+            raise ValueError("Sweep VM counts must be positive", vm_numbers)
+        return self.__gen_sweep_steps(vm_numbers, number_of_scope)
+
+    def __gen_sweep_steps(self, vm_numbers : list, number_of_scope : int):
+        """Generate the largest fleet, then yield its nested prefixes (see gen_sweep, vm_numbers being sorted and validated)"""
+        fleet_parts = self.__gen_fleet_parts(vm_number=vm_numbers[-1], number_of_scope=number_of_scope)
+        part_sizes = [len(fleet_part) for fleet_part in fleet_parts]
+        if part_sizes[0] <= 0:
+            raise ValueError("No initial VM generated for sweep", vm_numbers[-1])
+        part_orders = [self.__get_stratified_order(fleet_part) for fleet_part in fleet_parts]
+        part_offsets = np.cumsum([0] + part_sizes)
+        fleet = fleet_parts[0]
+        for additional_fleet in fleet_parts[1:]:
+            fleet.extend(additional_fleet)
+        for vm_number in vm_numbers:
+            indices = [part_offsets[part_index] + part_order[:round(part_sizes[part_index]*vm_number/part_sizes[0])]\
+                for part_index, part_order in enumerate(part_orders)]
+            yield vm_number, fleet.subset(np.sort(np.concatenate(indices)))
+
+    def __gen_fleet_parts(self, **kwargs):
+        """Generate experiment VMs as a list of VmFleet: initial VMs first, then VMs created on each additional scope (see gen for arguments)
+
+        Returns
+        -------
+        fleet_parts : list
+            list of VmFleet
+        """
+        # Configuration on first round based on vm number or cpu/mem objective
+        print("Building initial distribution")
+        with self.profiler.stage("flavor_solving") as measure:
+            if ("cpu" in kwargs) and ("mem" in kwargs):
+                fleet = self.distribution_builder.generate_fleet_from_config(kwargs["cpu"], kwargs["mem"])
+            elif ("vm_number" in kwargs):
+                fleet = self.distribution_builder.generate_fleet_from_vm_number(kwargs["vm_number"])
+            else:
+                raise ValueError("You must specified either [cpu and mem] or [vm_number] objective")
+            measure["items"] = len(fleet)
+
+        self.usage_builder.attribute_usage_to_vm_list(fleet)
+        self.workload_builder.attribute_workload_commands_to_vm_list(fleet)
+        fleet_parts = [fleet]
 
         additional_vm_count = self.usage_builder.get_overall_count_of_vm_to_be_created()
         if additional_vm_count <= 0: 
-            return vm_list
+            return fleet_parts
 
         for additional_scope in range(1, kwargs["number_of_scope"]):
             print("Building scope", additional_scope)
-            additional_vm = self.distribution_builder.generate_set_from_vm_number(additional_vm_count)
-            self.usage_builder.attribute_usage_to_vm_list(additional_vm, postponed_scope_start=additional_scope)
-            self.workload_builder.attribute_workload_commands_to_vm_list(additional_vm)
-            vm_list.extend(additional_vm)
+            with self.profiler.stage("flavor_solving") as measure:
+                additional_fleet = self.distribution_builder.generate_fleet_from_vm_number(additional_vm_count)
+                measure["items"] = len(additional_fleet)
+            self.usage_builder.attribute_usage_to_vm_list(additional_fleet, postponed_scope_start=additional_scope)
+            self.workload_builder.attribute_workload_commands_to_vm_list(additional_fleet)
+            fleet_parts.append(additional_fleet)
+
+        return fleet_parts
+
+    def __get_stratified_order(self, fleet):
+        """Return a random order of fleet VMs in which every prefix keeps strata proportions
+        Strata are VMs sharing flavor, usage profile and workload. Each VM receives a key (rank in its
+        shuffled stratum + stratum offset) / stratum size, with a random offset per stratum: sorting keys
+        interleaves strata, so a prefix holds each stratum in proportion of its size (rounded).
 
-        return vm_list
+        Parameters
+        ----------
+        fleet : VmFleet
+            fleet to be ordered
+
+        Returns
+        -------
+        order : np.ndarray
+            VM positions
+        """
+        if len(fleet) == 0: return np.zeros(0, dtype=np.int64)
+        strata_columns = np.stack((fleet.cpu, fleet.mem, fleet.profile, fleet.workload), axis=1)
+        strata = np.unique(strata_columns, axis=0, return_inverse=True)[1].reshape(-1)
+        strata_sizes = np.bincount(strata)
+        strata_starts = np.cumsum(strata_sizes) - strata_sizes
+        shuffled = np.random.permutation(len(fleet))
+        grouped = shuffled[np.argsort(strata[shuffled], kind='stable')] # grouped by stratum, shuffled within
+        rank = np.empty(len(fleet))
+        rank[grouped] = np.arange(len(fleet)) - strata_starts[strata[grouped]]
+        keys = (rank + np.random.random(len(strata_sizes))[strata])/strata_sizes[strata]
+        return np.argsort(keys, kind='stable')
 
-    def write(self, output_type : str, vm_list : list, slice_duration : int):
-        """Export vm_list to the given output format (bash, cloudsimplus, cbtool).
-        Writes files in the current working directory. Raises ValueError for invalid output_type."""
+    def write(self, output_type : str, vm_list : list, slice_duration : int, compress : bool = False, compact : bool = False, search : bool = False, output_folder : str = "."):
+        """Export vm_list (list of VmModel or VmFleet) to the given output format (bash, cloudsimplus, cbtool).
+        Writes files (gzip compressed if compress, compact csv for cloudsimplus if compact, cloudsimplus program searching minimum host count if search) in output_folder (created if needed, current working directory by default). Raises ValueError for invalid output_type."""
         if output_type == "bash":
-            exporter = ExporterBash(self.workload_builder.get_context("folder"))
+            exporter = ExporterBash(self.workload_builder.get_context("folder"), compress=compress, output_folder=output_folder)
         elif output_type == "cloudsimplus":
-            exporter = ExporterCloudSimPlus("static/cloudsimplus.skeleton")
+            exporter = ExporterCloudSimPlus("static/cloudsimplus.skeleton", compress=compress, compact=compact, search=search, output_folder=output_folder)
         elif output_type == "cbtool":
-            exporter = ExporterCBTool("static/cbtool.skeleton")
+            exporter = ExporterCBTool("static/cbtool.skeleton", compress=compress, output_folder=output_folder)
         else:
             raise ValueError("Invalid output type")
-        exporter.write(vm_list, slice_duration)
\ No newline at end of file
+        os.makedirs(output_folder, exist_ok=True)
+        with self.profiler.stage("output_" + output_type, items=len(vm_list)):
+            exporter.write(vm_list, slice_duration)
+
+    def export(self, vm_list, location : str, export_format : str = "json"):
+        """Save vm_list (list of VmModel or VmFleet) to be loaded again: as a json list of VM attributes, as json lines (one VM per line,
+        see JsonLinesVmList) or as a folder of .npy columns (see VmFleet.save, commands are generated again on load,
+        with the slice duration and workload scenario hash of workload_builder).
+        json and json lines are written VM per VM. Raises ValueError for invalid export_format."""
+        if export_format not in self.valid_export_formats:
+            raise ValueError("Invalid export format")
+        with self.profiler.stage("export_" + export_format, items=len(vm_list)):
+            if export_format == "npy":
+                fleet = vm_list if isinstance(vm_list, VmFleet) else VmFleet.from_vm_list(vm_list)
+                fleet.slice_duration = self.workload_builder.slice_duration
+                fleet.workload_hash = self.workload_builder.yaml_hash
+                fleet.save(location)
+            elif export_format == "jsonl":
+                JsonLinesVmList.write(vm_list, location)
+            elif export_format == "json":
+                encoder = VmModelEncoder()
+                with ExporterWriter(location) as f:
+                    f.write("[")
+                    for index, vm in enumerate(vm_list):
+                        if index > 0: f.write(", ")
+                        f.write(encoder.encode(vm))
+                    f.write("]")
+
+
+worker_generator = None # ExperimentGenerator of a pool worker process
+
+def init_shard_worker(generator : ExperimentGenerator):
+    """Pool initializer: keep (unpickled) generator in worker process"""
+    global worker_generator
+    worker_generator = generator
+
+def gen_worker_shard(shard_objective : dict, seed_sequence : np.random.SeedSequence):
+    """Pool task: generate a shard in worker process"""
+    return worker_generator.gen_shard(seed_sequence, **shard_objective)
@@ -1,10 +1,13 @@
 """Export CloudFactory VM workload to bash scripts.
 
 Produces setup.sh, setup-firewall-for-remote.sh, workload-local.sh, and
-workload-remote.sh in the current directory, invoking scripts from tool_folder
-(setupvm.sh, startvm.sh, etc.) per VM.
+workload-remote.sh in the output folder (current directory by default), invoking scripts from tool_folder
+(setupvm.sh, startvm.sh, etc.) per VM. Workload lines are streamed to disk
+command per command, so VM commands lists may be lazy iterables.
 """
+import os
 from generator.vmmodel import *
+from generator.exporter.exporterwriter import ExporterWriter
 
 class ExporterBash(object):
     """
@@ -14,15 +17,21 @@ class ExporterBash(object):
     ----------
     tool_folder : str
         Directory containing generic bash scripts (setupvm.sh, startvm.sh, etc.); trailing / added if missing.
+    compress : bool
+        gzip compress written scripts (.sh.gz) or not
+    output_folder : str
+        folder where scripts are written (current directory by default)
 
     Public Methods
     -------
     write(vm_list, slice_duration)
-        Write setup and workload scripts to the current directory.
+        Write setup and workload scripts to the output folder.
     """
     
-    def __init__(self, tool_folder : str):
+    def __init__(self, tool_folder : str, compress : bool = False, output_folder : str = "."):
         self.tool_folder = tool_folder
+        self.compress = compress
+        self.output_folder = output_folder
         if not self.tool_folder.endswith("/"):
             self.tool_folder+= "/"
 
@@ -49,7 +58,7 @@ class ExporterBash(object):
             context data, used for postponed command            
         """
         count=0
-        with open('setup.sh', 'w') as f:
+        with ExporterWriter(os.path.join(self.output_folder, 'setup.sh'), compress=self.compress) as f:
             f.write("#!/bin/bash\n")
             count=0
             for vm in vm_list:
@@ -58,7 +67,7 @@ class ExporterBash(object):
                 count+=1
                 if (count%10==0):
                     f.write('sleep 300\n')
-            print("Setup wrote in setup.sh") 
+            print("Setup wrote in", f.path) 
 
     def __write_workload_local(self, vm_list, slice_duration : int):
         """Generate a bash script to execute workload in local. Will be written at programm call location
@@ -67,12 +76,11 @@ class ExporterBash(object):
         slice_duration : int
             context data, used for postponed command
         """
-        with open('workload-local.sh', 'w') as f:
+        with ExporterWriter(os.path.join(self.output_folder, 'workload-local.sh'), compress=self.compress) as f:
             f.write("#!/bin/bash\n")
             for vm in vm_list:
-                f.write("( " +  self.__get_workload_line(vm, slice_duration) + ") &")
-                f.write('\n')
-        print("Workload wrote in workload-local.sh") 
+                self.__write_workload_line(f, vm, slice_duration)
+        print("Workload wrote in", f.path) 
 
     def __write_workload_remote(self, vm_list : list, slice_duration : int):
         """Generate a bash script to execute workload remotely. Will be written at programm call location
@@ -82,7 +90,7 @@ class ExporterBash(object):
             context data, used for postponed command
         """
         count=0
-        with open('workload-remote.sh', 'w') as f:
+        with ExporterWriter(os.path.join(self.output_folder, 'workload-remote.sh'), compress=self.compress) as f:
             f.write("#!/bin/bash\n")
             f.write("if (( \"$#\" != \"1\" ))\n")
             f.write("then\n")
@@ -91,16 +99,15 @@ class ExporterBash(object):
             f.write("fi\n")
             f.write("remoteip=\"$1\"\n")
             for vm in vm_list:
-                f.write("( " +  self.__get_workload_line(vm, slice_duration, remote = True) + ") &")
-                f.write('\n')
-            print("Workload wrote in workload-remote.sh") 
+                self.__write_workload_line(f, vm, slice_duration, remote = True)
+            print("Workload wrote in", f.path) 
 
     def __write_setup_remote(self, vm_list : list):
         """Generate a bash script to setup remote workload execution. Will be written at programm call location
         vm_list : list
             list of VM
         """
-        with open('setup-firewall-for-remote.sh', 'w') as f:
+        with ExporterWriter(os.path.join(self.output_folder, 'setup-firewall-for-remote.sh'), compress=self.compress) as f:
             f.write("#!/bin/bash\n")
             f.write("sudo firewall-cmd --reload\n")
             for vm in vm_list:
@@ -108,23 +115,24 @@ class ExporterBash(object):
                 f.write('\n')
             f.write("sudo firewall-cmd --direct --add-rule ipv4 nat POSTROUTING 0 -j MASQUERADE\n")
             f.write("sudo firewall-cmd --direct --add-rule ipv4 filter FORWARD 0 -d 0.0.0.0/0 -j ACCEPT\n")
-        print("Remote setup wrote in setup-firewall-for-remote.sh")
+        print("Remote setup wrote in", f.path)
 
-    def __get_workload_line(self, vm : VmModel, slice_duration : int, remote : bool = False):
-        """Return a string containing bash instruction to execute workload for given VM
+    def __write_workload_line(self, f, vm : VmModel, slice_duration : int, remote : bool = False):
+        """Write bash instruction executing workload for given VM, streaming its commands one by one
+        f : ExporterWriter
+            opened writer
         vm : VmModel
             Vm considered
         slice_duration : int
             context data, used for postponed command
         remote : bool
             Remotely execute workload or not (change vm identifier)
-
-        Return
-        ------
-        command : str
-            bash command as string
         """
-        return self.__vm_postponed_command(vm, slice_duration=slice_duration) + self.__vm_start_command(vm, self.tool_folder) + self.__vm_commands_as_str(vm, remote=remote) + self.__vm_shutdown_command(vm, self.tool_folder)
+        f.write("( " + self.__vm_postponed_command(vm, slice_duration=slice_duration) + self.__vm_start_command(vm, self.tool_folder))
+        for command in self.__vm_commands(vm, remote=remote):
+            f.write(command)
+        f.write(self.__vm_shutdown_command(vm, self.tool_folder) + ") &")
+        f.write('\n')
 
     def __vm_setup_command(self, vm : VmModel, folder : str):
         return folder + "setupvm.sh " + vm.get_name() + " " + str(vm.get_cpu()) + " " + str(round(vm.get_mem()*1024)) + " " + vm.get_workload() + " ; "
@@ -150,14 +158,12 @@ class ExporterBash(object):
         duration = postponed_slice*slice_duration
         return "sleep " + str(duration) + " ; "
 
-    def __vm_commands_as_str(self, vm : VmModel, remote : bool = False):
-        gen_str = ""
+    def __vm_commands(self, vm : VmModel, remote : bool = False):
         identifier = vm.get_name()
         if remote:
             identifier = "${remoteip}:" + str(self.__vm_host_port(vm))
         for command in vm.get_commands_list():
-            gen_str += command.replace("§name", identifier) + " ; "
-        return gen_str
+            yield command.replace("§name", identifier) + " ; "
 
     def __vm_host_port(self, vm : VmModel):
         return 11000 + int(vm.get_id()) # to avoid common ports
\ No newline at end of file
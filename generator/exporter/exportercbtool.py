@@ -2,8 +2,13 @@
 
 Writes a cloudfactory.cbtool scenario file that can be run with CBTOOL
 (cbtool/cb --trace=cloudfactory.cbtool) for simulation or cloud deployment.
+Scenario commands are written from a sorted index of VM attach/detach events,
+optionally gzip compressed.
 """
+import os
 from generator.vmmodel import *
+from generator.vmfleet import VmFleet
+from generator.exporter.exporterwriter import ExporterWriter
 
 class ExporterCBTool(object):
     """
@@ -15,16 +20,22 @@ class ExporterCBTool(object):
         CBTOOL scenario template (loaded from file at init); contains §commands§ placeholder.
     default_cbtool_config : dict
         Maps CPU count to allowed memory (MB) options for CBTOOL VM sizing.
+    compress : bool
+        gzip compress scenario file or not
+    output_folder : str
+        folder where scenario is written (current directory by default)
 
     Public Methods
     -------
     write(vm_list, slice_duration)
-        Write cloudfactory.cbtool to the current directory.
+        Write cloudfactory.cbtool to the output folder.
     """
     
-    def __init__(self, skeleton_location : str):
+    def __init__(self, skeleton_location : str, compress : bool = False, output_folder : str = "."):
         with open(skeleton_location, 'r') as file:
             self.skeleton = file.read()
+        self.compress = compress
+        self.output_folder = output_folder
         
         self.default_cbtool_config = {
             1:[192,512,1024,2048],
@@ -44,78 +55,76 @@ class ExporterCBTool(object):
         slice_duration : int
             Duration of one slice in seconds; used for load_duration and waitfor.
         """
-        cbtool_code = self.skeleton.replace("§commands§", self.__get_commands(vm_list, slice_duration))
-        with open('cloudfactory.cbtool', 'w') as f:
-            f.write(cbtool_code)
-        print("Scenario wrote in cloudfactory.cbtool")
-
-    def __get_commands(self, vm_list : list, slice_duration : int):
-        """Return CBTOOL scenario of all vm as a string
+        skeleton_parts = self.skeleton.split("§commands§")
+        with ExporterWriter(os.path.join(self.output_folder, 'cloudfactory.cbtool'), compress=self.compress) as f:
+            for part_index, skeleton_part in enumerate(skeleton_parts):
+                if part_index > 0: self.__write_commands(f, vm_list, slice_duration)
+                f.write(skeleton_part)
+        print("Scenario wrote in", f.path)
+
+    def __write_commands(self, f : ExporterWriter, vm_list : list, slice_duration : int):
+        """Write CBTOOL scenario of all vm, from a sorted index of attach/detach events
+        Only slices with events are written, idle slices in between are merged in a single waitfor
+        f : ExporterWriter
+            opened writer
         vm_list : list
             list of VM
         slice_duration : int
             Duration of a slice in given experiment
-
-        Return
-        ------
-        command : str
-            CBTOOL scenario as string     
         """
-        scenario = ""
-        overall_timesheet = vm_list[0].get_timesheet() # We ignore specific slice values, we only want timesheet structure
+        number_of_slices = vm_list[0].get_timesheet().get_number_of_slices() # We ignore specific slice values, we only want timesheet structure
         track_cbtool_names = {'_index':0} # use to follow CB tool virtual applications names (ai_index) 
-        for scope_index, scope_values in overall_timesheet.items():
-            for slice_index in range(len(scope_values)):
-                scenario+= self.__get_scenario_on_specific_slice(vm_list=vm_list,
-                    slice_duration=slice_duration,
-                    scope_index=scope_index,
-                    slice_index=slice_index,
-                    tracker=track_cbtool_names)
-                scenario+= "waitfor " + str(slice_duration) + "s\n"
-        return scenario
-
-    def __get_scenario_on_specific_slice(self, vm_list : list, slice_duration : int, scope_index : int, slice_index : int, tracker : dict):
-        """Return CBTOOL scenario of all vm as a string on a specific slice
+        current_slice = 0
+        for event_slice, vm_index, is_attach in self.__get_events(vm_list, number_of_slices):
+            if event_slice > current_slice:
+                f.write(self.__get_waitfor(event_slice - current_slice, slice_duration))
+                current_slice = event_slice
+            if is_attach:
+                f.write(self.__get_setup_for_vm(track_cbtool_names, vm_list[vm_index], slice_duration))
+            else:
+                f.write(self.__get_detach_for_vm(track_cbtool_names, vm_list[vm_index]))
+        if number_of_slices > current_slice:
+            f.write(self.__get_waitfor(number_of_slices - current_slice, slice_duration))
+
+    def __get_events(self, vm_list : list, number_of_slices : int):
+        """Return attach and detach events of all vm, sorted by slice then by VM position
         vm_list : list
-            list of VM
-        slice_duration : int
-            Duration of a slice in given experiment
-        scope_index : int
-            scope index
-        slice_index : int
-            slice index
-        tracker : dict
-            Dict tracking CBTOOL virtual application name associated to each VM
+            list of VM (or VmFleet)
+        number_of_slices : int
+            experiment number of slices (VMs present on last slice are never detached)
 
         Return
         ------
-        command : str
-            CBTOOL command as string     
+        events : list
+            sorted (slice, vm index, is_attach) tuples
         """
-        scenario = ""
-        for vm in vm_list:
-            attendance = vm.get_timesheet()[scope_index][slice_index]
-            if (attendance == True) and (self.__previous_attendance(tracker, vm) == False):
-                scenario += self.__get_setup_for_vm(tracker, vm, slice_duration)
-            if (attendance == False) and (self.__previous_attendance(tracker, vm) == True):
-                scenario += self.__get_detach_for_vm(tracker, vm)
-        return scenario
-
-    def __previous_attendance(self, tracker : dict, vm : VmModel):
-        """Return a boolean based on previous attendance of specified VM
-        vm : VmModel
-            vm to consider
-        tracker : dict
-            Dict tracking CBTOOL virtual application name associated to each VM
+        if isinstance(vm_list, VmFleet):
+            start, end = vm_list.postponed_start, vm_list.get_end()
+            presence_list = [[(int(start[vm_index]), int(end[vm_index]))] for vm_index in range(len(vm_list))]
+        else:
+            presence_list = [vm.get_timesheet().intervals for vm in vm_list]
+        events = list()
+        for vm_index, intervals in enumerate(presence_list):
+            for start, end in intervals:
+                if end <= start: continue
+                events.append((start, vm_index, True))
+                if end < number_of_slices: events.append((end, vm_index, False))
+        events.sort()
+        return events
+
+    def __get_waitfor(self, slice_count : int, slice_duration : int):
+        """Return CBTOOL command waiting for a number of slices
+        slice_count : int
+            number of slices to wait
+        slice_duration : int
+            Duration of a slice in given experiment
 
         Return
         ------
-        attendance : bool
-            True if was present, False otherwise
+        command : str
+            CBTOOL command as string
         """
-        if str(vm.get_id()) in tracker:
-            return True
-        return False
+        return "waitfor " + str(slice_count*slice_duration) + "s\n"
 
     def __get_setup_for_vm(self, tracker : dict, vm : VmModel, slice_duration : int):
         """Return setup of a single vm as a string of CBTOOL commands. Update also tracker
@@ -1,9 +1,17 @@
 """Export CloudFactory VM workload to CloudSim Plus.
 
 Writes CloudFactoryGeneratedWorkload.java (from skeleton), vms.properties,
-and models.properties for use with the CloudSim Plus simulator.
+and models.properties for use with the CloudSim Plus simulator. Properties are
+written VM per VM, optionally gzip compressed (the skeleton reads .gz files).
+A compact alternative writes vms.csv (one column per VM attribute) and
+models.csv (run-length encoded usage: consecutive equal targets are merged),
+read by the skeleton fast loader when present. In search mode, the generated
+program looks for the minimum host count able to deploy the workload within a
+single JVM run (the "search" program argument also enables it).
 """
+import os
 from generator.vmmodel import *
+from generator.exporter.exporterwriter import ExporterWriter
 
 class ExporterCloudSimPlus(object):
     """
@@ -13,16 +21,31 @@ class ExporterCloudSimPlus(object):
     ----------
     skeleton : str
         Contents of the Java CloudSim program skeleton (loaded from file at init).
+    compress : bool
+        gzip compress properties files or not
+    compact : bool
+        write compact csv files (vms.csv, models.csv) instead of properties files
+    search : bool
+        generated program searches the minimum host count by default
+    output_folder : str
+        folder where files are written (current directory by default)
 
     Public Methods
     -------
     write(vm_list, slice_duration)
-        Write Java source and properties files to the current directory.
+        Write Java source and properties files to the output folder.
     """
     
-    def __init__(self, skeleton_location : str):
+    vm_columns = ["vmid", "vmmips", "vmcpu", "vmram", "vmbw", "vmsize", "vmsubmission",
+        "cloudletid", "cloudletmips", "cloudletcpu", "cloudletfilesize", "cloudletoutputsize", "cloudletlifetime"]
+
+    def __init__(self, skeleton_location : str, compress : bool = False, compact : bool = False, search : bool = False, output_folder : str = "."):
         with open(skeleton_location, 'r') as file:
             self.skeleton = file.read()
+        self.compress = compress
+        self.compact = compact
+        self.search = search
+        self.output_folder = output_folder
     
     def write(self, vm_list : list, slice_duration : int):
         """Write CloudSim Plus Java workload and properties files.
@@ -34,32 +57,29 @@ class ExporterCloudSimPlus(object):
         slice_duration : int
             Duration of one slice in seconds for the experiment.
         """
-        with open('CloudFactoryGeneratedWorkload.java', 'w') as f:
-            f.write(self.skeleton)
-        with open('vms.properties', 'w') as f:
-            f.write(self.__get_setup(vm_list, slice_duration))
-        with open('models.properties', 'w') as f:
-            f.write(self.__get_usage_model(vm_list, slice_duration))
+        with open(os.path.join(self.output_folder, 'CloudFactoryGeneratedWorkload.java'), 'w') as f:
+            f.write(self.skeleton.replace("§search§", "true" if self.search else "false"))
+        if self.compact:
+            self.__write_compact(vm_list, slice_duration)
+            return
+        with ExporterWriter(os.path.join(self.output_folder, 'vms.properties'), compress=self.compress) as f:
+            self.__write_setup(f, vm_list, slice_duration)
+        with ExporterWriter(os.path.join(self.output_folder, 'models.properties'), compress=self.compress) as f:
+            self.__write_usage_model(f, vm_list, slice_duration)
         print("Workload wrote in CloudFactoryGeneratedWorkload.java and CloudFactoryGeneratedWorkload.properties") 
 
-    def __get_setup(self, vm_list : list, slice_duration : int):
-        """Return setup of all vm as a string of properties
+    def __write_setup(self, f : ExporterWriter, vm_list : list, slice_duration : int):
+        """Write setup of all vm as properties, VM per VM
+        f : ExporterWriter
+            opened writer
         vm_list : list
             list of VM
         slice_duration : int
             Duration of a slice in given experiment
-
-        Return
-        ------
-        command : str
-            properties as string
         """
-        properties  = ""
         for vm in vm_list:
             vm_name =  "vm" + str(vm.get_id())
-            properties+= vm_name + "=" + self.__get_setup_for_vm(vm, slice_duration) + "," + self.__get_workload_for_vm(vm, slice_duration) + "\n"
-
-        return properties
+            f.write(vm_name + "=" + self.__get_setup_for_vm(vm, slice_duration) + "," + self.__get_workload_for_vm(vm, slice_duration) + "\n")
     
     def __get_setup_for_vm(self, vm : VmModel, slice_duration : int):
         """Return setup of a single vm as a string of properties
@@ -71,19 +91,31 @@ class ExporterCloudSimPlus(object):
         command : str
             properties as string     
         """
+        return self.__as_properties(self.__get_setup_attributes_for_vm(vm, slice_duration))
+
+    def __get_setup_attributes_for_vm(self, vm : VmModel, slice_duration : int):
+        """Return setup of a single vm as an (ordered) dict of attribute -> value as string
+        vm : VmModel
+            vm to consider
+
+        Return
+        ------
+        attributes : dict
+            setup attributes
+        """
         mem_mb = round(vm.get_mem() * 1024)
         based_mips = 1000
         vm_mips = max([int(based_mips*(max(vm.get_usage())/100)) , 1])
         bandwith = 1000
         size_mb = 10000
 
-        return "vmid:" + str(vm.get_id()) + "," +\
-            "vmmips:" + str(vm_mips) + "," +\
-            "vmcpu:" + str(vm.get_cpu()) + "," +\
-            "vmram:" + str(mem_mb) + "," +\
-            "vmbw:" + str(bandwith) + "," +\
-            "vmsize:" +  str(size_mb) + "," +\
-            "vmsubmission:" + str(int(vm.get_postponed_start()*slice_duration))
+        return {"vmid" : str(vm.get_id()),
+            "vmmips" : str(vm_mips),
+            "vmcpu" : str(vm.get_cpu()),
+            "vmram" : str(mem_mb),
+            "vmbw" : str(bandwith),
+            "vmsize" : str(size_mb),
+            "vmsubmission" : str(int(vm.get_postponed_start()*slice_duration))}
 
     def __get_workload_for_vm(self, vm : VmModel, slice_duration : int):
         """Return workload of a single vm as a string of properties
@@ -97,6 +129,20 @@ class ExporterCloudSimPlus(object):
         command : str
             data as properties string     
         """
+        return self.__as_properties(self.__get_workload_attributes_for_vm(vm, slice_duration))
+
+    def __get_workload_attributes_for_vm(self, vm : VmModel, slice_duration : int):
+        """Return workload of a single vm as an (ordered) dict of attribute -> value as string
+        vm : VmModel
+            vm to consider
+        slice_duration : int
+            Duration of a slice in given experiment
+
+        Return
+        ------
+        attributes : dict
+            workload attributes
+        """
         lifetime_s = self.__compute_lifetime_for_vm(vm, slice_duration)
         #end_time_s = (vm.get_postponed_start()*slice_duration) + lifetime_s
         based_mips = 1000
@@ -105,14 +151,17 @@ class ExporterCloudSimPlus(object):
         vm_name = "vm" + str(vm.get_id())
         utilisation_model = vm_name + "_model"
 
-        return "cloudletid:" + str(vm.get_id()) + "," +\
-            "cloudletmips:" + str(int(lifetime_s*based_mips)) + "," +\
-            "cloudletcpu:" + str(vm.get_cpu()) + "," +\
-            "cloudletfilesize:" + str(filesize) + "," +\
-            "cloudletoutputsize:" + str(outputsize) + "," +\
-            "cloudletmodel:" + utilisation_model + "," +\
-            "cloudletvm:" + vm_name + "," +\
-            "cloudletlifetime:" + str(lifetime_s)
+        return {"cloudletid" : str(vm.get_id()),
+            "cloudletmips" : str(int(lifetime_s*based_mips)),
+            "cloudletcpu" : str(vm.get_cpu()),
+            "cloudletfilesize" : str(filesize),
+            "cloudletoutputsize" : str(outputsize),
+            "cloudletmodel" : utilisation_model,
+            "cloudletvm" : vm_name,
+            "cloudletlifetime" : str(lifetime_s)}
+
+    def __as_properties(self, attributes : dict):
+        return ','.join([attribute + ":" + value for attribute, value in attributes.items()])
 
     def __compute_lifetime_for_vm(self, vm : VmModel, slice_duration):
         """Compute vm lifetime from its timesheet
@@ -129,30 +178,22 @@ class ExporterCloudSimPlus(object):
         if vm.get_lifetime()>0:
            slice_count = vm.get_lifetime()
         else:
-            slice_count = 0
             timesheet = vm.get_timesheet()
-            for scope in timesheet.values():
-                for slice_presence in scope:
-                    if slice_presence: slice_count+=1
+            slice_count = timesheet.get_slice_count() if timesheet else 0
         return int(slice_count*slice_duration)
 
-    def __get_usage_model(self, vm_list : list, slice_duration : int):
-        """Return usage models and associated properties of all vm as a string of java methods
+    def __write_usage_model(self, f : ExporterWriter, vm_list : list, slice_duration : int):
+        """Write usage models of all vm as properties, VM per VM
+        f : ExporterWriter
+            opened writer
         vm_list : list
             list of VM
         slice_duration : int
             Duration of a slice in given experiment
-
-        Return
-        ------
-        properties : str
-            model properties data as string     
         """
-        properties = ""
         for vm in vm_list:
             model_name =  "vm" + str(vm.get_id()) + "_model"
-            properties += model_name  + "=" + self.__get_usage_model_for_vm(vm, slice_duration) + "\n"
-        return properties
+            f.write(model_name  + "=" + self.__get_usage_model_for_vm(vm, slice_duration) + "\n")
 
     def __get_usage_model_for_vm(self, vm : VmModel, slice_duration : int):
         """Return usage model of a single vm as json string
@@ -166,18 +207,74 @@ class ExporterCloudSimPlus(object):
         command : str
             json as string     
         """
+        return ','.join([str(time) + ":" + str(target) for time, target in self.__get_usage_model_entries(vm, slice_duration)])
+
+    def __get_usage_model_entries(self, vm : VmModel, slice_duration : int):
+        """Return usage model of a single vm as (time, target) couples
+        Model must be read as following : For a given time, usage level to use should be the one associated to the first key where time<key
+        vm : vmModel
+            vm to consider
+        slice_duration : int
+            Duration of a slice in given experiment
+
+        Return
+        ------
+        entries : list
+            (time, target) couples ordered by time
+        """
         # We first associate generated usage level to the time at which they should be used
-        # Generated dict must be read as following : For a given time, usage level to use should be the one associated to the first key where time<key
-        timesheet = vm.get_timesheet()
         target_values = vm.get_usage()
-        target_index = 0
         target_associated_to_lower = dict()
         slice_key = vm.get_postponed_start()*slice_duration
-        for scope in timesheet.values():
-            for slice_presence in scope:
-                slice_key+= slice_duration
-                if not slice_presence: continue
-                target_associated_to_lower[slice_key] = target_values[target_index]
-                target_index+=1
-        # Convert to string
-        return ''.join(str(time) + ":" + str(target_associated_to_lower[time]) + "," for time in target_associated_to_lower)[:-1]
\ No newline at end of file
+        for target_index, slice_number in enumerate(vm.get_timesheet().get_present_slices()):
+            target_associated_to_lower[slice_key + (slice_number+1)*slice_duration] = target_values[target_index]
+        return list(target_associated_to_lower.items())
+
+    def __get_run_length_rows(self, entries : list, slice_duration : int):
+        """Split a usage model in rows of evenly spaced times, and merge consecutive equal targets of each row in runs
+        A run is read at the time of its last slice : as the first key greater than time is read, lookups are unchanged
+        entries : list
+            (time, target) couples ordered by time
+        slice_duration : int
+            Duration of a slice in given experiment
+
+        Return
+        ------
+        rows : list
+            (first time, runs) couples, runs being a list of [target, slice count]
+        """
+        rows = list()
+        previous_time = None
+        for time, target in entries:
+            if previous_time is None or time - previous_time != slice_duration:
+                rows.append((time, list()))
+            runs = rows[-1][1]
+            if runs and runs[-1][0] == target:
+                runs[-1][1] += 1
+            else:
+                runs.append([target, 1])
+            previous_time = time
+        return rows
+
+    def __write_compact(self, vm_list : list, slice_duration : int):
+        """Write setup of all vm as a csv column per attribute, and run length encoded usage models
+        A models.csv row holds a VM id, the time of its first target, the time step between targets, and space separated runs (target or target*count)
+        vm_list : list
+            list of VM
+        slice_duration : int
+            Duration of a slice in given experiment
+        """
+        with ExporterWriter(os.path.join(self.output_folder, 'vms.csv'), compress=self.compress) as f:
+            f.write(','.join(self.vm_columns) + "\n")
+            for vm in vm_list:
+                attributes = self.__get_setup_attributes_for_vm(vm, slice_duration)
+                attributes.update(self.__get_workload_attributes_for_vm(vm, slice_duration))
+                f.write(','.join([attributes[column] for column in self.vm_columns]) + "\n")
+        with ExporterWriter(os.path.join(self.output_folder, 'models.csv'), compress=self.compress) as f:
+            f.write("vmid,time,step,runs\n")
+            for vm in vm_list:
+                vm_id = str(vm.get_id())
+                for first_time, runs in self.__get_run_length_rows(self.__get_usage_model_entries(vm, slice_duration), slice_duration):
+                    f.write(vm_id + "," + str(first_time) + "," + str(slice_duration) + "," +\
+                        ' '.join([str(target) if count == 1 else str(target) + "*" + str(count) for target, count in runs]) + "\n")
+        print("Workload wrote in CloudFactoryGeneratedWorkload.java, vms.csv and models.csv")
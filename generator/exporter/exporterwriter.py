@@ -0,0 +1,62 @@
+"""Buffered (and optionally gzip compressed) text writer shared by exporters.
+
+Exporters write their output incrementally (per VM or per slice) through an
+ExporterWriter: chunks are gathered in memory and flushed to disk once the
+buffer reaches a bounded size, so export memory does not depend on fleet size.
+"""
+import gzip
+
+class ExporterWriter(object):
+    """
+    A class used to write an export file incrementally
+    Use as a context manager : with ExporterWriter('setup.sh') as writer: writer.write(...)
+    ...
+
+    Attributes
+    ----------
+    path : str
+        location written (with a .gz suffix when compressed)
+    compress : bool
+        gzip compress output or not
+    buffer_size : int
+        number of buffered characters triggering a flush to disk
+
+    Public Methods
+    -------
+    write(chunk : str):
+        Append a chunk of text to file
+    flush():
+        Write buffered chunks to disk
+    close():
+        Flush and close file
+    """
+
+    default_buffer_size = 1 << 20 # characters
+
+    def __init__(self, path : str, compress : bool = False, buffer_size : int = default_buffer_size):
+        self.compress = compress
+        self.path = path + ".gz" if compress else path
+        self.buffer_size = buffer_size
+        self.file = gzip.open(self.path, 'wt') if compress else open(self.path, 'w')
+        self.buffer = list()
+        self.buffered = 0
+
+    def write(self, chunk : str):
+        self.buffer.append(chunk)
+        self.buffered += len(chunk)
+        if self.buffered >= self.buffer_size: self.flush()
+
+    def flush(self):
+        if self.buffer: self.file.write(''.join(self.buffer))
+        self.buffer = list()
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,110 @@
+"""JSON lines VM list: one VM per line, written and read incrementally.
+
+A JSON lines export holds the same VM attributes as a json export (see
+VmModelEncoder), one VM per line. JsonLinesVmList reads it lazily: iterating
+parses one line (one VmModel) at a time, and VMs can be accessed by position
+from an index of line offsets, so exporters work on it like on a list without
+the whole experiment being in memory.
+"""
+import json
+import numpy as np
+from generator.vmmodel import *
+from generator.exporter.exporterwriter import ExporterWriter
+
+class JsonLinesVmList(object):
+    """
+    A class used to represent a list of VmModel stored in a JSON lines file
+    Each iteration reads the file again: VMs are not kept in memory
+    ...
+
+    Attributes
+    ----------
+    location : str
+        JSON lines file location
+    offsets : np.ndarray
+        byte offset of each VM line (built on first need)
+
+    Public Methods
+    -------
+    write(vm_list, location):
+        Write a list of VmModel (or VmFleet) as JSON lines, VM per VM (static method)
+    __iter__():
+        Iterate over VmModel parsed line per line
+    __len__():
+        Return number of VMs
+    __getitem__(index):
+        Return VmModel at given position
+    """
+
+    def __init__(self, location : str):
+        self.location = location
+        self.offsets = None
+        self.random_access_file = None
+
+    @staticmethod
+    def write(vm_list, location : str):
+        """Write VMs as JSON lines, encoding one VM at a time
+
+        Parameters
+        ----------
+        vm_list : list
+            list of VmModel (or VmFleet)
+        location : str
+            JSON lines file location
+        """
+        encoder = VmModelEncoder()
+        with ExporterWriter(location) as f:
+            for vm in vm_list:
+                f.write(encoder.encode(vm))
+                f.write("\n")
+
+    def __iter__(self):
+        with open(self.location, 'rb') as f:
+            for line in f:
+                if line.strip(): yield self.__parse(line)
+
+    def __len__(self):
+        return len(self.__get_offsets())
+
+    def __getitem__(self, index : int):
+        offsets = self.__get_offsets()
+        if index < 0: index+= len(offsets)
+        if index < 0 or index >= len(offsets): raise IndexError("VM index out of list range")
+        if self.random_access_file is None:
+            self.random_access_file = open(self.location, 'rb')
+        self.random_access_file.seek(int(offsets[index]))
+        return self.__parse(self.random_access_file.readline())
+
+    def __get_offsets(self):
+        """Return byte offset of each VM line, scanning file on first call
+
+        Returns
+        -------
+        offsets : np.ndarray
+            line offsets (int64)
+        """
+        if self.offsets is None:
+            offsets = list()
+            position = 0
+            with open(self.location, 'rb') as f:
+                for line in f:
+                    if line.strip(): offsets.append(position)
+                    position+= len(line)
+            self.offsets = np.array(offsets, dtype=np.int64)
+        return self.offsets
+
+    def __parse(self, line : bytes):
+        """Build a VmModel from a JSON line (VM counter is left unchanged: ids are read from file)"""
+        vm_count = VmModel.vm_count
+        vm = VmModel(**json.loads(line))
+        VmModel.vm_count = vm_count
+        return vm
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["random_access_file"] = None
+        return state
+
+    def __del__(self):
+        if getattr(self, "random_access_file", None) is not None:
+            self.random_access_file.close()
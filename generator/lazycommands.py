@@ -0,0 +1,45 @@
+"""LazyCommands: per-slice workload commands generated on demand.
+
+Instead of holding one command string per slice of presence, a VM may hold a
+LazyCommands object: commands are generated from its workload profile template
+and its usage each time they are iterated (exporters stream them to disk).
+"""
+
+class LazyCommands(object):
+    """
+    A class used to represent the commands list of a VM without materializing it
+    Iterating generates commands from VM usage (a new iteration regenerates them)
+    ...
+
+    Attributes
+    ----------
+    workload_profile : WorkloadProfile
+        profile used to generate commands (through its memoized get_command)
+    vm : VmModel
+        VM whose usage is read at iteration time
+
+    Public Methods
+    -------
+    __iter__():
+        Iterate over generated commands
+    __len__():
+        Return number of commands (slices of presence)
+    """
+
+    def __init__(self, workload_profile, vm):
+        self.workload_profile = workload_profile
+        self.vm = vm
+
+    def __iter__(self):
+        cpu, mem = self.vm.get_cpu(), self.vm.get_mem()
+        for targeted_usage in self.vm.get_usage():
+            yield self.workload_profile.get_command(cpu, mem, targeted_usage)
+
+    def __len__(self):
+        return len(self.vm.get_usage())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return "LazyCommands(" + str(self.workload_profile.name) + ", " + str(self.vm.get_name()) + ")"
@@ -0,0 +1,133 @@
+"""Reproducibility manifest: regenerate an experiment from its seed.
+
+Instead of exporting every generated VM (--export), an experiment can be
+described by the few values it is generated from: random seed, scenario files
+(with their sha256 hash, to detect any change), temporality and objective (VM
+count, cpu/mem, VM count sweep, shards). Generation being deterministic for a
+given seed, replaying a manifest (--replay) regenerates the identical set of VMs.
+
+Manifest example:
+
+    seed: 1234
+    temporality: [3600, 86400, 12]
+    objective:
+      vm: 100
+    scenarios:
+      distribution: {file: examples-scenario/scenario-vm-distribution-azure2017.yml, sha256: 5f0c...}
+      usage: {file: examples-scenario/scenario-vm-usage-azure2017.yml, sha256: 9ab1...}
+      workload: {file: examples-workload/scenario-vm-workload.yml, sha256: 0d7e...}
+"""
+import hashlib, yaml
+
+class ReproducibilityManifest(object):
+    """
+    A class used to describe an experiment by the values it is generated from
+    ...
+
+    Attributes
+    ----------
+    seed : int
+        seed of random and np.random (root of shard substreams if sharded)
+    scenarios : dict
+        scenario kind (distribution, usage, workload) -> file location
+    hashes : dict
+        scenario kind -> sha256 of file content (computed at init if not given)
+    temporality : tuple
+        (slice duration, scope duration, number of scope)
+    objective : dict
+        generation objective: vm, or cpu and mem, or sweep_vm (list of VM counts); shards if sharded
+
+    Public Methods
+    -------
+    load(location):
+        Read a manifest from a yaml file (class method)
+    write(location):
+        Write manifest as a yaml file
+    verify():
+        Check that scenario files did not change since manifest was written
+    """
+
+    scenario_kinds = ["distribution", "usage", "workload"]
+    objective_keys = ["vm", "cpu", "mem", "sweep_vm", "shards"]
+
+    def __init__(self, **kwargs):
+        required_attributes = ["seed", "scenarios", "temporality", "objective"]
+        for required_attribute in required_attributes:
+            if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
+        self.seed = int(kwargs["seed"])
+        self.scenarios = {kind : kwargs["scenarios"][kind] for kind in self.scenario_kinds}
+        self.temporality = tuple(int(value) for value in kwargs["temporality"])
+        self.objective = {key : value for key, value in kwargs["objective"].items() if (key in self.objective_keys) and (value is not None)}
+        if ("vm" not in self.objective) and ("sweep_vm" not in self.objective) and not (("cpu" in self.objective) and ("mem" in self.objective)):
+            raise ValueError("Manifest objective must specify [cpu and mem], [vm] or [sweep_vm]", self.objective)
+        self.hashes = kwargs["hashes"] if "hashes" in kwargs else {kind : self.get_file_hash(location) for kind, location in self.scenarios.items()}
+
+    @classmethod
+    def load(cls, location : str):
+        """Read a manifest from a yaml file
+
+        Parameters
+        ----------
+        location : str
+            manifest location
+
+        Returns
+        -------
+        manifest : ReproducibilityManifest
+            loaded manifest
+        """
+        with open(location, 'r') as file:
+            manifest_as_dict = yaml.full_load(file)
+        scenarios = manifest_as_dict["scenarios"]
+        return cls(seed=manifest_as_dict["seed"],
+            scenarios={kind : scenarios[kind]["file"] for kind in cls.scenario_kinds},
+            hashes={kind : scenarios[kind]["sha256"] for kind in cls.scenario_kinds},
+            temporality=manifest_as_dict["temporality"],
+            objective=manifest_as_dict["objective"])
+
+    def write(self, location : str):
+        """Write manifest as a yaml file
+
+        Parameters
+        ----------
+        location : str
+            manifest location
+        """
+        manifest_as_dict = {"seed" : self.seed,
+            "temporality" : list(self.temporality),
+            "objective" : self.objective,
+            "scenarios" : {kind : {"file" : self.scenarios[kind], "sha256" : self.hashes[kind]} for kind in self.scenario_kinds}}
+        with open(location, 'w') as file:
+            yaml.dump(manifest_as_dict, file, sort_keys=False)
+
+    def verify(self):
+        """Check that scenario files did not change since manifest was written
+
+        Raises
+        ------
+        ValueError
+            If a scenario file content differs from its recorded hash
+        """
+        for kind, location in self.scenarios.items():
+            if self.get_file_hash(location) != self.hashes[kind]:
+                raise ValueError("Scenario file changed since manifest was written", kind, location)
+
+    @staticmethod
+    def get_file_hash(location : str):
+        """Return sha256 (hexadecimal) of a file content
+
+        Parameters
+        ----------
+        location : str
+            file location
+
+        Returns
+        -------
+        hash : str
+            sha256 of file
+        """
+        file_hash = hashlib.sha256()
+        with open(location, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                file_hash.update(block)
+        return file_hash.hexdigest()
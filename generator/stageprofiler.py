@@ -0,0 +1,168 @@
+"""Stage profiler: where time and memory go in a generation run.
+
+Builders, ExperimentGenerator and exporters wrap each stage of a run (YAML
+load, flavor solving, profile attribution, timesheet building, usage sampling,
+workload attribution, command generation, each exporter) in a StageProfiler
+stage. For each stage name, the profiler accumulates calls, wall time, CPU time
+(process time), peak traced memory (tracemalloc, above memory allocated when the
+stage started) and processed items (VMs). Results are written as a JSON report
+(--profile) so that runs of different versions can be compared.
+
+A disabled profiler (the default of every component) costs a single check per
+stage. Callbacks registered with add_hook receive each stage measure as it ends.
+
+    profiler = StageProfiler()
+    generator = ExperimentGenerator(..., profiler=profiler)
+    with profiler.stage("my_stage", items=len(vm_list)):
+        ...
+    profiler.write_report("profile.json")
+"""
+import json, platform, time, tracemalloc
+from contextlib import contextmanager, nullcontext
+
+class StageProfiler(object):
+    """
+    A class used to measure wall time, CPU time, peak memory and item counts of run stages
+    ...
+
+    Attributes
+    ----------
+    enabled : bool
+        measure stages or not (stages are no-op if disabled)
+    trace_memory : bool
+        measure peak memory with tracemalloc (slows allocations down)
+    stages : dict
+        stage name -> accumulated measures (calls, wall_time, cpu_time, peak_memory, items), in first call order
+    hooks : list
+        callables called with each stage measure (dict) as it ends
+
+    Public Methods
+    -------
+    stage(name, items):
+        Context manager measuring a stage
+    add_hook(hook):
+        Register a callable receiving each stage measure
+    get_report():
+        Return accumulated measures as a dict
+    write_report(location):
+        Write accumulated measures as a JSON report
+    """
+
+    report_format = "cloudfactory-profile"
+
+    def __init__(self, enabled : bool = True, trace_memory : bool = True):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages = dict()
+        self.hooks = list()
+        self.started_tracing = False
+        self.peak_stack = list() # peak memory reached by each running stage before a nested stage reset tracemalloc peak
+
+    @contextmanager
+    def __measure(self, name : str, items : int):
+        """Measure a stage, see stage"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        measure = {"name" : name, "items" : items}
+        memory_start = 0
+        if self.trace_memory:
+            memory_start, peak = tracemalloc.get_traced_memory()
+            if self.peak_stack: self.peak_stack[-1] = max(self.peak_stack[-1], peak)
+            tracemalloc.reset_peak()
+            self.peak_stack.append(memory_start)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield measure
+        finally:
+            measure["wall_time"] = time.perf_counter() - wall_start
+            measure["cpu_time"] = time.process_time() - cpu_start
+            measure["peak_memory"] = 0
+            if self.trace_memory:
+                peak = max(self.peak_stack.pop(), tracemalloc.get_traced_memory()[1])
+                if self.peak_stack: self.peak_stack[-1] = max(self.peak_stack[-1], peak)
+                measure["peak_memory"] = max(0, peak - memory_start)
+            self.__accumulate(measure)
+            if self.started_tracing and not self.peak_stack:
+                tracemalloc.stop()
+                self.started_tracing = False
+
+    def stage(self, name : str, items : int = None):
+        """Return a context manager measuring a stage. Measures of stages sharing a name are accumulated
+        Stages may be nested: the peak memory of a stage includes the one of its nested stages
+
+        Parameters
+        ----------
+        name : str
+            stage name (such as yaml_load, usage_sampling, export_bash)
+        items : int
+            number of items (VMs) processed by stage, if relevant. Can also be set on the yielded measure (measure["items"])
+
+        Returns
+        -------
+        context : contextmanager
+            yields the stage measure (dict, not recorded if profiler is disabled)
+        """
+        if not self.enabled: return nullcontext(dict())
+        return self.__measure(name, items)
+
+    def add_hook(self, hook):
+        """Register a callable called with each stage measure (dict with name, items, wall_time, cpu_time, peak_memory) as it ends
+
+        Parameters
+        ----------
+        hook : callable
+            called with stage measure
+        """
+        self.hooks.append(hook)
+
+    def __accumulate(self, measure : dict):
+        """Add a stage measure to the stage totals and call hooks"""
+        if measure["name"] not in self.stages:
+            self.stages[measure["name"]] = {"calls" : 0, "wall_time" : 0.0, "cpu_time" : 0.0, "peak_memory" : 0, "items" : 0}
+        totals = self.stages[measure["name"]]
+        totals["calls"] += 1
+        totals["wall_time"] += measure["wall_time"]
+        totals["cpu_time"] += measure["cpu_time"]
+        totals["peak_memory"] = max(totals["peak_memory"], measure["peak_memory"])
+        if measure["items"] is not None: totals["items"] += int(measure["items"])
+        for hook in self.hooks:
+            hook(measure)
+
+    def get_report(self):
+        """Return accumulated measures of all stages
+
+        Returns
+        -------
+        report : dict
+            format, python version, memory tracing flag and stage list (name, calls, wall_time and cpu_time in seconds,
+            peak_memory in bytes, items and items_per_second), in first call order
+        """
+        stages = list()
+        for name, totals in self.stages.items():
+            stage = dict(name=name, **totals)
+            stage["items_per_second"] = totals["items"]/totals["wall_time"] if totals["items"] and totals["wall_time"] > 0 else None
+            stages.append(stage)
+        return {"format" : self.report_format,
+            "python" : platform.python_version(),
+            "trace_memory" : self.trace_memory,
+            "stages" : stages}
+
+    def write_report(self, location : str):
+        """Write accumulated measures as a JSON report (see get_report)
+
+        Parameters
+        ----------
+        location : str
+            report location
+        """
+        with open(location, 'w') as f:
+            json.dump(self.get_report(), f, indent=2)
+
+    def __getstate__(self):
+        """Profilers sent to pool workers are disabled: only current process stages are measured"""
+        state = self.__dict__.copy()
+        state.update(enabled=False, stages=dict(), hooks=list(), started_tracing=False, peak_stack=list())
+        return state
+
+disabled_profiler = StageProfiler(enabled=False) # default profiler of components
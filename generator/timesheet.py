@@ -0,0 +1,133 @@
+"""Timesheet: presence of a VM through the experiment slices.
+
+A generated VM is present on a single contiguous range of slices, from its
+postponed start to the end of its lifetime. Timesheet stores presence as
+(start, end) slice intervals and only expands it to per-slice booleans when
+accessed as the former dict of scope -> list of booleans.
+"""
+from collections.abc import Mapping
+
+class Timesheet(Mapping):
+    """
+    A class used to represent VM presence as [start, end[ slice intervals (a single one for generated VMs)
+    Read access follows the former dict format: scope index -> list of booleans (one per slice)
+    ...
+
+    Attributes
+    ----------
+    intervals : list
+        ordered and disjoint (start, end) tuples, end being excluded from presence
+    slices_per_scope : int
+        number of slices per scope
+    number_of_scope : int
+        number of scope
+
+    Public Methods
+    -------
+    get_interval():
+        Return overall presence interval as a (start, end) tuple
+    get_present_slices():
+        Iterate over slices of presence
+    get_slice_count():
+        Return number of slices of presence
+    is_present(scope_index : int, slice_index : int):
+        Test presence on a specific slice
+    from_value(value):
+        Build a Timesheet from its compact or expanded (dict of list) representation
+    """
+
+    def __init__(self, start : int, end : int, slices_per_scope : int, number_of_scope : int):
+        self.slices_per_scope = int(slices_per_scope)
+        self.number_of_scope = int(number_of_scope)
+        start = max(int(start), 0)
+        end = min(max(int(end), start), self.get_number_of_slices())
+        self.intervals = [(start, end)] if end > start else list()
+
+    def __getitem__(self, scope_index : int):
+        scope_index = int(scope_index)
+        if scope_index < 0 or scope_index >= self.number_of_scope: raise KeyError(scope_index)
+        return [self.is_present(scope_index, slice_index) for slice_index in range(self.slices_per_scope)]
+
+    def __iter__(self):
+        return iter(range(self.number_of_scope))
+
+    def __len__(self):
+        return self.number_of_scope
+
+    def __repr__(self):
+        return "Timesheet(" + str(self.intervals) + ", " + str(self.slices_per_scope) + ", " + str(self.number_of_scope) + ")"
+
+    def get_interval(self):
+        if not self.intervals: return 0, 0
+        return self.intervals[0][0], self.intervals[-1][1]
+
+    def get_present_slices(self):
+        for start, end in self.intervals:
+            yield from range(start, end)
+
+    def get_slice_count(self):
+        return sum([end - start for start, end in self.intervals])
+
+    def get_number_of_slices(self):
+        return self.slices_per_scope*self.number_of_scope
+
+    def is_present(self, scope_index : int, slice_index : int):
+        """Return True if VM is present on specified slice
+
+        Parameters
+        ----------
+        scope_index : int
+            scope index
+        slice_index : int
+            slice index in scope
+
+        Returns
+        -------
+        presence : bool
+            True if present, False otherwise
+        """
+        slice_number = int(scope_index)*self.slices_per_scope + slice_index
+        for start, end in self.intervals:
+            if start <= slice_number < end: return True
+        return False
+
+    def as_dict(self):
+        """Return compact representation (used for export/reload)."""
+        return {"intervals": [list(interval) for interval in self.intervals], "slices_per_scope": self.slices_per_scope, "number_of_scope": self.number_of_scope}
+
+    @staticmethod
+    def from_intervals(intervals : list, slices_per_scope : int, number_of_scope : int):
+        """Build a Timesheet from a list of ordered and disjoint (start, end) intervals."""
+        timesheet = Timesheet(0, 0, slices_per_scope, number_of_scope)
+        timesheet.intervals = [(int(start), int(end)) for start, end in intervals if end > start]
+        return timesheet
+
+    @staticmethod
+    def from_value(value):
+        """Build a Timesheet from its compact dict, or from a former dict of scope -> list of booleans
+
+        Parameters
+        ----------
+        value : Timesheet or dict
+            timesheet representation
+
+        Returns
+        -------
+        timesheet : Timesheet
+            interval based timesheet
+        """
+        if isinstance(value, Timesheet): return value
+        if "intervals" in value: return Timesheet.from_intervals(**value)
+        # Former format: keys may be str when reloaded from json
+        ordered_scopes = [value[key] for key in sorted(value.keys(), key=int)]
+        slices_per_scope = len(ordered_scopes[0]) if ordered_scopes else 0
+        intervals = list()
+        slice_number = 0
+        for scope in ordered_scopes:
+            for slice_presence in scope:
+                if slice_presence and intervals and intervals[-1][1] == slice_number:
+                    intervals[-1][1] = slice_number + 1
+                elif slice_presence:
+                    intervals.append([slice_number, slice_number + 1])
+                slice_number+=1
+        return Timesheet.from_intervals(intervals, slices_per_scope, len(ordered_scopes))
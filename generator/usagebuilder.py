@@ -1,8 +1,10 @@
 import yaml, random, math
 from generator.vmmodel import *
+from generator.vmfleet import VmFleet
 from generator.usageprofile import *
 from generator.vmusagebuilder import VmUsageBuilder
 from generator.distributiongenerator import DistributionGenerator
+from generator.stageprofiler import disabled_profiler
 
 class UsageBuilder(object):
     """
@@ -20,6 +22,8 @@ class UsageBuilder(object):
         Builds per-VM CPU usage from profile and timesheet.
     distribution_generator : DistributionGenerator
         Used for heavy-tail deployment spread over slices.
+    profiler : StageProfiler
+        Measures scenario load, profile attribution, timesheet building and usage sampling (disabled by default).
 
     Public Methods
     -------
@@ -27,6 +31,10 @@ class UsageBuilder(object):
         Assign profiles and generate usage and timesheets for the VM list.
     get_overall_count_of_vm_to_be_created()
         Return the number of new VMs to create per scope (from arrival rates).
+    set_temporality(slices_per_scope, number_of_scope)
+        Change experiment temporality without reloading scenario.
+    reset()
+        Forget state of a previous experiment (initial VM count of profiles).
     """
 
     def __init__(self, **kwargs):
@@ -35,8 +43,10 @@ class UsageBuilder(object):
             if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
         self.slices_per_scope=kwargs["slices_per_scope"]
         self.number_of_scope=kwargs["number_of_scope"]
+        self.profiler = kwargs["profiler"] if "profiler" in kwargs else disabled_profiler
         self.profiles = dict()
-        self.__load_from_yaml(kwargs["yaml_file"])
+        with self.profiler.stage("yaml_load"):
+            self.__load_from_yaml(kwargs["yaml_file"])
         self.vm_usage_builder = VmUsageBuilder(profiles=self.profiles, slices_per_scope=self.slices_per_scope)
         self.distribution_generator = DistributionGenerator()
     
@@ -70,18 +80,47 @@ class UsageBuilder(object):
         """ Attribute usage (cpu usage) based on periodicity, lifetime, number of scopes
         ----------
         vm_list : list
-            list of VMs to be updated
+            list of VMs (or VmFleet) to be updated
         postponed_scope_start : int
             Scope in which passed VMs are created
         """
+        if isinstance(vm_list, VmFleet):
+            vm_list.set_temporality(slices_per_scope=self.slices_per_scope, number_of_scope=self.number_of_scope)
         # Update VM attributes
-        self.__attribute_profile_to_vm_list(vm_list)
-        postponed_dict = self.__convert_postpone_to_slice_list(vm_list, postponed_scope_start)
-        for name, profile in self.profiles.items():
-            profile.generate_and_apply_usage(vm_list, postponed_dict[name])
+        with self.profiler.stage("profile_attribution", items=len(vm_list)):
+            self.__attribute_profile_to_vm_list(vm_list)
+        with self.profiler.stage("timesheet_building", items=len(vm_list)):
+            postponed_dict = self.__convert_postpone_to_slice_list(vm_list, postponed_scope_start)
+            for name, profile in self.profiles.items():
+                profile.generate_and_apply_usage(vm_list, postponed_dict[name])
         # Generate workload
-        for vm in vm_list:
-            self.vm_usage_builder.build_and_set_usage_for_VM(vm)
+        with self.profiler.stage("usage_sampling", items=len(vm_list)):
+            if isinstance(vm_list, VmFleet):
+                self.vm_usage_builder.build_and_set_usage_for_fleet(vm_list)
+                return
+            for vm in vm_list:
+                self.vm_usage_builder.build_and_set_usage_for_VM(vm)
+
+    def set_temporality(self, slices_per_scope : int, number_of_scope : int):
+        """ Change experiment temporality of builder, its profiles and VM usage builder, without reloading scenario
+        ----------
+        slices_per_scope : int
+            number of slices per scope
+        number_of_scope : int
+            number of scopes
+        """
+        self.slices_per_scope=slices_per_scope
+        self.number_of_scope=number_of_scope
+        self.vm_usage_builder.slices_per_scope=slices_per_scope
+        for profile in self.profiles.values():
+            profile.set_temporality(slices_per_scope, number_of_scope)
+
+    def reset(self):
+        """ Forget state of a previous experiment, so that builder can be reused to generate a new one
+        (arrival counts are computed from initial VM count of the first attribution)
+        """
+        for profile in self.profiles.values():
+            profile.reset()
 
     def get_overall_count_of_vm_to_be_created(self):
         """ Based on profiles arrival rate, return the amount of new VMs to be created
@@ -7,6 +7,7 @@ UsageBuilder to assign profiles and generate timesheets.
 import math, random
 from random import randrange
 from generator.vmmodel import *
+from generator.timesheet import Timesheet
 
 class UsageProfile(object):
     """
@@ -37,6 +38,10 @@ class UsageProfile(object):
     -------
     generate_and_apply_usage(cpu : int, mem : int):
        Update a list of VM with usage generated from this profile
+    set_temporality(slices_per_scope : int, number_of_scope : int):
+       Update context data for a new experiment
+    reset():
+       Forget initial VM count of previous experiment
     """
 
     def __init__(self, name : str, profile_as_dict : dict, slices_per_scope : int, number_of_scope : int):
@@ -105,7 +110,7 @@ class UsageProfile(object):
             vm.set_timesheet(self.__generate_timesheet_for_vm(vm))
         
     def __generate_timesheet_for_vm(self, vm : VmModel):
-        """Generate timesheet (presence intel on each slice) to a vm_list
+        """Generate timesheet (presence interval through slices) to a vm
         /!\ VM lifetime and VM start must be initialized before calling this method
 
         Parameters
@@ -115,22 +120,11 @@ class UsageProfile(object):
 
         Return
         ----------
-        timesheet : dict
-            dict of scope, slices are represent by index in a list containing boolean values (True/False if vm is present)
+        timesheet : Timesheet
+            presence interval of the VM (can be read as a dict of scope -> list of boolean presence per slice)
         """
-        # Initialize to False
-        timesheet = dict()
-        for scope in range(self.number_of_scope): 
-            timesheet[scope] = [False for slices in range(self.slices_per_scope)]
         max_range = vm.get_postponed_start() + vm.get_lifetime() if vm.get_lifetime() > 0 else (self.number_of_scope*self.slices_per_scope)
-        vm_range = range(vm.get_postponed_start(), max_range)
-        # Check range
-        count = 0
-        for slices in timesheet.values():
-            for index in range(len(slices)):
-                if count in vm_range: slices[index] = True
-                count+=1
-        return timesheet
+        return Timesheet(vm.get_postponed_start(), max_range, self.slices_per_scope, self.number_of_scope)
 
     def __convert_scope_count_to_slice_count(self, scope_count : int):
         """Convert a scope count to a slice count with a slight random factor to spread values
@@ -148,6 +142,16 @@ class UsageProfile(object):
         if scope_count <=0 : return 0
         return randrange(1,self.slices_per_scope+1)
 
+    def set_temporality(self, slices_per_scope : int, number_of_scope : int):
+        """Update context data (number of slices per scope and number of scope) for a new experiment"""
+        self.slices_per_scope=slices_per_scope
+        self.number_of_scope=number_of_scope
+
+    def reset(self):
+        """Forget initial VM count tracked on first call, so that profile can be reused for a new experiment"""
+        if hasattr(self, 'initial_vm_count'):
+            del self.initial_vm_count
+
     def get_count_of_vm_to_be_created(self):
         """Deduct the number of new VMs at each scope
         This method use the arrival rate feature
@@ -0,0 +1,465 @@
+"""VM fleet: columnar (struct-of-arrays) storage for a generated set of VMs.
+
+VmFleet keeps every VM attribute in a NumPy array (one entry per VM) and CPU
+usage in a 2-D uint8 matrix (one row per VM, one column per slice, 0 when the
+VM is absent). Builders and exporters may operate on these columns directly.
+VmView exposes a single fleet entry through the VmModel interface for code
+written against lists of VmModel. A fleet can be saved as a folder of .npy
+columns, loaded back as memory maps (only pages read by exporters are loaded).
+"""
+import os, json
+import numpy as np
+from generator.vmmodel import *
+from generator.timesheet import Timesheet
+
+class VmFleet(object):
+    """
+    A class used to represent a set of VM as columns
+    ...
+
+    Attributes
+    ----------
+    id : np.ndarray
+        VM identifiers (int64)
+    cpu : np.ndarray
+        VM cpu amount (int32)
+    mem : np.ndarray
+        VM mem amount (float64)
+    profile : np.ndarray
+        Usage profile code (int16, -1 if not attributed), see profile_names
+    workload : np.ndarray
+        Workload code (int16, -1 if not attributed), see workload_names
+    postponed_start : np.ndarray
+        Slice at which VM is created (int32)
+    lifetime : np.ndarray
+        VM lifetime as slices (int32, 0 is infinite)
+    avg : np.ndarray
+        Average cpu usage (int16, -1 if not generated)
+    per : np.ndarray
+        Percentile cpu usage (int16, -1 if not generated)
+    periodicity : np.ndarray
+        Periodic usage flag (bool)
+    usage : np.ndarray
+        Cpu usage matrix (uint8, VM x slices). 0 means VM is absent
+    commands : list
+        Per VM commands list (None if not generated)
+    slice_duration : int
+        Slice duration (seconds) commands were generated with (None if unknown), saved to generate them again on load
+    workload_hash : str
+        sha256 of workload scenario commands were generated from (None if unknown), saved to detect another scenario on load
+
+    Public Methods
+    -------
+    set_temporality(slices_per_scope : int, number_of_scope : int):
+        Allocate usage matrix for given experiment temporality
+    get_vm(index : int):
+        Return a VmModel view on specified VM
+    to_vm_list():
+        Return a list of VmModel views
+    from_vm_list(vm_list : list):
+        Build a fleet from a list of VmModel
+    extend(fleet : VmFleet):
+        Append VMs of another fleet
+    subset(indices):
+        Return a new fleet restricted to given VM indices
+    save(folder : str):
+        Write fleet columns as .npy files in a folder
+    load(folder : str):
+        Load a saved fleet, columns being memory mapped
+    """
+
+    saved_columns = ["id", "cpu", "mem", "profile", "workload", "postponed_start", "lifetime", "avg", "per", "periodicity", "usage"]
+    saved_format = "cloudfactory-vmfleet"
+
+    def __init__(self, cpu, mem, id = None):
+        self.cpu = np.asarray(cpu, dtype=np.int32)
+        self.mem = np.asarray(mem, dtype=np.float64)
+        if len(self.cpu) != len(self.mem): raise ValueError("cpu and mem columns must have the same length")
+        count = len(self.cpu)
+        if id is None:
+            id = np.arange(VmModel.vm_count, VmModel.vm_count + count)
+            VmModel.vm_count+=count
+        self.id = np.asarray(id, dtype=np.int64)
+        self.profile = np.full(count, -1, dtype=np.int16)
+        self.workload = np.full(count, -1, dtype=np.int16)
+        self.postponed_start = np.zeros(count, dtype=np.int32)
+        self.lifetime = np.zeros(count, dtype=np.int32)
+        self.avg = np.full(count, -1, dtype=np.int16)
+        self.per = np.full(count, -1, dtype=np.int16)
+        self.periodicity = np.zeros(count, dtype=bool)
+        self.profile_names = list()
+        self.workload_names = list()
+        self.commands = [None for i in range(count)]
+        self.slices_per_scope = 0
+        self.number_of_scope = 0
+        self.slice_duration = None
+        self.workload_hash = None
+        self.usage = np.zeros((count, 0), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.id)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield VmView(self, index)
+
+    def __getitem__(self, index : int):
+        return self.get_vm(index)
+
+    def set_temporality(self, slices_per_scope : int, number_of_scope : int):
+        """Set experiment temporality and allocate usage matrix accordingly (previous usage is kept if dimension is unchanged)
+
+        Parameters
+        ----------
+        slices_per_scope : int
+            number of slices per scope
+        number_of_scope : int
+            number of scope
+        """
+        number_of_slices = slices_per_scope*number_of_scope
+        self.slices_per_scope = slices_per_scope
+        self.number_of_scope = number_of_scope
+        if self.usage.shape[1] != number_of_slices:
+            self.usage = np.zeros((len(self), number_of_slices), dtype=np.uint8)
+
+    def get_number_of_slices(self):
+        """Return number of slices covered by usage matrix."""
+        return self.usage.shape[1]
+
+    def get_end(self):
+        """Return for each VM the (excluded) slice at which it leaves the experiment
+
+        Returns
+        -------
+        end : np.ndarray
+            last slice (excluded) of each VM presence
+        """
+        number_of_slices = self.get_number_of_slices()
+        end = np.where(self.lifetime > 0, self.postponed_start.astype(np.int64) + self.lifetime, number_of_slices)
+        return np.minimum(end, number_of_slices)
+
+    def get_profile_code(self, profile : str):
+        """Return code associated to a profile name, registering it if unknown."""
+        return self.__get_code(self.profile_names, profile)
+
+    def get_workload_code(self, workload : str):
+        """Return code associated to a workload name, registering it if unknown."""
+        return self.__get_code(self.workload_names, workload)
+
+    def __get_code(self, names : list, name : str):
+        """Return index of name in names list (appended if missing). None is coded -1."""
+        if name is None: return -1
+        if name not in names: names.append(name)
+        return names.index(name)
+
+    def get_vm(self, index : int):
+        """Return a VmModel view on specified VM
+
+        Parameters
+        ----------
+        index : int
+            VM position in fleet
+
+        Returns
+        -------
+        vm : VmView
+            view reading and writing fleet columns
+        """
+        if index < 0: index+= len(self)
+        if index < 0 or index >= len(self): raise IndexError("VM index out of fleet range")
+        return VmView(self, index)
+
+    def to_vm_list(self):
+        """Return fleet as a list of VmModel views."""
+        return [VmView(self, index) for index in range(len(self))]
+
+    @staticmethod
+    def from_vm_list(vm_list : list):
+        """Build a fleet from a list of VmModel (such as a list loaded from a json export)
+
+        Parameters
+        ----------
+        vm_list : list
+            list of VmModel
+
+        Returns
+        -------
+        fleet : VmFleet
+            fleet holding the same VMs
+        """
+        fleet = VmFleet(cpu=[vm.get_cpu() for vm in vm_list], mem=[vm.get_mem() for vm in vm_list], id=[vm.get_id() for vm in vm_list])
+        timesheet = vm_list[0].get_timesheet() if vm_list else dict()
+        if timesheet:
+            fleet.set_temporality(slices_per_scope=timesheet.slices_per_scope, number_of_scope=timesheet.number_of_scope)
+        for index, vm in enumerate(vm_list):
+            view = fleet.get_vm(index)
+            view.set_profile(vm.get_profile())
+            view.set_workload(vm.get_workload())
+            view.set_postponed_start(vm.get_postponed_start())
+            view.set_lifetime(vm.get_lifetime())
+            view.set_periodicity(vm.is_periodic())
+            if vm.get_avg() is not None: view.set_avg(vm.get_avg())
+            if vm.get_per() is not None: view.set_per(vm.get_per())
+            if vm.get_usage(): view.set_usage(vm.get_usage())
+            if hasattr(vm, 'commands_list'): view.set_commands_list(vm.get_commands_list())
+        return fleet
+
+    def save(self, folder : str):
+        """Write fleet columns as .npy files (usage as an uint8 matrix) and names/temporality/workload hash as fleet.json in a folder
+        Commands are not saved: they are generated again from workload scenario on load (see WorkloadBuilder.generate_workload_commands),
+        with the saved slice duration and workload scenario hash
+
+        Parameters
+        ----------
+        folder : str
+            folder location (created if needed)
+        """
+        os.makedirs(folder, exist_ok=True)
+        for column in self.saved_columns:
+            np.save(os.path.join(folder, column + ".npy"), np.ascontiguousarray(getattr(self, column)))
+        metadata = {"format" : self.saved_format, "count" : len(self),
+            "profile_names" : self.profile_names, "workload_names" : self.workload_names,
+            "slices_per_scope" : self.slices_per_scope, "number_of_scope" : self.number_of_scope,
+            "slice_duration" : self.slice_duration, "workload_hash" : self.workload_hash}
+        with open(os.path.join(folder, "fleet.json"), 'w') as f:
+            json.dump(metadata, f)
+
+    @staticmethod
+    def load(folder : str, mmap_mode : str = 'c'):
+        """Load a fleet saved as .npy columns. Columns are memory mapped: data is read from disk when accessed
+        Commands are not loaded (None)
+
+        Parameters
+        ----------
+        folder : str
+            folder location
+        mmap_mode : str
+            np.load memory map mode (copy-on-write by default: fleet may be modified, files are not)
+
+        Raises
+        ------
+        ValueError
+            If folder does not hold a saved fleet
+
+        Returns
+        -------
+        fleet : VmFleet
+            loaded fleet
+        """
+        with open(os.path.join(folder, "fleet.json"), 'r') as f:
+            metadata = json.load(f)
+        if metadata.get("format") != VmFleet.saved_format: raise ValueError("Not a saved VmFleet folder", folder)
+        fleet = VmFleet(cpu=[], mem=[], id=[])
+        for column in VmFleet.saved_columns:
+            setattr(fleet, column, np.load(os.path.join(folder, column + ".npy"), mmap_mode=mmap_mode))
+        if any(len(getattr(fleet, column)) != metadata["count"] for column in VmFleet.saved_columns):
+            raise ValueError("Saved VmFleet columns do not match VM count", folder)
+        fleet.profile_names = metadata["profile_names"]
+        fleet.workload_names = metadata["workload_names"]
+        fleet.slices_per_scope = metadata["slices_per_scope"]
+        fleet.number_of_scope = metadata["number_of_scope"]
+        fleet.slice_duration = metadata.get("slice_duration")
+        fleet.workload_hash = metadata.get("workload_hash")
+        fleet.commands = [None]*len(fleet)
+        if len(fleet) > 0: VmModel.vm_count = max(VmModel.vm_count, int(fleet.id.max()) + 1)
+        return fleet
+
+    def extend(self, fleet):
+        """Append VMs of another fleet (temporality must match)
+
+        Parameters
+        ----------
+        fleet : VmFleet
+            fleet to be appended
+        """
+        if fleet.get_number_of_slices() != self.get_number_of_slices():
+            raise ValueError("Cannot extend a fleet with a different temporality")
+        profile_codes = self.__remap_codes(fleet.profile, fleet.profile_names, self.get_profile_code)
+        workload_codes = self.__remap_codes(fleet.workload, fleet.workload_names, self.get_workload_code)
+        self.id = np.concatenate((self.id, fleet.id))
+        self.cpu = np.concatenate((self.cpu, fleet.cpu))
+        self.mem = np.concatenate((self.mem, fleet.mem))
+        self.profile = np.concatenate((self.profile, profile_codes))
+        self.workload = np.concatenate((self.workload, workload_codes))
+        self.postponed_start = np.concatenate((self.postponed_start, fleet.postponed_start))
+        self.lifetime = np.concatenate((self.lifetime, fleet.lifetime))
+        self.avg = np.concatenate((self.avg, fleet.avg))
+        self.per = np.concatenate((self.per, fleet.per))
+        self.periodicity = np.concatenate((self.periodicity, fleet.periodicity))
+        self.usage = np.concatenate((self.usage, fleet.usage))
+        self.commands.extend(fleet.commands)
+
+    def __remap_codes(self, codes : np.ndarray, names : list, get_code):
+        """Convert codes expressed in a foreign names list to this fleet codes."""
+        mapping = np.array([get_code(name) for name in names] + [-1], dtype=np.int16)
+        return mapping[codes] # -1 codes index the trailing -1
+
+    def subset(self, indices):
+        """Return a new fleet restricted to specified VMs (ids are kept)
+
+        Parameters
+        ----------
+        indices : array-like
+            VM positions (or boolean mask) to be kept
+
+        Returns
+        -------
+        fleet : VmFleet
+            new fleet
+        """
+        indices = np.arange(len(self))[indices]
+        fleet = VmFleet(cpu=self.cpu[indices], mem=self.mem[indices], id=self.id[indices])
+        fleet.profile_names = list(self.profile_names)
+        fleet.workload_names = list(self.workload_names)
+        fleet.profile = self.profile[indices]
+        fleet.workload = self.workload[indices]
+        fleet.postponed_start = self.postponed_start[indices]
+        fleet.lifetime = self.lifetime[indices]
+        fleet.avg = self.avg[indices]
+        fleet.per = self.per[indices]
+        fleet.periodicity = self.periodicity[indices]
+        fleet.slices_per_scope = self.slices_per_scope
+        fleet.number_of_scope = self.number_of_scope
+        fleet.slice_duration = self.slice_duration
+        fleet.workload_hash = self.workload_hash
+        fleet.usage = self.usage[indices]
+        fleet.commands = [self.commands[index] for index in indices]
+        return fleet
+
+class VmView(VmModel):
+    """
+    A VmModel reading and writing its attributes from a VmFleet entry
+    Views are cheap and not stored: two views on the same entry are equal.
+    ...
+
+    Attributes
+    ----------
+    fleet : VmFleet
+        fleet holding VM data
+    index : int
+        VM position in fleet
+    """
+
+    def __init__(self, fleet : VmFleet, index : int):
+        # VmModel constructor is not called: identity is managed by the fleet
+        self.fleet = fleet
+        self.index = index
+
+    def __eq__(self, other):
+        if not isinstance(other, VmView): return False
+        return (self.fleet is other.fleet) and (self.index == other.index)
+
+    def __hash__(self):
+        return hash((id(self.fleet), self.index))
+
+    def get_id(self):
+        return int(self.fleet.id[self.index])
+
+    def get_cpu(self):
+        return int(self.fleet.cpu[self.index])
+
+    def get_mem(self):
+        mem = float(self.fleet.mem[self.index])
+        return int(mem) if mem.is_integer() else mem # keep scenario notation (7 rather than 7.0)
+
+    def get_name(self):
+        return "vm" + str(self.get_id())
+
+    def set_lifetime(self, slice_lifetime : int):
+        self.fleet.lifetime[self.index] = slice_lifetime
+
+    def get_lifetime(self):
+        return int(self.fleet.lifetime[self.index])
+
+    def set_postponed_start(self, slice_postponed : int):
+        self.fleet.postponed_start[self.index] = slice_postponed
+
+    def get_postponed_start(self):
+        return int(self.fleet.postponed_start[self.index])
+
+    def set_timesheet(self, timesheet : Timesheet):
+        pass # Timesheet is derived from postponed start and lifetime
+
+    def get_timesheet(self):
+        if self.fleet.get_number_of_slices() <= 0: return dict()
+        start, end = self.__get_presence_range()
+        return Timesheet(start, end, self.fleet.slices_per_scope, self.fleet.number_of_scope)
+
+    def __get_presence_range(self):
+        """Return (start, end) slice range of VM presence, end being excluded."""
+        start = self.get_postponed_start()
+        number_of_slices = self.fleet.get_number_of_slices()
+        end = start + self.get_lifetime() if self.get_lifetime() > 0 else number_of_slices
+        return start, min(end, number_of_slices)
+
+    def set_profile(self, profile : str):
+        self.fleet.profile[self.index] = self.fleet.get_profile_code(profile)
+
+    def get_profile(self):
+        code = self.fleet.profile[self.index]
+        if code < 0: return None
+        return self.fleet.profile_names[code]
+
+    def set_avg(self, avg : int):
+        self.fleet.avg[self.index] = avg
+
+    def get_avg(self):
+        avg = int(self.fleet.avg[self.index])
+        if avg < 0: return None
+        return avg
+
+    def set_per(self, per : int):
+        self.fleet.per[self.index] = per
+
+    def get_per(self):
+        per = int(self.fleet.per[self.index])
+        if per < 0: return None
+        return per
+
+    def set_periodicity(self, periodicity : bool):
+        self.fleet.periodicity[self.index] = periodicity
+
+    def is_periodic(self):
+        return bool(self.fleet.periodicity[self.index])
+
+    def set_usage(self, target_usage : list):
+        start, end = self.__get_presence_range()
+        self.fleet.usage[self.index, start:start+len(target_usage)] = target_usage
+
+    def get_usage(self):
+        start, end = self.__get_presence_range()
+        values = self.fleet.usage[self.index, start:end]
+        if not values.any(): return list()
+        return values.tolist()
+
+    def set_workload(self, workload : str):
+        self.fleet.workload[self.index] = self.fleet.get_workload_code(workload)
+
+    def get_workload(self):
+        code = self.fleet.workload[self.index]
+        if code < 0: return None
+        return self.fleet.workload_names[code]
+
+    def set_commands_list(self, commands_list : list):
+        self.fleet.commands[self.index] = commands_list
+
+    def get_commands_list(self):
+        commands_list = self.fleet.commands[self.index]
+        if commands_list is None: return list()
+        return commands_list
+
+    def as_dict(self):
+        """Return VM attributes as the dict a VmModel would hold."""
+        vm_as_dict = {"cpu": self.get_cpu(), "mem": self.get_mem(), "name": self.get_name(), "id": self.get_id()}
+        if self.get_profile() is not None: vm_as_dict["profile"] = self.get_profile()
+        if self.fleet.get_number_of_slices() > 0:
+            vm_as_dict["slice_postponed"] = self.get_postponed_start()
+            vm_as_dict["slice_lifetime"] = self.get_lifetime()
+            vm_as_dict["timesheet"] = self.get_timesheet()
+            vm_as_dict["periodicity"] = self.is_periodic()
+            vm_as_dict["usage"] = self.get_usage()
+        if self.get_avg() is not None: vm_as_dict["avg"] = self.get_avg()
+        if self.get_per() is not None: vm_as_dict["per"] = self.get_per()
+        if self.get_workload() is not None: vm_as_dict["workload"] = self.get_workload()
+        if self.fleet.commands[self.index] is not None: vm_as_dict["commands_list"] = self.get_commands_list()
+        return vm_as_dict
@@ -1,11 +1,13 @@
 """VM model: core data structure for a single VM in a generated workload.
 
 VmModel holds flavor (cpu, mem), identity (id, name), lifecycle (lifetime,
-postponed_start, timesheet), usage profile and generated usage list, workload
-type, and generated commands_list. Used by all builders and exporters.
+postponed_start, timesheet as a Timesheet interval), usage profile and generated usage list, workload
+type, and generated commands_list (possibly a lazy LazyCommands iterable). Used by all builders and exporters.
 """
 from random import randrange
 from json import JSONEncoder
+from generator.timesheet import Timesheet
+from generator.lazycommands import LazyCommands
 
 class VmModel(object): 
     """
@@ -36,6 +38,7 @@ class VmModel(object):
             if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
         for attribute, value in kwargs.items():
             setattr(self, attribute, value)
+        if hasattr(self, "timesheet"): self.set_timesheet(self.timesheet) # reloaded timesheets are dict
         if not hasattr(self, "name"): self.name = "vm" + str(VmModel.vm_count)
         if not hasattr(self, "id"): self.id = VmModel.vm_count
         VmModel.vm_count+=1
@@ -68,8 +71,8 @@ class VmModel(object):
         if not hasattr(self, 'slice_postponed'): return 0
         return self.slice_postponed
 
-    def set_timesheet(self, timesheet : dict):
-        self.timesheet = timesheet
+    def set_timesheet(self, timesheet : Timesheet):
+        self.timesheet = Timesheet.from_value(timesheet)
 
     def get_timesheet(self):
         if not hasattr(self, 'timesheet'): return dict()
@@ -124,10 +127,18 @@ class VmModel(object):
         if not hasattr(self, 'commands_list'): return list()
         return self.commands_list
 
+    def as_dict(self):
+        """Return VM attributes as a dict (used for export/reload)."""
+        return self.__dict__
+
 class VmModelEncoder(JSONEncoder):
     """JSON encoder for VmModel: serializes as the VM's __dict__ for export/reload."""
 
     def default(self, o):
-        if type(o) is not VmModel:
+        if isinstance(o, Timesheet):
+            return o.as_dict()
+        if isinstance(o, LazyCommands):
+            return list(o)
+        if not isinstance(o, VmModel):
             return 
-        return o.__dict__  
\ No newline at end of file
+        return o.as_dict()
\ No newline at end of file
@@ -1,6 +1,8 @@
 from generator.vmmodel import *
+from generator.vmfleet import VmFleet
 from generator.distributiongenerator import DistributionGenerator
 import random, math
+import numpy as np
 
 class VmUsageBuilder(object):
     """
@@ -20,8 +22,12 @@ class VmUsageBuilder(object):
     -------
     build_and_set_usage_for_VM
         set for given VM its usage (list of CPU target values)
+    build_and_set_usage_for_fleet
+        set for all VMs of a fleet their usage (rows of fleet usage matrix)
     """
 
+    max_cells_per_draw = 2**22 # bound memory used by random index draws (in VM x slices cells)
+
     def __init__(self, profiles : dict, slices_per_scope : int):
         self.profiles = profiles
         self.slices_per_scope = slices_per_scope
@@ -43,6 +49,112 @@ class VmUsageBuilder(object):
             cpu_target_list = self.__generate_nonperiodic_workload(vm=vm)
         vm.set_usage(cpu_target_list)
 
+    def build_and_set_usage_for_fleet(self, fleet : VmFleet):
+        """Build usage of every VM of a fleet at once. Fleet usage matrix, avg and per columns are updated
+        Periodic VMs reproduce a single scope draw through time, non periodic VMs draw each slice
+        /!\ Fleet attributes related to profile usage (profile, postponed start, lifetime, periodicity) must be fully initialised
+
+        Parameters
+        ----------
+        fleet : VmFleet
+            fleet to be updated
+        """
+        for name, profile in self.profiles.items():
+            if name not in fleet.profile_names: continue
+            selection = np.flatnonzero(fleet.profile == fleet.get_profile_code(name))
+            if len(selection) <= 0: continue
+            fleet.avg[selection], fleet.per[selection] = self.__generate_avg_and_percentile_for_profile(profile, len(selection))
+
+        selection = np.flatnonzero(fleet.profile >= 0)
+        if len(selection) <= 0: return
+        # Distinct (avg, per) couples share the same distribution
+        couples, couple_index = np.unique(np.stack((fleet.avg[selection], fleet.per[selection]), axis=1), axis=0, return_inverse=True)
+        couple_index = couple_index.reshape(-1)
+        distribution_table = self.__convert_to_cpu_targets(
+                self.distribution_generator.get_gaussian_quantiles_table(couples[:, 0], couples[:, 1]))
+
+        end = fleet.get_end()
+        number_of_slices = fleet.get_number_of_slices()
+        rows_per_draw = max(1, self.max_cells_per_draw // max(1, number_of_slices))
+        for chunk_begin in range(0, len(selection), rows_per_draw):
+            chunk = selection[chunk_begin:chunk_begin+rows_per_draw]
+            chunk_couple = couple_index[chunk_begin:chunk_begin+rows_per_draw]
+            fleet.usage[chunk] = self.__draw_usage_rows(fleet, chunk, chunk_couple, distribution_table, end[chunk])
+
+    def __draw_usage_rows(self, fleet : VmFleet, rows : np.ndarray, rows_couple : np.ndarray, distribution_table : np.ndarray, rows_end : np.ndarray):
+        """Draw usage matrix rows for a set of fleet VMs
+
+        Parameters
+        ----------
+        fleet : VmFleet
+            fleet considered
+        rows : np.ndarray
+            VM indices in fleet
+        rows_couple : np.ndarray
+            for each VM, its row in distribution_table
+        distribution_table : np.ndarray
+            cpu targets of each distribution (one row per distribution)
+        rows_end : np.ndarray
+            for each VM, slice (excluded) of presence end
+
+        Returns
+        -------
+        usage : np.ndarray
+            uint8 matrix of usage (VM x slices), 0 when VM is absent
+        """
+        number_of_slices = fleet.get_number_of_slices()
+        distribution_size = distribution_table.shape[1]
+        periodic = fleet.periodicity[rows]
+        draw = np.empty((len(rows), number_of_slices), dtype=np.int64)
+        # Periodic VMs : one draw per slice of a scope, tiled through scopes
+        periodic_draw = np.random.randint(0, distribution_size, size=(np.count_nonzero(periodic), self.slices_per_scope))
+        draw[periodic] = np.tile(periodic_draw, (1, fleet.number_of_scope))
+        # Non periodic VMs : one draw per slice
+        draw[~periodic] = np.random.randint(0, distribution_size, size=(np.count_nonzero(~periodic), number_of_slices))
+        usage = distribution_table[rows_couple[:, None], draw]
+        slices = np.arange(number_of_slices)
+        presence = (slices >= fleet.postponed_start[rows, None]) & (slices < rows_end[:, None])
+        usage[~presence] = 0
+        return usage
+
+    def __generate_avg_and_percentile_for_profile(self, profile, count : int):
+        """Generate for n VMs of a profile random average and percentile values included in profile bounds
+
+        Parameters
+        ----------
+        profile : UsageProfile
+            profile considered
+        count : int
+            number of VMs
+
+        Returns
+        -------
+        average : np.ndarray
+            randomly chosen average cpu values
+        percentile : np.ndarray
+            randomly chosen percentile cpu values
+        """
+        avg_min, avg_max = profile.get_average_bounds()
+        per_min, per_max = profile.get_percentile_bounds()
+        average = np.random.randint(math.ceil(avg_min), math.floor(avg_max), size=count)
+        percentile = np.random.randint(np.maximum(average, math.ceil(per_min)), math.floor(per_max)) # percentile is forced to be higher than avg
+        return average, percentile
+
+    def __convert_to_cpu_targets(self, distribution_values : list):
+        """Convert distribution values to cpu targets (rounded and bounded to [1;100])
+
+        Parameters
+        ----------
+        distribution_values : list
+            distribution to consider
+
+        Returns
+        -------
+        targets : np.ndarray
+            uint8 cpu targets
+        """
+        return np.clip(np.round(distribution_values), 1, 100).astype(np.uint8)
+
     def __generate_periodic_workload(self, vm : VmModel):
         """Build a periodic workload in the sense that cpu usage is reproduced through time
 
@@ -61,14 +173,7 @@ class VmUsageBuilder(object):
         for j in range(self.slices_per_scope):
             value_per_slice.append(self.__get_random_value_in(gaussian))
             
-        cpu_target = list()
-        timesheet = vm.get_timesheet()
-        for scope in timesheet.values():
-            for slice_index, slice_presence in enumerate(scope):
-                if not slice_presence:
-                    continue
-                cpu_target.append(value_per_slice[slice_index])
-        return cpu_target
+        return [value_per_slice[slice_number % self.slices_per_scope] for slice_number in vm.get_timesheet().get_present_slices()]
 
     def __generate_nonperiodic_workload(self, vm : VmModel):
         """Build a non periodic workload in the sense that cpu usage values are randomly pick through time
@@ -84,14 +189,7 @@ class VmUsageBuilder(object):
             list of cpu usage value
         """
         gaussian = self.__generate_gaussian_distribution_from_model(vm=vm)
-        cpu_target = list()
-        timesheet = vm.get_timesheet()
-        for scope in timesheet.values():
-            for slice_index, slice_presence in enumerate(scope):
-                if not slice_presence:
-                    continue
-                cpu_target.append(self.__get_random_value_in(gaussian))
-        return cpu_target
+        return [self.__get_random_value_in(gaussian) for slice_number in vm.get_timesheet().get_present_slices()]
 
     def __generate_gaussian_distribution_from_model(self, vm : VmModel):
         """Generate a gaussian distribution matching vm model specifications
@@ -103,11 +201,11 @@ class VmUsageBuilder(object):
 
         Returns
         -------
-        x : list
-            list of cpu usage value following a gaussian distribution
+        x : np.ndarray
+            quantiles of the gaussian distribution (shared cache table)
         """
         workload_cpu_avg, workload_cpu_per = self.__generate_avg_and_percentile(vm)
-        return self.distribution_generator.generate_gaussian_distribution_from_avg(workload_cpu_avg, workload_cpu_per)
+        return self.distribution_generator.get_gaussian_quantiles(workload_cpu_avg, workload_cpu_per)
 
     def __generate_avg_and_percentile(self, vm : VmModel):
         """Generate two random values representing an average and a percentile included in profile bounds
@@ -4,8 +4,12 @@ Loads workload profiles (command template, constraints, acronyms) and assigns
 them to VMs according to constraints and frequencies; then expands placeholders
 (§time, §cpu, §target, etc.) to produce each VM's commands_list.
 """
-import yaml, math, random
+import yaml, math
+import numpy as np
+from generator.vmfleet import VmFleet
 from generator.workloadprofile import WorkloadProfile
+from generator.stageprofiler import disabled_profiler
+from generator.reproducibilitymanifest import ReproducibilityManifest
 
 class WorkloadBuilder(object):
     """
@@ -19,20 +23,36 @@ class WorkloadBuilder(object):
         static acronyms (key/value to be exchange in command generation)
     vm_workloads : dict
         WorkloadProfile object dict
+    slice_duration : int
+        duration of a slice in seconds (§time)
+    yaml_hash : str
+        sha256 of workload scenario file (recorded in saved fleets to detect a different scenario on load)
+    lazy_commands : bool
+        if True, commands are generated on demand when iterated (see LazyCommands) instead of being stored
+    profiler : StageProfiler
+        measures scenario load, workload attribution and command generation (disabled by default)
 
     Public Methods
     -------
     attribute_workload_commands_to_vm_list
         Generate workload commands for each VM
+    generate_workload_commands
+        Generate commands of VMs with an attributed workload (such as a loaded fleet)
     get_context
         acronym getter
+    set_slice_duration
+        Change slice duration without reloading scenario
     """
     def __init__(self, **kwargs):
         required_attributes = ["yaml_file", "slice_duration"]
         for required_attribute in required_attributes:
             if required_attribute not in kwargs: raise ValueError("Missing required attributes", required_attribute, "in", required_attributes)
         self.slice_duration = kwargs["slice_duration"]
-        self.__load_from_yaml(kwargs["yaml_file"])
+        self.yaml_hash = ReproducibilityManifest.get_file_hash(kwargs["yaml_file"])
+        self.lazy_commands = kwargs["lazy_commands"] if "lazy_commands" in kwargs else False
+        self.profiler = kwargs["profiler"] if "profiler" in kwargs else disabled_profiler
+        with self.profiler.stage("yaml_load"):
+            self.__load_from_yaml(kwargs["yaml_file"])
 
     def __load_from_yaml(self, yaml_file : str):
         """Load workload profiles and acronyms from a YAML file.
@@ -60,108 +80,106 @@ class WorkloadBuilder(object):
             list of VMs : VM object will be updated with workload
         """
         # Update VM attributes
-        self.__attribute_workloads_to_vm_list(vm_list)
-        for workload in self.workloads.values():
-            workload.generate_and_apply_worload_commands(vm_list)
+        with self.profiler.stage("workload_attribution", items=len(vm_list)):
+            self.__attribute_workloads_to_vm_list(vm_list)
+        self.generate_workload_commands(vm_list)
 
-    def __attribute_workloads_to_vm_list(self, vm_list : list):
-        """Attribute given workloads to each VM
+    def generate_workload_commands(self, vm_list, lazy : bool = None):
+        """Generate workload commands of VMs whose workload is already attributed (such as a fleet loaded from .npy columns)
 
         Parameters
         ----------
         vm_list : list
-            list of VMs : VM object will be updated with workload
+            list of VMs (or VmFleet) to be updated
+        lazy : bool
+            generate commands on demand (builder lazy_commands setting if None)
+
+        Raises
+        ------
+        ValueError
+            If vm_list is a fleet saved with another slice duration or workload scenario
+        """
+        if isinstance(vm_list, VmFleet):
+            if (vm_list.slice_duration is not None) and (vm_list.slice_duration != self.slice_duration):
+                raise ValueError("Fleet was saved with a slice duration of", vm_list.slice_duration, "not", self.slice_duration)
+            if (vm_list.workload_hash is not None) and (vm_list.workload_hash != self.yaml_hash):
+                raise ValueError("Fleet was saved with another workload scenario (sha256 " + vm_list.workload_hash + ")")
+        with self.profiler.stage("command_generation", items=len(vm_list)):
+            for workload in self.workloads.values():
+                workload.generate_and_apply_worload_commands(vm_list, lazy=self.lazy_commands if lazy is None else lazy)
+
+    def __attribute_workloads_to_vm_list(self, vm_list):
+        """Attribute given workloads to each VM
+        Constraints are evaluated once as one boolean mask per workload. Most restrictive workloads are treated first,
+        VMs left over (when constraints did not match the number of VMs) are treated again in a new pass
+
+        Parameters
+        ----------
+        vm_list : VmFleet or list
+            VMs to be updated with workload
         """
-        total_number_of_vm = len(vm_list)
-        workload_to_treat = list(self.workloads.keys())
-        treated_workload = list()
-        treated_vm = list()
-        
-        while workload_to_treat:
-
-            conform_list = self.__generate_conform_vm_list_per_workload(vm_list, vm_to_exlude=treated_vm, workload_to_exclude=treated_workload)
-            if len(conform_list) <=0:
-                #print("Warning : Unable to deploy following workloads to profile set due to low number of VM or constraints", workload_to_treat)
-                break
-
-            conform_list_count = {workload_name : len(conform_list[workload_name]) for workload_name in conform_list.keys()}
-            # Treat more restrictive workload
-            min_workload = min(conform_list_count, key=lambda k: conform_list_count[k])
-            required_vm = math.ceil(self.workloads[min_workload].get_freq()*total_number_of_vm)
-            attributed_vm = self.__attribute_specific_workload_to_conform_list(min_workload, conform_list[min_workload], required_vm)
-            
-            # Update loop data
-            workload_to_treat.remove(min_workload)
-            treated_workload.append(min_workload)
-            treated_vm.extend(attributed_vm)
-        
-        not_treated = list() # Rare case : if workloads constraint did not match the number of VMs
-        for vm in vm_list: 
-            if vm not in treated_vm: not_treated.append(vm)
-        if not_treated: self.__attribute_workloads_to_vm_list(not_treated)
-
-    def __attribute_specific_workload_to_conform_list(self, workload_name : str, conform_vm : list(), required_vm : int):
-        """Attribute specified workload to n (required_vm attribute) randomly pick VM in conform_vm list
+        conformity_masks = {workload_name : workload_profile.get_constraint_mask(vm_list) for workload_name, workload_profile in self.workloads.items()}
+        remaining = np.ones(len(vm_list), dtype=bool)
+        while remaining.any():
+            total_number_of_vm = np.count_nonzero(remaining)
+            workload_to_treat = list(self.workloads.keys())
+            while workload_to_treat:
+
+                conform_list_count = {workload_name : np.count_nonzero(conformity_masks[workload_name] & remaining) for workload_name in workload_to_treat}
+                conform_list_count = {workload_name : count for workload_name, count in conform_list_count.items() if count > 0}
+                if len(conform_list_count) <=0:
+                    #print("Warning : Unable to deploy following workloads to profile set due to low number of VM or constraints", workload_to_treat)
+                    break
+
+                # Treat more restrictive workload
+                min_workload = min(conform_list_count, key=lambda k: conform_list_count[k])
+                required_vm = math.ceil(self.workloads[min_workload].get_freq()*total_number_of_vm)
+                attributed_vm = self.__attribute_specific_workload_to_conform_list(vm_list, min_workload, np.flatnonzero(conformity_masks[min_workload] & remaining), required_vm)
+
+                # Update loop data
+                workload_to_treat.remove(min_workload)
+                remaining[attributed_vm] = False
+
+            if np.count_nonzero(remaining) >= total_number_of_vm:
+                break # Rare case : remaining VMs match no workload constraint, no further pass can treat them
+
+    def __attribute_specific_workload_to_conform_list(self, vm_list, workload_name : str, conform_vm : np.ndarray, required_vm : int):
+        """Attribute specified workload to n (required_vm attribute) randomly pick VM in conform_vm indices
 
         Parameters
         ----------
+        vm_list : VmFleet or list
+            VMs considered
         workload_name : str
             The workload identifier to be attributed
-        conform_vm : list
-            list of potential VM (may be larger than required vm number)
+        conform_vm : np.ndarray
+            indices of potential VM (may be larger than required vm number)
         required_vm : int
             the number of VM requested to have this workload
 
         Returns
         -------
-        attributed_vm : list
-            list of VM attributed to this workload
+        attributed_vm : np.ndarray
+            indices of VM attributed to this workload
         """
-        delta = len(conform_vm) - required_vm
-        if delta < 0:
+        if len(conform_vm) < required_vm:
             # print("Could not fullfil workload attribution due to constraints on", workload_name, "required:", required_vm, "available:", len(conform_vm))
             required_vm = len(conform_vm)
-            random_list = list()
+        attributed_vm = np.sort(np.random.permutation(conform_vm)[:required_vm])
+        if isinstance(vm_list, VmFleet):
+            vm_list.workload[attributed_vm] = vm_list.get_workload_code(workload_name)
         else:
-            random_list = [False for i in range(delta)]
-        random_list.extend([True for i in range(required_vm)])
-        random.shuffle(random_list)
-        attributed_vm = list()
-        for vm_index, is_attributed in enumerate(random_list):
-            if is_attributed:
-                conform_vm[vm_index].set_workload(workload_name)
-                attributed_vm.append(conform_vm[vm_index])
+            for vm_index in attributed_vm: vm_list[vm_index].set_workload(workload_name)
         return attributed_vm
 
-    def __generate_conform_vm_list_per_workload(self, vm_list : list, vm_to_exlude = list(), workload_to_exclude = list()):
-        """Generate a dict of workload_name -> list of VMs that satisfy that workload's constraints.
-
-        Parameters
-        ----------
-        vm_list : list
-            List of VMs to filter.
-        vm_to_exlude : list
-            VMs to ignore (typo preserved for compatibility).
-        workload_to_exclude : list
-            Workload names to ignore.
-
-        Returns
-        -------
-        workload_conformity_list : dict
-            Maps each workload name to the list of conforming VMs.
+    def set_slice_duration(self, slice_duration : int):
+        """ Change slice duration of builder and its workload profiles, without reloading scenario
+        slice_duration : int
+            Duration of a slice in seconds
         """
-        workload_conformity_list = dict()
-        for vm in vm_list:
-            if vm in vm_to_exlude: 
-                continue
-            for workload_name, workload_profile in self.workloads.items():
-                if workload_name in workload_to_exclude: 
-                    continue
-                if workload_profile.does_vm_verify_constraints(vm):
-                    if workload_name not in workload_conformity_list:
-                        workload_conformity_list[workload_name] = list()
-                    workload_conformity_list[workload_name].append(vm)
-        return workload_conformity_list
+        self.slice_duration = slice_duration
+        for workload in self.workloads.values():
+            workload.set_slice_duration(slice_duration)
 
     def get_context(self, acronym : str):
         """ Getter to access static acronym
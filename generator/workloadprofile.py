@@ -2,9 +2,16 @@
 
 Each profile has a command string with placeholders (§time, §cpu, §mem, §target, etc.),
 constraints (profile, cpu/mem min/max, freq), and optional dynamic acronyms (eval'd).
+Command template is split once into literal/acronym segments and dynamic acronym
+expressions are compiled once; generated commands are memoized on (cpu, mem, target).
 """
 from generator.vmmodel import *
-import math
+from generator.vmfleet import VmFleet
+from generator.lazycommands import LazyCommands
+import math, re
+import numpy as np
+
+standard_acronyms = ["§time", "§cpu", "§mem", "§target"] # in replacement order
 
 class WorkloadProfile(object):
     """
@@ -15,13 +22,23 @@ class WorkloadProfile(object):
     ----------
     usage_profiles : dict
         Vm usage scenario
+    command_segments : list
+        command template split as literal strings and acronyms (to be replaced)
+    command_cache : dict
+        (cpu, mem, target) -> generated command
 
     Public Methods
     -------
     does_vm_verify_constraints(vm : VmModel):
        Test if a VM verify this workload profile constraints
-    generate_and_apply_worload_commands(vm_list : list):
+    get_constraint_mask(vm_list):
+       Test constraints on every VM of a list (or fleet) at once
+    generate_and_apply_worload_commands(vm_list : list, lazy : bool):
         Generate and apply commands list for each VM corresponding to its profile category
+    get_command(cpu : int, mem, targeted_usage : int):
+        Return (memoized) command for a VM configuration and a CPU target
+    set_slice_duration(slice_duration : int):
+        Change slice duration (memoized commands are dropped)
     """
 
     def __init__(self, name : str, workload_as_dict : dict, global_acronyms : dict, slice_duration : int):
@@ -34,6 +51,32 @@ class WorkloadProfile(object):
         self.dynamic_acronyms = workload_as_dict["acronyms"] if "acronyms" in workload_as_dict else dict()
         self.constraint = workload_as_dict["constraint"]
         self.slice_duration = slice_duration
+        self.__compile_templates()
+
+    def __compile_templates(self):
+        """Split command template in segments and compile dynamic acronym expressions
+        Acronyms are matched in replacement order (standard ones, then custom ones)
+        """
+        acronyms = standard_acronyms + [key for key in self.dynamic_acronyms.keys() if key not in standard_acronyms]
+        acronym_pattern = re.compile("(" + "|".join([re.escape(acronym) for acronym in acronyms]) + ")")
+        self.command_segments = [segment for segment in acronym_pattern.split(self.command) if segment]
+        # Standard acronyms become variables of compiled expressions
+        standard_pattern = re.compile("|".join([re.escape(acronym) for acronym in standard_acronyms]))
+        to_variable = lambda match : "acronym_" + match.group(0)[1:]
+        self.compiled_acronyms = {key : compile(standard_pattern.sub(to_variable, expression), key, "eval") for key, expression in self.dynamic_acronyms.items()}
+        self.command_cache = dict()
+
+    def __getstate__(self):
+        """Compiled acronym expressions (code objects) cannot be pickled: they are compiled again on unpickling"""
+        state = self.__dict__.copy()
+        del state["compiled_acronyms"]
+        return state
+
+    def __setstate__(self, state : dict):
+        self.__dict__.update(state)
+        command_cache = self.command_cache
+        self.__compile_templates()
+        self.command_cache = command_cache
 
     def does_vm_verify_constraints(self, vm : VmModel):
         """ Test if a VM verify this workload profile constraints
@@ -62,16 +105,47 @@ class WorkloadProfile(object):
                 return False
         return True
 
-    def generate_and_apply_worload_commands(self, vm_list : list):
+    def get_constraint_mask(self, vm_list):
+        """ Test this workload profile constraints on every VM at once
+        Fleet columns are compared directly, VmModel lists are tested VM per VM
+        Parameters
+        ----------
+        vm_list : VmFleet or list
+            VMs to be tested on workload profile constraints
+
+        Returns
+        -------
+        mask : np.ndarray
+            boolean array, True for VMs respecting constraints
+        """
+        if not isinstance(vm_list, VmFleet):
+            return np.fromiter((self.does_vm_verify_constraints(vm) for vm in vm_list), dtype=bool, count=len(vm_list))
+        fleet = vm_list
+        mask = np.ones(len(fleet), dtype=bool)
+        if "profile" in self.constraint:
+            codes = [code for code, profile in enumerate(fleet.profile_names) if profile in self.constraint["profile"]]
+            mask &= np.isin(fleet.profile, codes)
+        for attribute, column in (("mem", fleet.mem), ("cpu", fleet.cpu)):
+            if attribute not in self.constraint: continue
+            if "min" in self.constraint[attribute]: mask &= column >= self.constraint[attribute]["min"]
+            if "max" in self.constraint[attribute]: mask &= column <= self.constraint[attribute]["max"]
+        return mask
+
+    def generate_and_apply_worload_commands(self, vm_list : list, lazy : bool = False):
         """Generate and apply commands list for each VM corresponding to its profile category
         Parameters
         ----------
         vm_list : list
             list of VM to be updated
+        lazy : bool
+            if True, VMs receive a LazyCommands iterable : commands are generated when iterated (by exporters)
         """
         filtered_list = self.__filter_list(vm_list)
         for vm in filtered_list:
-            self.__generate_commands_from_vm_usage(vm)
+            if lazy:
+                vm.set_commands_list(LazyCommands(self, vm))
+            else:
+                self.__generate_commands_from_vm_usage(vm)
 
     def __generate_commands_from_vm_usage(self, vm : VmModel):
         """Retrieve VM usage list and generate commands list based on it
@@ -80,52 +154,44 @@ class WorkloadProfile(object):
         vm : VmModel
             vm targeted
         """
+        cpu, mem = vm.get_cpu(), vm.get_mem()
         commands_list = list()
         for targeted_usage in vm.get_usage():
-            commands_list.append(self.__generate_command(vm, targeted_usage))
+            commands_list.append(self.get_command(cpu, mem, targeted_usage))
         vm.set_commands_list(commands_list)
 
-    def __generate_command(self, vm : VmModel, targeted_usage : int):
-        """Generate a command by interpreting static and dynamic acronyms
-        ----------
-        targeted_usage : int
-            CPU Targeted usage
+    def set_slice_duration(self, slice_duration : int):
+        """Change slice duration (§time acronym) for a new experiment. Memoized commands are dropped as they may depend on it"""
+        self.slice_duration = slice_duration
+        self.command_cache = dict()
 
-        Returns
-        -------
-        command : str
-            the generated command       
-        """
-        # Interpret and evaluate standard dynamic acronyms
-        command = self.__replace_standard_dynamic_acronyms(self.command, vm, targeted_usage)
-        # Interpret and evaluate custom dynamic acronyms
-        command = self.__replace_custom_dynamic_acronyms(command, vm, targeted_usage)
-        return command
-
-    def __replace_standard_dynamic_acronyms(self, command : str, vm : VmModel, targeted_usage : int):
-        """Replace in specified command standard dynamic acronym
-        /!\ exception is §name, managed by VmModel object as we may want to change identifier based on local or remote access
+    def get_command(self, cpu : int, mem, targeted_usage : int):
+        """Return command generated for a VM configuration and a CPU target (memoized as target is only in 1..100)
         ----------
-        command : str
-            Command to be interpreted
+        cpu : int
+            VM cpu configuration
+        mem : int or float
+            VM memory configuration
         targeted_usage : int
             CPU Targeted usage
 
         Returns
         -------
         command : str
-            the generated command       
+            the generated command
         """
-        custom_command = command.replace("§time", str(self.slice_duration))
-        custom_command = custom_command.replace("§cpu", str(vm.get_cpu()))
-        custom_command = custom_command.replace("§mem", str(vm.get_mem()))
-        return custom_command.replace("§target", str(targeted_usage))
+        key = (cpu, mem, targeted_usage)
+        if key not in self.command_cache:
+            self.command_cache[key] = self.__generate_command(cpu, mem, targeted_usage)
+        return self.command_cache[key]
 
-    def __replace_custom_dynamic_acronyms(self, command : str, vm : VmModel, targeted_usage : int):
-        """Replace in specified command custom dynamic acronym
+    def __generate_command(self, cpu : int, mem, targeted_usage : int):
+        """Generate a command by interpreting standard and dynamic acronyms on template segments
         ----------
-        command : str
-            Command to be interpreted
+        cpu : int
+            VM cpu configuration
+        mem : int or float
+            VM memory configuration
         targeted_usage : int
             CPU Targeted usage
 
@@ -134,17 +200,13 @@ class WorkloadProfile(object):
         command : str
             the generated command       
         """
-        dynamic_values_evaluated = dict()
-        # Interpret dynamically generated acronyms
-        for key, dynamic_value in self.dynamic_acronyms.items():
-            value_interpreted = self.__replace_standard_dynamic_acronyms(dynamic_value, vm, targeted_usage)
-            value_evaluated = eval(value_interpreted)
-            dynamic_values_evaluated[key] = str(value_evaluated)
-        # Replace dynamically generated acronyms
-        targeted_command = str(command)
-        for key, final_value in dynamic_values_evaluated.items():
-            targeted_command = targeted_command.replace(key, final_value)
-        return targeted_command
+        variables = {"acronym_time" : self.slice_duration, "acronym_cpu" : cpu, "acronym_mem" : mem, "acronym_target" : targeted_usage}
+        values = {acronym : str(variables["acronym_" + acronym[1:]]) for acronym in standard_acronyms}
+        # Evaluate dynamic acronyms
+        for key, compiled_expression in self.compiled_acronyms.items():
+            if key in values: continue
+            values[key] = str(eval(compiled_expression, globals(), variables))
+        return "".join([values.get(segment, segment) for segment in self.command_segments])
 
     def __filter_list(self, vm_list):
         """ Return list of VM with the same workload name as the current instance.
@@ -153,6 +215,9 @@ class WorkloadProfile(object):
         vm_list : list
             list of VM
         """
+        if isinstance(vm_list, VmFleet):
+            if self.name not in vm_list.workload_names: return list()
+            return [vm_list.get_vm(index) for index in np.flatnonzero(vm_list.workload == vm_list.get_workload_code(self.name))]
         return [vm for vm in vm_list if vm.get_workload() == self.name]
 
     def get_freq(self):
@@ -0,0 +1,33 @@
+"""Tests for benchmarks.analyserbenchmark (AnalyserBenchmark)."""
+import unittest
+
+try:
+    from benchmarks.analyserbenchmark import AnalyserBenchmark
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+
+@unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
+class TestAnalyserBenchmark(unittest.TestCase):
+    """Tests for analyser benchmark cases and measures."""
+
+    def test_cases_by_increasing_size(self):
+        benchmark = AnalyserBenchmark(sizes=[1000, 100])
+        self.assertEqual([case["name"] for case in benchmark.get_cases()], ["analyser-vm-100", "analyser-vm-1000"])
+
+    def test_run_case_measures_analyser_stages(self):
+        benchmark = AnalyserBenchmark(sizes=[200], trace_days=2, readings_days=2, lifetime_condition=3600, readings_vm_count=200,
+            number_of_profile=2, timestamp_step=86400, trace_memory=False)
+        measures = benchmark.run_case(benchmark.get_cases()[0])
+        self.assertEqual(measures["vm_count"], 200)
+        self.assertGreater(measures["readings_count"], 0)
+        stages = {stage["name"] : stage for stage in measures["stages"]}
+        for name in ["get_cpu_and_mem_average_distribution", "build_n_scenario",
+                "build_arrival_and_departure_rates_per_label", "build_periodicity_rate_per_label"]:
+            self.assertIn(name, stages)
+        self.assertEqual(stages["build_periodicity_rate_per_label"]["items"], measures["readings_count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Tests for benchmarks.benchmarkcomparison (BenchmarkComparison)."""
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.benchmarkcomparison import BenchmarkComparison
+
+
+def make_results(usage_time=1.0, usage_memory=100 << 20):
+    return {"format" : "cloudfactory-benchmark",
+        "cases" : [{"name" : "vm-100_hour-day-7", "wall_time" : 2.0, "generation_time" : 1.5, "max_rss" : 200 << 20,
+            "stages" : [{"name" : "usage_sampling", "wall_time" : usage_time, "peak_memory" : usage_memory},
+                {"name" : "yaml_load", "wall_time" : 0.001, "peak_memory" : 1000}]},
+            {"name" : "vm-1000000_minute-day-30", "skipped" : True}]}
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+    """Tests for benchmark results diff."""
+
+    def test_identical_runs_have_no_regression(self):
+        comparison = BenchmarkComparison(baseline=make_results(), current=make_results())
+        self.assertEqual(comparison.get_regressions(), [])
+        self.assertTrue(all(row["change"] in [0, None] for row in comparison.compare()))
+
+    def test_regression_above_threshold(self):
+        comparison = BenchmarkComparison(baseline=make_results(), current=make_results(usage_time=1.5, usage_memory=60 << 20), threshold=0.2)
+        regressions = comparison.get_regressions()
+        self.assertEqual([(row["stage"], row["metric"]) for row in regressions], [("usage_sampling", "wall_time")])
+        self.assertAlmostEqual(regressions[0]["change"], 0.5)
+        table = comparison.format()
+        self.assertIn("REGRESSION", table)
+        self.assertIn("improvement", table)
+
+    def test_small_measures_are_ignored(self):
+        current = make_results()
+        current["cases"][0]["stages"][1]["wall_time"] = 0.01
+        comparison = BenchmarkComparison(baseline=make_results(), current=current)
+        rows = [row for row in comparison.compare() if row["stage"] == "yaml_load"]
+        self.assertTrue(all(row["change"] is None for row in rows))
+
+    def test_unmatched_cases_are_ignored(self):
+        current = make_results()
+        current["cases"][0]["name"] = "vm-10_hour-day-7"
+        self.assertEqual(BenchmarkComparison(baseline=make_results(), current=current).compare(), [])
+
+    def test_load_rejects_other_formats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline, current = os.path.join(tmp, "baseline.json"), os.path.join(tmp, "current.json")
+            with open(baseline, 'w') as f:
+                json.dump(make_results(), f)
+            with open(current, 'w') as f:
+                json.dump({"format" : "cloudfactory-profile"}, f)
+            self.assertEqual(len(BenchmarkComparison.load(baseline, baseline).compare()), 7)
+            with self.assertRaises(ValueError):
+                BenchmarkComparison.load(baseline, current)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Tests for generator.clustersimulator (ClusterSimulator)."""
+import unittest
+import numpy as np
+from generator.vmmodel import VmModel
+from generator.vmfleet import VmFleet
+from generator.clustersimulator import ClusterSimulator
+
+
+class TestClusterSimulator(unittest.TestCase):
+    """Tests for placement replay and sizing results."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+
+    def _make_fleet(self, cpu, mem, start, lifetime, number_of_slices=4):
+        fleet = VmFleet(cpu=cpu, mem=mem)
+        fleet.set_temporality(slices_per_scope=number_of_slices, number_of_scope=1)
+        fleet.postponed_start[:] = start
+        fleet.lifetime[:] = lifetime
+        return fleet
+
+    def test_requires_host_configuration(self):
+        with self.assertRaises(ValueError):
+            ClusterSimulator(host_cpu=8)
+        with self.assertRaises(ValueError):
+            ClusterSimulator(host_cpu=8, host_mem=16, strategy="random")
+
+    def test_decreasing_order_packs_largest_first(self):
+        # Arrival order 2, 2, 4, 4, 4 would need 3 hosts of 8 cores, decreasing order needs 2
+        fleet = self._make_fleet([2, 2, 4, 4, 4], [1] * 5, [0] * 5, [0] * 5)
+        result = ClusterSimulator(host_cpu=8, host_mem=64).simulate(fleet)
+        self.assertEqual(result["host_count"], 2)
+        self.assertEqual(result["placement"].tolist(), [1, 1, 0, 0, 1])
+
+    def test_departures_free_hosts(self):
+        fleet = self._make_fleet([8, 8], [1, 1], [0, 2], [2, 0])
+        result = ClusterSimulator(host_cpu=8, host_mem=64).simulate(fleet)
+        self.assertEqual(result["host_count"], 1)
+        self.assertEqual(result["active_hosts"].tolist(), [1, 1, 1, 1])
+        self.assertEqual(result["allocated_cpu"].tolist(), [1, 1, 1, 1])
+
+    def test_memory_constraint(self):
+        fleet = self._make_fleet([1, 1, 1], [10, 10, 10], [0, 0, 0], [0, 0, 0])
+        result = ClusterSimulator(host_cpu=64, host_mem=16).simulate(fleet)
+        self.assertEqual(result["host_count"], 3)
+
+    def test_best_fit_picks_fullest_host(self):
+        fleet = self._make_fleet([6, 4, 2], [1, 1, 1], [0, 0, 1], [0, 0, 0])
+        ffd = ClusterSimulator(host_cpu=8, host_mem=64, strategy="ffd").simulate(fleet)
+        bfd = ClusterSimulator(host_cpu=8, host_mem=64, strategy="bfd").simulate(fleet)
+        self.assertEqual(ffd["placement"].tolist(), [0, 1, 0])
+        self.assertEqual(bfd["placement"].tolist(), [0, 1, 0])
+        fleet = self._make_fleet([4, 6, 2], [1, 1, 1], [0, 0, 1], [0, 0, 0])
+        bfd = ClusterSimulator(host_cpu=8, host_mem=64, strategy="bfd").simulate(fleet)
+        self.assertEqual(bfd["placement"].tolist(), [1, 0, 0])
+
+    def test_cpu_utilization_follows_usage(self):
+        fleet = self._make_fleet([2, 4], [1, 1], [0, 0], [0, 0], number_of_slices=2)
+        fleet.usage[:] = [[50, 100], [25, 0]]
+        result = ClusterSimulator(host_cpu=8, host_mem=64).simulate(fleet)
+        self.assertTrue(np.allclose(result["cpu_utilization"], [2 / 8, 2 / 8]))
+
+    def test_vm_list_is_converted(self):
+        fleet = self._make_fleet([2, 4], [1, 1], [0, 1], [0, 0])
+        result = ClusterSimulator(host_cpu=4, host_mem=64).simulate(fleet.to_vm_list())
+        self.assertEqual(result["host_count"], 2)
+
+    def test_too_large_vm_raises(self):
+        fleet = self._make_fleet([16], [1], [0], [0])
+        with self.assertRaises(ValueError):
+            ClusterSimulator(host_cpu=8, host_mem=64).simulate(fleet)
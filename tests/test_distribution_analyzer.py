@@ -7,6 +7,7 @@ try:
     import pandas as pd
     import numpy as np
     import analyserlib.distributionanalyzer as distributionanalyzer
+    import analyserlib.synthetictrace as synthetictrace
     HAS_DEPS = True
 except ImportError:
     HAS_DEPS = False
@@ -57,6 +58,51 @@ class TestBuildCpuAndMemDistributionDataframes(unittest.TestCase):
         self.assertIn("2.0", mem_df.columns)
         self.assertIn("4.0", mem_df.columns)
 
+    def test_window_frequencies_match_per_window_filtering(self):
+        trace_df = pd.DataFrame({
+            "vmcorecount": [1, 2, 2, 4, 8, 1, 2],
+            "vmmemory": [2.0, 4.0, 4.0, 8.0, 16.0, 2.0, 4.0],
+            "vmcreated": [0, 0, 3600, 3600, 5000, 9000, 20000],
+            "vmdeleted": [7200, 3600, 3600, 10800, 4000, 12000, 1000],  # last two deleted before creation
+        })
+        cpu_df, mem_df = distributionanalyzer.build_cpu_and_mem_distribution_dataframes(
+            trace_df,
+            timestamp_begin=0,
+            timestamp_end=14400,
+            timestamp_step=3600,
+        )
+        self.assertEqual(list(cpu_df["timestamp"]), [0, 3600, 7200, 10800])
+        for _, row in cpu_df.iterrows():
+            timestamp = row["timestamp"]
+            alive_df = trace_df.loc[(trace_df["vmdeleted"] >= timestamp) & (trace_df["vmcreated"] <= timestamp + 3600)]
+            for key in ["1", "2", "4", "8"]:
+                expected = round((alive_df["vmcorecount"] == int(key)).sum() / len(alive_df), 2)
+                self.assertAlmostEqual(row[key], expected)
+        self.assertEqual(list(cpu_df["8"]), [0.0, 0.2, 0.0, 0.0])
+        self.assertEqual(list(mem_df["16.0"]), list(cpu_df["8"]))
+
+
+@unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
+class TestDistributionFromChunks(unittest.TestCase):
+    """Tests for build_cpu_and_mem_distribution_dataframes_from_chunks and get_cpu_and_mem_average_distribution_from_chunks."""
+
+    def setUp(self):
+        self.trace_df = synthetictrace.build_synthetic_vmtable(2000, seed=4, duration=3*86400, invalid_lifetime_ratio=0.05)
+
+    def test_chunks_give_same_frames_as_whole_trace(self):
+        chunks = [self.trace_df.iloc[begin:begin+300] for begin in range(0, len(self.trace_df), 300)]
+        expected = distributionanalyzer.build_cpu_and_mem_distribution_dataframes(self.trace_df)
+        result = distributionanalyzer.build_cpu_and_mem_distribution_dataframes_from_chunks(iter(chunks))
+        for expected_df, result_df in zip(expected, result):
+            pd.testing.assert_frame_equal(result_df, expected_df)
+
+    def test_chunks_give_same_average_distribution(self):
+        chunks = [self.trace_df.iloc[begin:begin+700] for begin in range(0, len(self.trace_df), 700)]
+        expected = distributionanalyzer.get_cpu_and_mem_average_distribution(self.trace_df, timestamp_step=600)
+        result = distributionanalyzer.get_cpu_and_mem_average_distribution_from_chunks(chunks, timestamp_step=600)
+        for expected_df, result_df in zip(expected, result):
+            pd.testing.assert_frame_equal(result_df, expected_df)
+
 
 @unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
 class TestGetCpuAndMemAverageDistribution(unittest.TestCase):
@@ -46,3 +46,46 @@ class TestDistributionGenerator(unittest.TestCase):
         dg = DistributionGenerator()
         out = dg.generate_heavy_tail_gaussian_for_deployments(20, 10)
         self.assertTrue(np.all(out >= 0))
+
+    def test_solve_folded_normal_sigma_matches_percentile(self):
+        dg = DistributionGenerator()
+        mu, sigma = dg.solve_folded_normal_sigma(np.array([20, 1, 10]), np.array([50, 10, 90]))
+        for m, s, per in zip(mu, sigma, [50, 10, 90]):
+            x = np.abs(np.random.normal(m, s, 200000))
+            self.assertAlmostEqual(np.percentile(x, 95), per, delta=per * 0.02)
+
+    def test_solve_folded_normal_sigma_falls_back_when_unreachable(self):
+        dg = DistributionGenerator()
+        mu, sigma = dg.solve_folded_normal_sigma(30, 30)
+        self.assertEqual(float(mu), 30)
+        self.assertEqual(float(sigma), 1.)
+
+    def test_generate_gaussian_distributions_from_avg_returns_one_row_per_couple(self):
+        dg = DistributionGenerator()
+        table = dg.generate_gaussian_distributions_from_avg(np.array([5, 20]), np.array([30, 40]))
+        self.assertEqual(table.shape, (2, 1000))
+        self.assertTrue(np.all(table >= 0))
+
+    def test_get_gaussian_quantiles_matches_percentile(self):
+        dg = DistributionGenerator()
+        quantiles = dg.get_gaussian_quantiles(20, 50)
+        self.assertEqual(len(quantiles), 1000)
+        self.assertTrue(np.all(np.diff(quantiles) >= 0))
+        self.assertAlmostEqual(np.percentile(quantiles, 95), 50, delta=0.5)
+
+    def test_get_gaussian_quantiles_is_cached(self):
+        dg = DistributionGenerator()
+        first = dg.get_gaussian_quantiles(10, 40)
+        table = dg.get_gaussian_quantiles_table([10, 5, 10], [40, 30, 40])
+        self.assertEqual(len(dg.quantile_cache), 2)
+        self.assertTrue(np.array_equal(table[0], first))
+        self.assertTrue(np.array_equal(table[2], first))
+
+    def test_quantile_cache_evicts_least_recently_used(self):
+        dg = DistributionGenerator()
+        dg.quantile_cache_size = 2
+        dg.get_gaussian_quantiles(10, 40)
+        dg.get_gaussian_quantiles(20, 40)
+        dg.get_gaussian_quantiles(10, 40)
+        dg.get_gaussian_quantiles(30, 40)
+        self.assertEqual(list(dg.quantile_cache.keys()), [(10, 40), (30, 40)])
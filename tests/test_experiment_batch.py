@@ -0,0 +1,69 @@
+"""Tests for generator.experimentbatch (ExperimentBatch)."""
+import os
+import tempfile
+import unittest
+from generator.experimentbatch import ExperimentBatch
+from generator.vmmodel import VmModel
+
+
+class TestExperimentBatch(unittest.TestCase):
+    """Tests for manifest loading and batch runs."""
+
+    root = os.path.join(os.path.dirname(__file__), "..")
+
+    def setUp(self):
+        VmModel.vm_count = 0
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _make_batch(self, manifest, **kwargs):
+        manifest_path = os.path.join(self.tmp.name, "manifest.yml")
+        with open(manifest_path, "w") as f:
+            f.write(manifest)
+        return ExperimentBatch(manifest=manifest_path,
+            distribution=os.path.join(self.root, "examples-scenario", "scenario-vm-distribution-model.yml"),
+            usage=os.path.join(self.root, "examples-scenario", "scenario-vm-usage-model.yml"),
+            workload=os.path.join(self.root, "examples-workload", "scenario-vm-workload.yml"),
+            temporality=(3600, 86400, 2), **kwargs)
+
+    def _read(self, *path):
+        with open(os.path.join(self.tmp.name, *path)) as f:
+            return f.read()
+
+    def test_missing_required_attribute_raises(self):
+        with self.assertRaises(ValueError):
+            ExperimentBatch(manifest="manifest.yml")
+
+    def test_manifest_defaults(self):
+        batch = self._make_batch("experiments:\n  - vm: 10\n  - cpu: 8\n    mem: 16\n    temporality: 600,1800,3\n")
+        self.assertEqual([e["name"] for e in batch.experiments], ["experiment-0", "experiment-1"])
+        self.assertEqual(batch.experiments[0]["temporality"], (3600, 86400, 2))
+        self.assertEqual(batch.experiments[1]["temporality"], (600, 1800, 3))
+
+    def test_manifest_validation(self):
+        with self.assertRaises(ValueError):
+            self._make_batch("experiments:\n  - cpu: 8\n")
+        with self.assertRaises(ValueError):
+            self._make_batch("experiments:\n  - vm: 10\n    name: a\n  - vm: 20\n    name: a\n")
+        with self.assertRaises(ValueError):
+            self._make_batch("experiments:\n  - vm: 10\n    temporality: 600,1000,3\n")
+
+    def test_run_writes_each_experiment_in_its_folder_with_builders_loaded_once(self):
+        manifest = "experiments:\n  - name: {0}/a\n    vm: 10\n    seed: 3\n  - name: {0}/b\n    vm: 20\n    temporality: 600,1800,3\n  - name: {0}/c\n    vm: 10\n    seed: 3\n"
+        batch = self._make_batch(manifest.format(self.tmp.name), export="vms.json", sizing={"host_cpu": 64, "host_mem": 256})
+        batch.run_experiment(batch.experiments[0])
+        generator = batch.generator
+        results = batch.run()
+        self.assertIs(batch.generator, generator)
+        self.assertEqual([os.path.basename(name) for name, _ in results], ["a", "b", "c"])
+        self.assertEqual(self._read("b", "sizing.csv").count("\n"), 1 + 3*3)
+        # Same seed and temporality after another experiment give the same VMs
+        self.assertEqual(self._read("a", "vms.json"), self._read("c", "vms.json"))
+
+    def test_run_on_pool_matches_sequential_run(self):
+        manifest = "experiments:\n  - name: {0}/{1}/a\n    vm: 10\n    seed: 1\n  - name: {0}/{1}/b\n    cpu: 16\n    mem: 32\n    seed: 2\n"
+        for folder, workers in [("sequential", 1), ("pool", 2)]:
+            batch = self._make_batch(manifest.format(self.tmp.name, folder), export="vms.json")
+            batch.run(workers=workers)
+        for name in ["a", "b"]:
+            self.assertEqual(self._read("sequential", name, "vms.json"), self._read("pool", name, "vms.json"))
@@ -1,12 +1,16 @@
 """Tests for generator.experimentgenerator (ExperimentGenerator)."""
+import json
 import os
 import tempfile
 import unittest
+import numpy as np
 from generator.distributionbuilder import DistributionBuilder
 from generator.usagebuilder import UsageBuilder
 from generator.workloadbuilder import WorkloadBuilder
 from generator.experimentgenerator import ExperimentGenerator
-from generator.vmmodel import VmModel
+from generator.vmmodel import VmModel, VmModelEncoder
+from generator.vmfleet import VmFleet
+from generator.jsonlinesvmlist import JsonLinesVmList
 
 
 class TestExperimentGenerator(unittest.TestCase):
@@ -123,3 +127,92 @@ class TestExperimentGenerator(unittest.TestCase):
         vm_list = gen.gen(vm_number=1, number_of_scope=1)
         with self.assertRaises(ValueError):
             gen.write(output_type="invalid", vm_list=vm_list, slice_duration=3600)
+
+    def test_gen_sweep_returns_nested_fleets(self):
+        gen = self._make_generator()
+        sweep = list(gen.gen_sweep(vm_numbers=[60, 20, 40], number_of_scope=2))
+        self.assertEqual([vm_number for vm_number, _ in sweep], [20, 40, 60])
+        previous_ids = set()
+        for vm_number, fleet in sweep:
+            ids = set(fleet.id.tolist())
+            self.assertTrue(previous_ids < ids)
+            self.assertGreaterEqual(len(fleet), vm_number)
+            previous_ids = ids
+
+    def test_gen_sweep_preserves_flavor_distribution(self):
+        np.random.seed(1)
+        gen = self._make_generator()
+        sweep = dict(gen.gen_sweep(vm_numbers=[100, 1000], number_of_scope=1))
+        small, large = sweep[100], sweep[1000]
+        self.assertEqual(len(small), 100)
+        for cpu in np.unique(large.cpu):
+            expected = np.count_nonzero(large.cpu == cpu)*len(small)/len(large)
+            self.assertLessEqual(abs(np.count_nonzero(small.cpu == cpu) - expected), 5)
+
+    def test_gen_sweep_rejects_invalid_counts(self):
+        gen = self._make_generator()
+        with self.assertRaises(ValueError):
+            gen.gen_sweep(vm_numbers=[0, 10], number_of_scope=1)
+        with self.assertRaises(ValueError):
+            gen.gen_sweep(vm_numbers=[], number_of_scope=1)
+
+    def test_gen_sweep_rejects_empty_initial_fleet(self):
+        gen = self._make_generator()
+        gen._ExperimentGenerator__gen_fleet_parts = lambda **kwargs: [VmFleet(cpu=[], mem=[]), VmFleet(cpu=[2], mem=[4])]
+        sweep = gen.gen_sweep(vm_numbers=[10], number_of_scope=2)
+        with self.assertRaises(ValueError):
+            next(sweep)
+
+    def test_write_to_output_folder(self):
+        gen = self._make_generator()
+        vm_list = gen.gen(vm_number=2, number_of_scope=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            output_folder = os.path.join(tmp, "vm-2")
+            gen.write(output_type="bash", vm_list=vm_list, slice_duration=3600, output_folder=output_folder)
+            self.assertTrue(os.path.isfile(os.path.join(output_folder, "setup.sh")))
+            self.assertTrue(os.path.isfile(os.path.join(output_folder, "workload-local.sh")))
+
+    def test_gen_sharded_splits_objective_with_contiguous_ids(self):
+        gen = self._make_generator()
+        fleet = gen.gen_sharded(shards=4, seed=5, vm_number=40, number_of_scope=1)
+        self.assertEqual(len(fleet), 40)
+        self.assertEqual(fleet.id.tolist(), list(range(40)))
+        self.assertEqual(VmModel.vm_count, 40)
+
+    def test_gen_sharded_does_not_depend_on_workers(self):
+        gen = self._make_generator()
+        sequential = gen.gen_sharded(shards=3, workers=1, seed=5, vm_number=30, number_of_scope=2)
+        VmModel.vm_count = 0
+        pooled = gen.gen_sharded(shards=3, workers=2, seed=5, vm_number=30, number_of_scope=2)
+        self.assertEqual(sequential.id.tolist(), pooled.id.tolist())
+        self.assertTrue(np.array_equal(sequential.usage, pooled.usage))
+        self.assertEqual([vm.get_workload() for vm in sequential.to_vm_list()], [vm.get_workload() for vm in pooled.to_vm_list()])
+        self.assertEqual(sequential.commands, pooled.commands)
+
+    def test_gen_sharded_with_cpu_mem_objective(self):
+        gen = self._make_generator()
+        fleet = gen.gen_sharded(shards=2, seed=1, cpu=16, mem=32, number_of_scope=1)
+        self.assertGreater(len(fleet), 0)
+        self.assertEqual(len(set(fleet.id.tolist())), len(fleet))
+
+    def test_export_npy_of_vm_list_can_be_loaded(self):
+        gen = self._make_generator()
+        vm_list = gen.gen(vm_number=4, number_of_scope=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            gen.export(vm_list, os.path.join(tmp, "fleet"), "npy")
+            loaded = VmFleet.load(os.path.join(tmp, "fleet"))
+            self.assertEqual([vm.get_usage() for vm in loaded], [vm.get_usage() for vm in vm_list])
+            with self.assertRaises(ValueError):
+                gen.export(vm_list, os.path.join(tmp, "fleet.csv"), "csv")
+
+    def test_export_json_and_jsonl_hold_same_vms(self):
+        gen = self._make_generator()
+        vm_list = gen.gen(vm_number=4, number_of_scope=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            gen.export(vm_list, os.path.join(tmp, "vm_list.json"), "json")
+            gen.export(vm_list, os.path.join(tmp, "vm_list.jsonl"), "jsonl")
+            with open(os.path.join(tmp, "vm_list.json"), 'r') as f:
+                exported = f.read()
+            self.assertEqual(exported, json.dumps(list(vm_list), cls=VmModelEncoder))
+            loaded = JsonLinesVmList(os.path.join(tmp, "vm_list.jsonl"))
+            self.assertEqual(json.dumps(list(loaded), cls=VmModelEncoder), exported)
@@ -0,0 +1,46 @@
+"""Tests for generator.exporter.exportercbtool (ExporterCBTool)."""
+import os
+import tempfile
+import unittest
+from generator.vmmodel import VmModel
+from generator.vmfleet import VmFleet
+from generator.exporter.exportercbtool import ExporterCBTool
+
+
+class TestExporterCBTool(unittest.TestCase):
+    """Tests for event based CBTOOL scenario export."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+        self.fleet = VmFleet(cpu=[1, 2], mem=[1, 4])
+        self.fleet.set_temporality(slices_per_scope=3, number_of_scope=2)
+        self.fleet.postponed_start[:] = [0, 2]
+        self.fleet.lifetime[:] = [3, 0]
+        self.folder = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.folder.name, "skeleton"), "w") as f:
+            f.write("begin\n§commands§end\n")
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def _write(self, vm_list):
+        ExporterCBTool("skeleton").write(vm_list, slice_duration=60)
+        with open("cloudfactory.cbtool") as f:
+            return [line for line in f.read().splitlines() if not line.startswith("typealter") and not line.startswith("rolealter")]
+
+    def test_idle_slices_are_merged(self):
+        self.assertEqual(self._write(self.fleet), [
+            "begin",
+            "aiattach stress",
+            "waitfor 120s",
+            "aiattach stress",
+            "waitfor 60s",
+            "aidetach ai_1",
+            "waitfor 180s",
+            "end"])
+
+    def test_vm_list_matches_fleet(self):
+        self.assertEqual(self._write(self.fleet.to_vm_list()), self._write(self.fleet))
@@ -0,0 +1,90 @@
+"""Tests for generator.exporter.exportercloudsimplus (ExporterCloudSimPlus)."""
+import bisect
+import os
+import tempfile
+import unittest
+from generator.vmmodel import VmModel
+from generator.vmfleet import VmFleet
+from generator.exporter.exportercloudsimplus import ExporterCloudSimPlus
+
+
+def read_usage(model, time):
+    """Python equivalent of skeleton readUsageBasedOnTime: target of first key greater than time (last one if none)."""
+    keys = sorted(model)
+    index = bisect.bisect_right(keys, time)
+    return model[keys[min(index, len(keys) - 1)]]
+
+
+class TestExporterCloudSimPlus(unittest.TestCase):
+    """Tests for properties and compact csv CloudSim Plus exports."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+        self.fleet = VmFleet(cpu=[1, 2], mem=[1, 4])
+        self.fleet.set_temporality(slices_per_scope=4, number_of_scope=2)
+        self.fleet.postponed_start[:] = [0, 2]
+        self.fleet.usage[0] = [10, 10, 10, 20, 20, 30, 10, 10]
+        self.fleet.usage[1] = [0, 0, 50, 50, 50, 50, 60, 60]
+        self.folder = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.folder.name, "skeleton"), "w") as f:
+            f.write("// skeleton")
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def _properties_models(self):
+        ExporterCloudSimPlus("skeleton").write(self.fleet, slice_duration=60)
+        models = dict()
+        with open("models.properties") as f:
+            for line in f.read().splitlines():
+                name, values = line.split("=")
+                models[name] = {int(time): int(target) for time, target in (value.split(":") for value in values.split(","))}
+        return models
+
+    def _compact_models(self):
+        ExporterCloudSimPlus("skeleton", compact=True).write(self.fleet, slice_duration=60)
+        models = dict()
+        with open("models.csv") as f:
+            for line in f.read().splitlines()[1:]:
+                vm_id, first_time, step, runs = line.split(",")
+                model = models.setdefault("vm" + vm_id + "_model", dict())
+                slice_count = 0
+                for run in runs.split(" "):
+                    target, _, count = run.partition("*")
+                    slice_count += int(count) if count else 1
+                    model[int(first_time) + (slice_count - 1) * int(step)] = int(target)
+        return models
+
+    def test_compact_models_are_run_length_encoded(self):
+        with_compact = self._compact_models()
+        with open("models.csv") as f:
+            self.assertEqual(f.read().splitlines()[1], "0,60,60,10*3 20*2 30 10*2")
+        self.assertEqual(len(with_compact["vm0_model"]), 4)
+
+    def test_compact_models_give_same_usage_as_properties(self):
+        properties = self._properties_models()
+        compact = self._compact_models()
+        self.assertEqual(properties.keys(), compact.keys())
+        for name in properties:
+            for time in range(0, 60 * 12, 30):
+                self.assertEqual(read_usage(properties[name], time), read_usage(compact[name], time), (name, time))
+
+    def test_compact_vms_have_one_column_per_attribute(self):
+        ExporterCloudSimPlus("skeleton", compact=True).write(self.fleet, slice_duration=60)
+        with open("vms.csv") as f:
+            header, first_vm, _ = f.read().splitlines()
+        vm = dict(zip(header.split(","), first_vm.split(",")))
+        self.assertEqual(vm["vmid"], "0")
+        self.assertEqual(vm["vmmips"], "300")
+        self.assertEqual(vm["cloudletlifetime"], "480")
+
+    def test_search_mode_is_set_in_generated_program(self):
+        with open("skeleton", "w") as f:
+            f.write("private static boolean SEARCH = §search§;")
+        for search, expected in ((False, "false"), (True, "true")):
+            ExporterCloudSimPlus("skeleton", search=search).write(self.fleet, slice_duration=60)
+            with open("CloudFactoryGeneratedWorkload.java") as f:
+                self.assertEqual(f.read(), "private static boolean SEARCH = " + expected + ";")
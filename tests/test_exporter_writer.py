@@ -0,0 +1,41 @@
+"""Tests for generator.exporter.exporterwriter (ExporterWriter)."""
+import gzip
+import os
+import tempfile
+import unittest
+from generator.exporter.exporterwriter import ExporterWriter
+
+
+class TestExporterWriter(unittest.TestCase):
+    """Tests for buffered and compressed export writing."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "out.txt")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_write_plain(self):
+        with ExporterWriter(self.path, buffer_size=4) as writer:
+            for chunk in ["ab", "cd", "ef"]:
+                writer.write(chunk)
+        self.assertEqual(writer.path, self.path)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "abcdef")
+
+    def test_buffer_is_flushed_when_full(self):
+        writer = ExporterWriter(self.path, buffer_size=4)
+        writer.write("abc")
+        self.assertEqual(writer.buffered, 3)
+        writer.write("de")
+        self.assertEqual(writer.buffered, 0)
+        writer.close()
+
+    def test_write_compressed(self):
+        with ExporterWriter(self.path, compress=True) as writer:
+            writer.write("line\n")
+        self.assertEqual(writer.path, self.path + ".gz")
+        self.assertFalse(os.path.exists(self.path))
+        with gzip.open(writer.path, "rt") as f:
+            self.assertEqual(f.read(), "line\n")
@@ -0,0 +1,49 @@
+"""Tests for benchmarks.generatorbenchmark (GeneratorBenchmark)."""
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.generatorbenchmark import GeneratorBenchmark
+
+
+class TestGeneratorBenchmark(unittest.TestCase):
+    """Tests for benchmark cases and measures."""
+
+    def _make_benchmark(self, **kwargs):
+        root = os.path.join(os.path.dirname(__file__), "..")
+        return GeneratorBenchmark(distribution=os.path.join(root, "examples-scenario", "scenario-vm-distribution-model.yml"),
+            usage=os.path.join(root, "examples-scenario", "scenario-vm-usage-model.yml"),
+            workload=os.path.join(root, "examples-workload", "scenario-vm-workload.yml"), **kwargs)
+
+    def test_cases_cover_sizes_and_temporalities(self):
+        benchmark = self._make_benchmark(sizes=[1000, 100], temporalities=["hour-day-7", "minute-day-30"])
+        cases = benchmark.get_cases()
+        self.assertEqual([case["name"] for case in cases], ["vm-100_hour-day-7", "vm-1000_hour-day-7", "vm-100_minute-day-30", "vm-1000_minute-day-30"])
+        self.assertEqual((cases[2]["slice_duration"], cases[2]["scope_duration"], cases[2]["number_of_scope"]), (60, 86400, 30))
+
+    def test_invalid_temporality_raises(self):
+        with self.assertRaises(ValueError):
+            self._make_benchmark(temporalities=["second-year-1"])
+
+    def test_run_case_measures_stages(self):
+        benchmark = self._make_benchmark(sizes=[10], temporalities=["hour-day-7"], outputs=[], export_format="jsonl", trace_memory=False)
+        measures = benchmark.run_case(benchmark.get_cases()[0])
+        self.assertGreater(measures["vm_count"], 0)
+        self.assertGreater(measures["max_rss"], 0)
+        stages = {stage["name"] : stage for stage in measures["stages"]}
+        self.assertEqual(stages["usage_sampling"]["items"], measures["vm_count"])
+        self.assertEqual(stages["export_jsonl"]["items"], measures["vm_count"])
+
+    def test_large_cases_are_skipped(self):
+        benchmark = self._make_benchmark(sizes=[100], temporalities=["hour-day-7"], max_cells=10)
+        results = benchmark.run()
+        self.assertEqual(results["format"], "cloudfactory-benchmark")
+        self.assertTrue(results["cases"][0]["skipped"])
+        with tempfile.TemporaryDirectory() as tmp:
+            GeneratorBenchmark.write(results, os.path.join(tmp, "benchmark.json"))
+            with open(os.path.join(tmp, "benchmark.json"), 'r') as f:
+                self.assertEqual(json.load(f)["cases"][0]["name"], "vm-100_hour-day-7")
+
+
+if __name__ == "__main__":
+    unittest.main()
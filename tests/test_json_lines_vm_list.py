@@ -0,0 +1,79 @@
+"""Tests for generator.jsonlinesvmlist (JsonLinesVmList)."""
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from generator.vmmodel import VmModel, VmModelEncoder
+from generator.vmfleet import VmFleet
+from generator.jsonlinesvmlist import JsonLinesVmList
+
+
+class TestJsonLinesVmList(unittest.TestCase):
+    """Tests for JSON lines export and lazy reload."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+        self.tmp = tempfile.TemporaryDirectory()
+        self.location = os.path.join(self.tmp.name, "vm_list.jsonl")
+        self.fleet = VmFleet(cpu=[1, 2, 4], mem=[1.75, 3.5, 7])
+        self.fleet.set_temporality(slices_per_scope=2, number_of_scope=1)
+        self.fleet.usage[:] = [[10, 20], [30, 40], [50, 60]]
+        self.fleet.lifetime[:] = [0, 1, 0]
+        self.fleet.commands = [["cmd0"], ["cmd1"], ["cmd2"]]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_one_vm_per_line(self):
+        JsonLinesVmList.write(self.fleet, self.location)
+        with open(self.location, 'r') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual([json.loads(line) for line in lines], json.loads(json.dumps(list(self.fleet), cls=VmModelEncoder)))
+
+    def test_iteration_matches_written_vms(self):
+        JsonLinesVmList.write(self.fleet, self.location)
+        vm_list = JsonLinesVmList(self.location)
+        loaded = list(vm_list)
+        self.assertEqual([vm.get_id() for vm in loaded], [0, 1, 2])
+        self.assertEqual([vm.get_cpu() for vm in loaded], [1, 2, 4])
+        self.assertEqual([vm.get_usage() for vm in loaded], [vm.get_usage() for vm in self.fleet])
+        self.assertEqual([vm.get_lifetime() for vm in loaded], [0, 1, 0])
+        self.assertEqual([vm.get_commands_list() for vm in loaded], [["cmd0"], ["cmd1"], ["cmd2"]])
+        # Re-iterable: file is read again
+        self.assertEqual([vm.get_id() for vm in vm_list], [0, 1, 2])
+
+    def test_loading_does_not_change_vm_counter(self):
+        JsonLinesVmList.write(self.fleet, self.location)
+        VmModel.vm_count = 7
+        list(JsonLinesVmList(self.location))
+        self.assertEqual(VmModel.vm_count, 7)
+
+    def test_len_and_random_access(self):
+        JsonLinesVmList.write(self.fleet, self.location)
+        vm_list = JsonLinesVmList(self.location)
+        self.assertEqual(len(vm_list), 3)
+        self.assertEqual(vm_list[2].get_cpu(), 4)
+        self.assertEqual(vm_list[0].get_cpu(), 1)
+        self.assertEqual(vm_list[-1].get_id(), 2)
+        with self.assertRaises(IndexError):
+            vm_list[3]
+
+    def test_from_vm_list_and_pickle(self):
+        JsonLinesVmList.write(self.fleet, self.location)
+        vm_list = JsonLinesVmList(self.location)
+        vm_list[1]
+        fleet = VmFleet.from_vm_list(vm_list)
+        self.assertEqual([vm.get_usage() for vm in fleet], [vm.get_usage() for vm in self.fleet])
+        self.assertEqual(pickle.loads(pickle.dumps(vm_list))[1].get_cpu(), 2)
+
+    def test_empty_file(self):
+        JsonLinesVmList.write([], self.location)
+        vm_list = JsonLinesVmList(self.location)
+        self.assertEqual(len(vm_list), 0)
+        self.assertEqual(list(vm_list), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
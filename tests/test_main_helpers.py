@@ -1,5 +1,9 @@
 """Tests for generator __main__ helper functions (CLI parsing)."""
+import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -49,3 +53,83 @@ class TestManageOutputArgs(unittest.TestCase):
             main.manage_output_args("invalid")
         with self.assertRaises(ValueError):
             main.manage_output_args("bash,invalid")
+
+
+class TestManageSweepArgs(unittest.TestCase):
+    """Tests for manage_sweep_args."""
+
+    def test_stop_is_included(self):
+        self.assertEqual(main.manage_sweep_args("10,40,10"), [10, 20, 30, 40])
+
+    def test_invalid_sweep_raises(self):
+        with self.assertRaises(ValueError):
+            main.manage_sweep_args("10,5,10")
+        with self.assertRaises(ValueError):
+            main.manage_sweep_args("0,10,10")
+
+
+class TestManageExportFormatArg(unittest.TestCase):
+    """Tests for manage_export_format_arg."""
+
+    def test_valid_formats(self):
+        self.assertEqual(main.manage_export_format_arg("json"), "json")
+        self.assertEqual(main.manage_export_format_arg("jsonl"), "jsonl")
+        self.assertEqual(main.manage_export_format_arg("npy"), "npy")
+
+    def test_invalid_format_raises(self):
+        with self.assertRaises(ValueError):
+            main.manage_export_format_arg("csv")
+
+
+class TestNpyExportRoundTrip(unittest.TestCase):
+    """Tests for --export-format=npy then --load (command line, in a temporary folder)."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def _run(self, folder, *arguments, workload="examples-workload/scenario-vm-workload.yml"):
+        os.makedirs(folder, exist_ok=True)
+        scenarios = ["--distribution=" + os.path.join(self.root, "examples-scenario/scenario-vm-distribution-azure2017.yml"),
+            "--usage=" + os.path.join(self.root, "examples-scenario/scenario-vm-usage-azure2017.yml"),
+            "--workload=" + os.path.join(self.root, workload)]
+        return subprocess.run([sys.executable, "-m", "generator"] + scenarios + list(arguments), cwd=folder,
+            env=dict(os.environ, PYTHONPATH=self.root), capture_output=True, text=True)
+
+    def _read(self, location):
+        with open(location, 'r') as f:
+            return f.read()
+
+    def test_load_uses_exported_temporality(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            exported = os.path.join(tmp, "exported")
+            result = self._run(exported, "--vm=10", "--seed=1", "--temporality=600,3600,2", "--output=bash", "--export=fleet", "--export-format=npy")
+            self.assertEqual(result.returncode, 0, result.stderr)
+            fleet = os.path.join(exported, "fleet")
+
+            loaded = os.path.join(tmp, "loaded")
+            result = self._run(loaded, "--load=" + fleet, "--output=bash")
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(self._read(os.path.join(loaded, "workload-local.sh")), self._read(os.path.join(exported, "workload-local.sh")))
+            self.assertIn("sleep 600", self._read(os.path.join(loaded, "workload-local.sh")))
+
+            result = self._run(os.path.join(tmp, "same"), "--load=" + fleet, "--temporality=600,3600,2", "--output=bash")
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_load_with_other_temporality_or_workload_fails(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            exported = os.path.join(tmp, "exported")
+            result = self._run(exported, "--vm=10", "--seed=1", "--temporality=600,3600,2", "--export=fleet", "--export-format=npy")
+            self.assertEqual(result.returncode, 0, result.stderr)
+            fleet = os.path.join(exported, "fleet")
+
+            for temporality in ["3600,86400,12", "600,7200,1"]:
+                result = self._run(os.path.join(tmp, "loaded"), "--load=" + fleet, "--temporality=" + temporality, "--output=bash")
+                self.assertNotEqual(result.returncode, 0)
+                self.assertIn("does not match", result.stderr)
+
+            workload = os.path.join(tmp, "workload.yml")
+            shutil.copy(os.path.join(self.root, "examples-workload/scenario-vm-workload.yml"), workload)
+            with open(workload, 'a') as f:
+                f.write("# modified\n")
+            result = self._run(os.path.join(tmp, "loaded"), "--load=" + fleet, "--output=bash", workload=workload)
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("another workload scenario", result.stderr)
@@ -0,0 +1,57 @@
+"""Tests for generator.reproducibilitymanifest (ReproducibilityManifest)."""
+import os
+import tempfile
+import unittest
+from generator.reproducibilitymanifest import ReproducibilityManifest
+
+
+class TestReproducibilityManifest(unittest.TestCase):
+    """Tests for manifest hashing, write/load round trip and verification."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.scenarios = dict()
+        for kind in ReproducibilityManifest.scenario_kinds:
+            self.scenarios[kind] = os.path.join(self.tmp.name, kind + ".yml")
+            with open(self.scenarios[kind], "w") as f:
+                f.write(kind + ": {}\n")
+
+    def _make_manifest(self, **objective):
+        return ReproducibilityManifest(seed=42, scenarios=self.scenarios, temporality=("3600", 86400, 12), objective=objective)
+
+    def test_missing_required_attribute_raises(self):
+        with self.assertRaises(ValueError):
+            ReproducibilityManifest(seed=1, scenarios=self.scenarios, temporality=(3600, 86400, 12))
+
+    def test_objective_is_required(self):
+        with self.assertRaises(ValueError):
+            self._make_manifest(cpu=8, shards=2)
+
+    def test_unset_objective_values_are_dropped(self):
+        manifest = self._make_manifest(vm=10, cpu=None, mem=None, sweep_vm=None, shards=None)
+        self.assertEqual(manifest.objective, {"vm": 10})
+        self.assertEqual(manifest.temporality, (3600, 86400, 12))
+
+    def test_hashes_are_sha256_of_files(self):
+        manifest = self._make_manifest(vm=10)
+        self.assertEqual(manifest.hashes["usage"], "cf57028debafde63790f515a7b612390629933bd2cb7b602e8c12cd639baff93")
+
+    def test_write_and_load_round_trip(self):
+        manifest = self._make_manifest(cpu=64, mem=128, shards=4)
+        location = os.path.join(self.tmp.name, "manifest.yml")
+        manifest.write(location)
+        loaded = ReproducibilityManifest.load(location)
+        self.assertEqual(loaded.seed, 42)
+        self.assertEqual(loaded.scenarios, self.scenarios)
+        self.assertEqual(loaded.hashes, manifest.hashes)
+        self.assertEqual(loaded.temporality, (3600, 86400, 12))
+        self.assertEqual(loaded.objective, {"cpu": 64, "mem": 128, "shards": 4})
+        loaded.verify()
+
+    def test_verify_detects_changed_scenario(self):
+        manifest = self._make_manifest(sweep_vm=[10, 20])
+        with open(self.scenarios["workload"], "a") as f:
+            f.write("# changed\n")
+        with self.assertRaises(ValueError):
+            manifest.verify()
@@ -0,0 +1,95 @@
+"""Tests for generator.stageprofiler (StageProfiler)."""
+import json
+import os
+import pickle
+import tempfile
+import tracemalloc
+import unittest
+from generator.stageprofiler import StageProfiler, disabled_profiler
+from generator.distributionbuilder import DistributionBuilder
+from generator.usagebuilder import UsageBuilder
+from generator.workloadbuilder import WorkloadBuilder
+from generator.experimentgenerator import ExperimentGenerator
+from generator.vmmodel import VmModel
+
+
+class TestStageProfiler(unittest.TestCase):
+    """Tests for stage measures and report."""
+
+    def test_stage_accumulates_measures(self):
+        profiler = StageProfiler()
+        for count in [3, 4]:
+            with profiler.stage("build", items=count):
+                sum(range(1000))
+        stage = profiler.get_report()["stages"][0]
+        self.assertEqual(stage["name"], "build")
+        self.assertEqual(stage["calls"], 2)
+        self.assertEqual(stage["items"], 7)
+        self.assertGreaterEqual(stage["wall_time"], 0)
+        self.assertGreaterEqual(stage["cpu_time"], 0)
+
+    def test_peak_memory_includes_nested_stages(self):
+        profiler = StageProfiler()
+        with profiler.stage("outer"):
+            with profiler.stage("inner") as measure:
+                block = bytearray(1 << 20)
+                del block
+                measure["items"] = 1
+        stages = {stage["name"] : stage for stage in profiler.get_report()["stages"]}
+        self.assertGreaterEqual(stages["inner"]["peak_memory"], 1 << 20)
+        self.assertGreaterEqual(stages["outer"]["peak_memory"], stages["inner"]["peak_memory"])
+        self.assertEqual(stages["inner"]["items"], 1)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_hooks_receive_each_measure(self):
+        profiler = StageProfiler(trace_memory=False)
+        measures = list()
+        profiler.add_hook(measures.append)
+        with profiler.stage("a", items=2):
+            pass
+        self.assertEqual([(measure["name"], measure["items"]) for measure in measures], [("a", 2)])
+        self.assertEqual(measures[0]["peak_memory"], 0)
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = StageProfiler(enabled=False)
+        with profiler.stage("a") as measure:
+            measure["items"] = 1
+        self.assertEqual(profiler.get_report()["stages"], [])
+
+    def test_pickled_profiler_is_disabled(self):
+        profiler = StageProfiler()
+        profiler.add_hook(lambda measure: None)
+        with profiler.stage("a"):
+            pass
+        copy = pickle.loads(pickle.dumps(profiler))
+        self.assertFalse(copy.enabled)
+        self.assertEqual(copy.stages, dict())
+        self.assertTrue(profiler.enabled)
+
+    def test_generation_stages_are_reported(self):
+        VmModel.vm_count = 0
+        root = os.path.join(os.path.dirname(__file__), "..")
+        profiler = StageProfiler()
+        distribution_builder = DistributionBuilder(yaml_file=os.path.join(root, "examples-scenario", "scenario-vm-distribution-model.yml"), profiler=profiler)
+        usage_builder = UsageBuilder(yaml_file=os.path.join(root, "examples-scenario", "scenario-vm-usage-model.yml"), slices_per_scope=24, number_of_scope=2, profiler=profiler)
+        workload_builder = WorkloadBuilder(yaml_file=os.path.join(root, "examples-workload", "scenario-vm-workload.yml"), slice_duration=3600, profiler=profiler)
+        generator = ExperimentGenerator(distribution_builder=distribution_builder, usage_builder=usage_builder, workload_builder=workload_builder, profiler=profiler)
+        fleet = generator.gen_fleet(vm_number=10, number_of_scope=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            generator.export(fleet, os.path.join(tmp, "vm_list.jsonl"), "jsonl")
+            profiler.write_report(os.path.join(tmp, "profile.json"))
+            with open(os.path.join(tmp, "profile.json"), 'r') as f:
+                report = json.load(f)
+        stages = {stage["name"] : stage for stage in report["stages"]}
+        self.assertEqual(report["format"], "cloudfactory-profile")
+        self.assertEqual(stages["yaml_load"]["calls"], 3)
+        for name in ["flavor_solving", "profile_attribution", "timesheet_building", "usage_sampling", "workload_attribution", "command_generation"]:
+            self.assertEqual(stages[name]["items"], len(fleet))
+        self.assertEqual(stages["export_jsonl"]["items"], len(fleet))
+
+    def test_components_default_to_disabled_profiler(self):
+        self.assertFalse(disabled_profiler.enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
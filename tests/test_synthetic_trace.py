@@ -0,0 +1,84 @@
+"""Tests for analyserlib.synthetictrace."""
+import os
+import tempfile
+import unittest
+
+try:
+    import pandas as pd
+    import numpy as np
+    import analyserlib.synthetictrace as synthetictrace
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+
+@unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
+class TestBuildSyntheticVmtable(unittest.TestCase):
+    """Tests for build_synthetic_vmtable."""
+
+    def test_columns_and_size(self):
+        vmtable_df = synthetictrace.build_synthetic_vmtable(500, seed=3)
+        self.assertEqual(list(vmtable_df.columns), synthetictrace.vmtable_columns + ["periodic"])
+        self.assertEqual(len(vmtable_df), 500)
+        self.assertEqual(vmtable_df["vmid"].nunique(), 500)
+        self.assertTrue(all(len(vmid) == 44 for vmid in vmtable_df["vmid"]))
+
+    def test_same_seed_same_table(self):
+        first = synthetictrace.build_synthetic_vmtable(300, seed=7)
+        second = synthetictrace.build_synthetic_vmtable(300, seed=7)
+        pd.testing.assert_frame_equal(first, second)
+        third = synthetictrace.build_synthetic_vmtable(300, seed=8)
+        self.assertFalse(first["vmid"].equals(third["vmid"]))
+
+    def test_lifecycle_within_duration(self):
+        vmtable_df = synthetictrace.build_synthetic_vmtable(1000, seed=1, duration=86400)
+        self.assertTrue((vmtable_df["vmcreated"] >= 0).all())
+        self.assertTrue((vmtable_df["vmdeleted"] <= 86400).all())
+        self.assertTrue((vmtable_df["vmdeleted"] > vmtable_df["vmcreated"]).all())
+        self.assertTrue((vmtable_df["avgcpu"] <= vmtable_df["p95maxcpu"]).all())
+        self.assertTrue((vmtable_df["p95maxcpu"] <= vmtable_df["maxcpu"]).all())
+
+    def test_invalid_lifetime_ratio(self):
+        vmtable_df = synthetictrace.build_synthetic_vmtable(1000, seed=1, invalid_lifetime_ratio=0.2)
+        invalid = (vmtable_df["vmdeleted"] < vmtable_df["vmcreated"]).sum()
+        self.assertGreater(invalid, 50)
+        self.assertLess(invalid, 250)
+
+
+@unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
+class TestGenerateSyntheticCpuReadings(unittest.TestCase):
+    """Tests for generate_synthetic_cpu_readings and write_synthetic_trace."""
+
+    def setUp(self):
+        self.vmtable_df = synthetictrace.build_synthetic_vmtable(50, seed=2, duration=2*86400)
+
+    def test_readings_cover_alive_vms(self):
+        readings_df = pd.concat(synthetictrace.generate_synthetic_cpu_readings(self.vmtable_df, seed=2), ignore_index=True)
+        self.assertEqual(list(readings_df.columns), synthetictrace.cpu_readings_columns)
+        expected = ((self.vmtable_df["vmdeleted"] - 1)//300 - (self.vmtable_df["vmcreated"] - 1)//300).sum()
+        self.assertEqual(len(readings_df), expected)
+        self.assertTrue(readings_df["timestamp"].is_monotonic_increasing)
+        self.assertTrue((readings_df["cpu_min"] <= readings_df["cpu_avg"]).all())
+        self.assertTrue((readings_df["cpu_avg"] <= readings_df["cpu_max"]).all())
+
+    def test_chunk_size_does_not_change_readings(self):
+        chunks = list(synthetictrace.generate_synthetic_cpu_readings(self.vmtable_df, seed=2, chunk_size=100))
+        self.assertGreater(len(chunks), 1)
+        whole = pd.concat(synthetictrace.generate_synthetic_cpu_readings(self.vmtable_df, seed=2), ignore_index=True)
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+    def test_write_synthetic_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            vmtable_path, readings_paths = synthetictrace.write_synthetic_trace(tmp, 50, seed=2, readings_vm_count=10,
+                readings_per_file=100, chunk_size=50, duration=2*86400)
+            vmtable_df = pd.read_csv(vmtable_path, header=None, names=synthetictrace.vmtable_columns)
+            pd.testing.assert_frame_equal(vmtable_df, self.vmtable_df[synthetictrace.vmtable_columns])
+            self.assertGreater(len(readings_paths), 1)
+            self.assertEqual(os.path.basename(readings_paths[0]), "vm_cpu_readings-file-1-of-" + str(len(readings_paths)) + ".csv")
+            readings_df = pd.concat([pd.read_csv(path, header=None, names=synthetictrace.cpu_readings_columns) for path in readings_paths], ignore_index=True)
+            self.assertTrue(set(readings_df["vmid"]).issubset(set(self.vmtable_df["vmid"].iloc[:10])))
+            self.assertEqual(len(readings_df), sum(len(chunk) for chunk in synthetictrace.generate_synthetic_cpu_readings(self.vmtable_df.iloc[:10], seed=2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
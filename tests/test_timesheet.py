@@ -0,0 +1,49 @@
+"""Tests for generator.timesheet (Timesheet)."""
+import json
+import unittest
+from generator.timesheet import Timesheet
+from generator.vmmodel import VmModel, VmModelEncoder
+
+
+class TestTimesheet(unittest.TestCase):
+    """Tests for interval based timesheets and their dict compatibility."""
+
+    def test_interval_is_clipped_to_experiment(self):
+        timesheet = Timesheet(3, 10, slices_per_scope=4, number_of_scope=2)
+        self.assertEqual(timesheet.get_interval(), (3, 8))
+        self.assertEqual(timesheet.get_slice_count(), 5)
+        self.assertEqual(list(timesheet.get_present_slices()), [3, 4, 5, 6, 7])
+
+    def test_reads_as_dict_of_boolean_lists(self):
+        timesheet = Timesheet(3, 6, slices_per_scope=4, number_of_scope=2)
+        self.assertEqual(len(timesheet), 2)
+        self.assertEqual(timesheet[0], [False, False, False, True])
+        self.assertEqual(timesheet[1], [True, True, False, False])
+        self.assertEqual(timesheet, {0: [False, False, False, True], 1: [True, True, False, False]})
+        self.assertTrue(timesheet.is_present(1, 0))
+        self.assertFalse(timesheet.is_present(1, 2))
+
+    def test_empty_presence(self):
+        timesheet = Timesheet(5, 5, slices_per_scope=4, number_of_scope=2)
+        self.assertEqual(timesheet.get_interval(), (0, 0))
+        self.assertEqual(timesheet.get_slice_count(), 0)
+
+    def test_from_value_converts_former_dict(self):
+        timesheet = Timesheet.from_value({"1": [True, True], "0": [False, True]})
+        self.assertEqual(timesheet.intervals, [(1, 4)])
+        self.assertEqual(timesheet.slices_per_scope, 2)
+        self.assertEqual(timesheet.number_of_scope, 2)
+
+    def test_from_value_keeps_non_contiguous_presence(self):
+        timesheet = Timesheet.from_value({0: [True, False], 1: [True, True]})
+        self.assertEqual(timesheet.intervals, [(0, 1), (2, 4)])
+        self.assertEqual(timesheet.get_slice_count(), 3)
+
+    def test_compact_json_round_trip(self):
+        vm = VmModel(cpu=1, mem=1)
+        vm.set_timesheet(Timesheet(2, 5, slices_per_scope=24, number_of_scope=2))
+        data = json.loads(json.dumps(vm, cls=VmModelEncoder))
+        self.assertEqual(data["timesheet"]["intervals"], [[2, 5]])
+        reloaded = VmModel(**data)
+        self.assertEqual(reloaded.get_timesheet().get_interval(), (2, 5))
+        self.assertEqual(reloaded.get_timesheet(), vm.get_timesheet())
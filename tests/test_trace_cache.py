@@ -0,0 +1,90 @@
+"""Tests for analyserlib.tracecache."""
+import os
+import tempfile
+import unittest
+
+try:
+    import pandas as pd
+    import numpy as np
+    import analyserlib.tracecache as tracecache
+    import analyserlib.distributionanalyzer as distributionanalyzer
+    import analyserlib.synthetictrace as synthetictrace
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+
+@unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
+class TestTraceCache(unittest.TestCase):
+    """Tests for build_trace_cache and load_trace_cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.vmtable_path, self.readings_paths = synthetictrace.write_synthetic_trace(os.path.join(self.tmp.name, "csv"), 300,
+            seed=6, readings_vm_count=20, readings_per_file=5000, duration=2*86400)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_readings_roundtrip_with_compact_types(self):
+        folder = os.path.join(self.tmp.name, "readings")
+        count = tracecache.build_trace_cache(self.readings_paths, folder, "azure2017-cpu-readings", chunk_size=700)
+        expected_df = pd.concat([pd.read_csv(path, header=None, names=synthetictrace.cpu_readings_columns) for path in self.readings_paths], ignore_index=True)
+        self.assertEqual(count, len(expected_df))
+        trace_df = tracecache.load_trace_cache(folder)
+        self.assertEqual(list(trace_df.columns), synthetictrace.cpu_readings_columns)
+        self.assertEqual(trace_df["timestamp"].dtype, np.int32)
+        self.assertEqual(trace_df["cpu_avg"].dtype, np.float32)
+        self.assertIsInstance(trace_df["vmid"].dtype, pd.CategoricalDtype)
+        self.assertEqual(len(trace_df["vmid"].cat.categories), 20)
+        self.assertEqual(list(trace_df["vmid"].astype(str)), list(expected_df["vmid"]))
+        self.assertEqual(list(trace_df["timestamp"]), list(expected_df["timestamp"]))
+        np.testing.assert_allclose(trace_df["cpu_avg"], expected_df["cpu_avg"], atol=1e-4)
+
+    def test_vmtable_gives_same_distribution(self):
+        folder = os.path.join(self.tmp.name, "vmtable")
+        tracecache.build_trace_cache(self.vmtable_path, folder, "azure2017-vmtable")
+        trace_df = tracecache.load_trace_cache(folder, columns=["vmcreated", "vmdeleted", "vmcorecount", "vmmemory"])
+        self.assertEqual(trace_df["vmcorecount"].dtype, np.uint8)
+        self.assertEqual(tracecache.get_trace_cache_schema(folder)[0], "azure2017-vmtable")
+        expected = distributionanalyzer.get_cpu_and_mem_average_distribution(pd.read_csv(self.vmtable_path, header=None, names=synthetictrace.vmtable_columns))
+        for expected_df, result_df in zip(expected, distributionanalyzer.get_cpu_and_mem_average_distribution(trace_df)):
+            pd.testing.assert_frame_equal(result_df, expected_df)
+
+    def _is_memory_mapped(self, array):
+        while isinstance(array, np.ndarray):
+            if isinstance(array, np.memmap): return True
+            array = array.base
+        return False
+
+    def test_columns_are_memory_mapped(self):
+        folder = os.path.join(self.tmp.name, "readings")
+        tracecache.build_trace_cache(self.readings_paths, folder, "azure2017-cpu-readings")
+        trace_df = tracecache.load_trace_cache(folder, columns=["timestamp", "vmid"])
+        self.assertTrue(self._is_memory_mapped(trace_df["timestamp"].to_numpy()))
+        self.assertTrue(self._is_memory_mapped(trace_df["vmid"].cat.codes.to_numpy()))
+        trace_df.loc[0, "timestamp"] = -1 # copy-on-write: cache files are not modified
+        self.assertNotEqual(tracecache.load_trace_cache(folder, columns=["timestamp"])["timestamp"].iloc[0], -1)
+
+    def test_dataframe_source_with_missing_ids(self):
+        vm_df = pd.DataFrame({"instance": ["a", None, "b", "a"], "cpu": [1, 2, 4, 1], "mem": [2.0, 4.0, 8.0, 2.0],
+            "disk": [20, 40, 80, 20], "start": [0, 10, 20, 30], "stop": [5, 15, 25, 35]})
+        folder = os.path.join(self.tmp.name, "chameleon")
+        tracecache.build_trace_cache(vm_df, folder, "chameleon-vm")
+        trace_df = tracecache.load_trace_cache(folder)
+        self.assertEqual(list(trace_df["instance"].cat.codes), [0, -1, 1, 0])
+        self.assertEqual(list(trace_df["cpu"]), [1, 2, 4, 1])
+
+    def test_invalid_values_raise(self):
+        folder = os.path.join(self.tmp.name, "invalid")
+        with self.assertRaises(ValueError):
+            tracecache.build_trace_cache(pd.DataFrame({"cpu": [1, 300]}), folder, {"cpu": "uint8"})
+        with self.assertRaises(ValueError):
+            tracecache.build_trace_cache(pd.DataFrame({"start": [0.5]}), folder, {"start": "int32"})
+        with self.assertRaises(ValueError):
+            tracecache.build_trace_cache(pd.DataFrame({"start": [0]}), folder, "unknown-dataset")
+        self.assertEqual(os.listdir(folder), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
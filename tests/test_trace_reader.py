@@ -0,0 +1,52 @@
+"""Tests for analyserlib.tracereader."""
+import os
+import tempfile
+import unittest
+
+try:
+    import pandas as pd
+    import analyserlib.tracereader as tracereader
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+
+@unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
+class TestReadCsvChunks(unittest.TestCase):
+    """Tests for read_csv_chunks."""
+
+    def setUp(self):
+        self.readings_df = pd.DataFrame({
+            "timestamp": [0, 0, 300, 300, 600],
+            "vmid": ["a", "b", "a", "b", "a"],
+            "cpu_min": [1.0, 2.0, 1.5, 2.5, 1.0],
+            "cpu_max": [5.0, 6.0, 5.5, 6.5, 5.0],
+            "cpu_avg": [3.0, 4.0, 3.5, 4.5, 3.0],
+        })
+
+    def test_reads_files_in_order_by_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, "readings-1.csv"), os.path.join(tmp, "readings-2.csv")]
+            self.readings_df.iloc[:3].to_csv(paths[0], header=False, index=False)
+            self.readings_df.iloc[3:].to_csv(paths[1], header=False, index=False)
+            chunks = list(tracereader.read_csv_chunks(paths, names=tracereader.azure2017_cpu_readings_columns, chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1, 2])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), self.readings_df)
+
+    def test_usecols_and_dtype(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "readings.csv")
+            self.readings_df.to_csv(path, index=False)
+            chunks = list(tracereader.read_csv_chunks(path, usecols=["vmid", "cpu_avg"], dtype={"cpu_avg": "float32"}, chunk_size=10))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(list(chunks[0].columns), ["vmid", "cpu_avg"])
+        self.assertEqual(chunks[0]["cpu_avg"].dtype, "float32")
+
+    def test_dataframes_are_yielded(self):
+        chunks = list(tracereader.read_csv_chunks([self.readings_df.iloc[:2], self.readings_df.iloc[2:]], usecols=["vmid"]))
+        self.assertEqual([list(chunk.columns) for chunk in chunks], [["vmid"], ["vmid"]])
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ try:
     import pandas as pd
     import numpy as np
     import analyserlib.usageanalyzer as usageanalyzer
+    import analyserlib.synthetictrace as synthetictrace
     HAS_DEPS = True
 except ImportError:
     HAS_DEPS = False
@@ -68,6 +69,34 @@ class TestBuildArrivalAndDepartureRates(unittest.TestCase):
         self.assertIn("ratio_leaving", usage_dist.columns)
 
 
+@unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
+class TestUsageFromChunks(unittest.TestCase):
+    """Tests for build_n_scenario_from_chunks and build_periodicity_rate_per_label_from_chunks."""
+
+    def setUp(self):
+        self.trace_df = synthetictrace.build_synthetic_vmtable(600, seed=5, duration=3*86400)
+
+    def test_build_n_scenario_from_chunks_keeps_lifecycle_columns(self):
+        usage_dist, trace_labeled = usageanalyzer.build_n_scenario(self.trace_df.copy(), n_profile=3)
+        chunks = [self.trace_df.iloc[begin:begin+100] for begin in range(0, len(self.trace_df), 100)]
+        chunked_usage_dist, chunked_trace_labeled = usageanalyzer.build_n_scenario_from_chunks(iter(chunks), n_profile=3)
+        pd.testing.assert_frame_equal(chunked_usage_dist, usage_dist)
+        self.assertEqual(list(chunked_trace_labeled.columns), ["vmid", "vmcreated", "vmdeleted", "avgcpu", "p95maxcpu", "label"])
+        self.assertEqual(list(chunked_trace_labeled["label"]), list(trace_labeled["label"]))
+
+    def test_periodicity_from_chunks_matches_whole_traces(self):
+        usage_dist, trace_labeled = usageanalyzer.build_n_scenario(self.trace_df, n_profile=2)
+        readings_vm_df = self.trace_df.loc[self.trace_df["vmdeleted"] - self.trace_df["vmcreated"] >= 86400]
+        chunks = list(synthetictrace.generate_synthetic_cpu_readings(readings_vm_df, seed=5, chunk_size=2000))
+        for max_number_of_tests in [500, 12]:
+            expected_dist, chunked_dist = usage_dist.copy(), usage_dist.copy()
+            usageanalyzer.build_periodicity_rate_per_label(expected_dist, trace_labeled, pd.concat(chunks, ignore_index=True),
+                timestamp_per_hour=12, lifetime_condition=86400, max_number_of_tests=max_number_of_tests)
+            usageanalyzer.build_periodicity_rate_per_label_from_chunks(chunked_dist, trace_labeled, iter(chunks),
+                timestamp_per_hour=12, lifetime_condition=86400, max_number_of_tests=max_number_of_tests)
+            self.assertEqual(list(chunked_dist["ratio_periodicity"]), list(expected_dist["ratio_periodicity"]))
+
+
 @unittest.skipUnless(HAS_DEPS, "pandas/numpy/analyserlib not available")
 class TestConvertUsageToScenario(unittest.TestCase):
     """Tests for convert_usage_to_scenario."""
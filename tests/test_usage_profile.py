@@ -41,3 +41,13 @@ class TestUsageProfile(unittest.TestCase):
         vms[3].set_profile("p1")
         vms[4].set_profile("other")
         self.assertEqual(p.get_count(vms), 3)
+
+    def test_reset_forgets_initial_vm_count(self):
+        p = self._make_profile(arrival=0.5)
+        vms = [VmModel(cpu=1, mem=1) for _ in range(4)]
+        for vm in vms: vm.set_profile("p1")
+        p.get_count(vms)
+        self.assertEqual(p.get_count_of_vm_to_be_created(), 2)
+        p.reset()
+        p.get_count(vms[:2])
+        self.assertEqual(p.get_count_of_vm_to_be_created(), 1)
@@ -0,0 +1,51 @@
+"""Tests for generator.vmusagebuilder (VmUsageBuilder)."""
+import unittest
+import numpy as np
+from generator.vmmodel import VmModel
+from generator.vmfleet import VmFleet
+from generator.usageprofile import UsageProfile
+from generator.vmusagebuilder import VmUsageBuilder
+
+
+class TestVmUsageBuilderFleet(unittest.TestCase):
+    """Tests for fleet-wide usage generation."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+        np.random.seed(42)
+        profile_dict = {"freq": 1.0, "avg": {"min": 5, "max": 20}, "per": {"min": 30, "max": 60}}
+        self.profiles = {"p1": UsageProfile("p1", profile_dict, slices_per_scope=4, number_of_scope=3)}
+        self.builder = VmUsageBuilder(profiles=self.profiles, slices_per_scope=4)
+        self.fleet = VmFleet(cpu=[1, 2, 4], mem=[1, 2, 4])
+        self.fleet.set_temporality(slices_per_scope=4, number_of_scope=3)
+        for vm in self.fleet:
+            vm.set_profile("p1")
+
+    def test_avg_and_per_within_profile_bounds(self):
+        self.builder.build_and_set_usage_for_fleet(self.fleet)
+        self.assertTrue(np.all((self.fleet.avg >= 5) & (self.fleet.avg < 20)))
+        self.assertTrue(np.all((self.fleet.per >= 30) & (self.fleet.per < 60)))
+        self.assertTrue(np.all(self.fleet.per >= self.fleet.avg))
+
+    def test_usage_only_on_presence_slices(self):
+        self.fleet.postponed_start[:] = [0, 3, 5]
+        self.fleet.lifetime[:] = [0, 4, 2]
+        self.builder.build_and_set_usage_for_fleet(self.fleet)
+        presence = self.fleet.usage > 0
+        self.assertTrue(presence[0].all())
+        self.assertEqual(np.flatnonzero(presence[1]).tolist(), [3, 4, 5, 6])
+        self.assertEqual(np.flatnonzero(presence[2]).tolist(), [5, 6])
+        self.assertTrue(np.all(self.fleet.usage <= 100))
+
+    def test_periodic_usage_repeats_each_scope(self):
+        self.fleet.periodicity[:] = [True, False, True]
+        self.builder.build_and_set_usage_for_fleet(self.fleet)
+        for row in self.fleet.usage[[0, 2]]:
+            scopes = row.reshape(3, 4)
+            self.assertTrue(np.all(scopes == scopes[0]))
+
+    def test_views_expose_generated_usage(self):
+        self.builder.build_and_set_usage_for_fleet(self.fleet)
+        vm = self.fleet.get_vm(1)
+        self.assertEqual(len(vm.get_usage()), 12)
+        self.assertEqual(vm.get_avg(), int(self.fleet.avg[1]))
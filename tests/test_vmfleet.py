@@ -0,0 +1,146 @@
+"""Tests for generator.vmfleet (VmFleet and VmView)."""
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from generator.vmmodel import VmModel, VmModelEncoder
+from generator.vmfleet import VmFleet, VmView
+
+
+class TestVmFleet(unittest.TestCase):
+    """Tests for columnar fleet storage."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+
+    def test_init_allocates_ids_from_vm_counter(self):
+        fleet = VmFleet(cpu=[1, 2, 4], mem=[1.75, 3.5, 7])
+        self.assertEqual(len(fleet), 3)
+        self.assertEqual(fleet.id.tolist(), [0, 1, 2])
+        self.assertEqual(VmModel.vm_count, 3)
+        self.assertEqual(VmModel(cpu=1, mem=1).get_id(), 3)
+
+    def test_init_rejects_mismatching_columns(self):
+        with self.assertRaises(ValueError):
+            VmFleet(cpu=[1, 2], mem=[1])
+
+    def test_set_temporality_allocates_usage_matrix(self):
+        fleet = VmFleet(cpu=[1, 2], mem=[1, 2])
+        fleet.set_temporality(slices_per_scope=24, number_of_scope=3)
+        self.assertEqual(fleet.usage.shape, (2, 72))
+        self.assertEqual(fleet.usage.dtype, np.uint8)
+
+    def test_get_end_handles_infinite_and_truncated_lifetime(self):
+        fleet = VmFleet(cpu=[1, 1, 1], mem=[1, 1, 1])
+        fleet.set_temporality(slices_per_scope=4, number_of_scope=2)
+        fleet.postponed_start[:] = [0, 2, 6]
+        fleet.lifetime[:] = [0, 3, 4]
+        self.assertEqual(fleet.get_end().tolist(), [8, 5, 8])
+
+    def test_extend_remaps_profile_codes(self):
+        fleet = VmFleet(cpu=[1], mem=[1])
+        fleet.get_vm(0).set_profile("low")
+        other = VmFleet(cpu=[2, 4], mem=[2, 4])
+        other.get_vm(0).set_profile("high")
+        other.get_vm(1).set_profile("low")
+        fleet.extend(other)
+        self.assertEqual([vm.get_profile() for vm in fleet], ["low", "high", "low"])
+        self.assertEqual(fleet.id.tolist(), [0, 1, 2])
+
+    def test_subset_keeps_ids_and_columns(self):
+        fleet = VmFleet(cpu=[1, 2, 4], mem=[1, 2, 4])
+        fleet.get_vm(2).set_workload("idle")
+        sub = fleet.subset([0, 2])
+        self.assertEqual(sub.id.tolist(), [0, 2])
+        self.assertEqual(sub.get_vm(1).get_workload(), "idle")
+        self.assertEqual(VmModel.vm_count, 3)
+
+    def test_from_vm_list_round_trip(self):
+        vm = VmModel(cpu=2, mem=4)
+        vm.set_profile("low")
+        vm.set_postponed_start(1)
+        vm.set_lifetime(2)
+        vm.set_timesheet({0: [False, True], 1: [True, False]})
+        vm.set_usage([10, 20])
+        vm.set_workload("idle")
+        fleet = VmFleet.from_vm_list([vm])
+        view = fleet.get_vm(0)
+        self.assertEqual(view.get_id(), vm.get_id())
+        self.assertEqual(view.get_usage(), [10, 20])
+        self.assertEqual(view.get_timesheet(), vm.get_timesheet())
+        self.assertEqual(view.get_workload(), "idle")
+
+
+    def test_save_and_load_round_trip_as_memory_maps(self):
+        fleet = VmFleet(cpu=[1, 2, 4], mem=[1.75, 3.5, 7])
+        fleet.set_temporality(slices_per_scope=2, number_of_scope=2)
+        fleet.get_vm(1).set_profile("low")
+        fleet.get_vm(2).set_workload("idle")
+        fleet.get_vm(1).set_postponed_start(1)
+        fleet.get_vm(1).set_usage([5, 6, 7])
+        with tempfile.TemporaryDirectory() as tmp:
+            fleet.save(os.path.join(tmp, "fleet"))
+            VmModel.vm_count = 0
+            loaded = VmFleet.load(os.path.join(tmp, "fleet"))
+            self.assertIsInstance(loaded.usage, np.memmap)
+            self.assertEqual(loaded.usage.dtype, np.uint8)
+            for column in VmFleet.saved_columns:
+                self.assertTrue(np.array_equal(getattr(loaded, column), getattr(fleet, column)))
+            self.assertEqual(loaded.get_vm(1).get_usage(), [5, 6, 7])
+            self.assertEqual(loaded.get_vm(1).get_profile(), "low")
+            self.assertEqual(loaded.get_vm(2).get_workload(), "idle")
+            self.assertEqual(loaded.get_number_of_slices(), 4)
+            self.assertEqual(loaded.commands, [None, None, None])
+            self.assertEqual(VmModel.vm_count, 3)
+            loaded.lifetime[0] = 1 # copy-on-write
+            self.assertEqual(VmFleet.load(os.path.join(tmp, "fleet")).lifetime[0], 0)
+
+    def test_load_rejects_other_folders(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "fleet.json"), "w") as f:
+                f.write("{}")
+            with self.assertRaises(ValueError):
+                VmFleet.load(tmp)
+
+class TestVmView(unittest.TestCase):
+    """Tests for VmModel compatibility of fleet views."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+        self.fleet = VmFleet(cpu=[2], mem=[7])
+        self.fleet.set_temporality(slices_per_scope=3, number_of_scope=2)
+
+    def test_view_is_vmmodel_and_equal_to_other_views(self):
+        view = self.fleet.get_vm(0)
+        self.assertIsInstance(view, VmModel)
+        self.assertEqual(view, self.fleet[0])
+        self.assertIn(view, list(self.fleet))
+
+    def test_view_getters(self):
+        view = self.fleet.get_vm(0)
+        self.assertEqual(view.get_cpu(), 2)
+        self.assertEqual(view.get_mem(), 7)
+        self.assertEqual(view.get_name(), "vm0")
+        self.assertIsNone(view.get_profile())
+        self.assertIsNone(view.get_avg())
+        self.assertEqual(view.get_usage(), [])
+        self.assertEqual(view.get_commands_list(), [])
+
+    def test_view_usage_is_written_at_presence_slices(self):
+        view = self.fleet.get_vm(0)
+        view.set_postponed_start(2)
+        view.set_lifetime(3)
+        view.set_usage([5, 6, 7])
+        self.assertEqual(self.fleet.usage[0].tolist(), [0, 0, 5, 6, 7, 0])
+        self.assertEqual(view.get_usage(), [5, 6, 7])
+        self.assertEqual(view.get_timesheet(), {0: [False, False, True], 1: [True, True, False]})
+
+    def test_encoder_serializes_view(self):
+        view = self.fleet.get_vm(0)
+        view.set_profile("low")
+        data = json.loads(json.dumps(view, cls=VmModelEncoder))
+        self.assertEqual(data["cpu"], 2)
+        self.assertEqual(data["name"], "vm0")
+        self.assertEqual(data["profile"], "low")
+        self.assertNotIn("fleet", data)
@@ -0,0 +1,92 @@
+"""Tests for generator.workloadbuilder (WorkloadBuilder)."""
+import os
+import tempfile
+import unittest
+import numpy as np
+from generator.vmmodel import VmModel
+from generator.vmfleet import VmFleet
+from generator.workloadbuilder import WorkloadBuilder
+
+WORKLOAD_YAML = """
+vm_workloads:
+  acronyms:
+    §folder: "bash-tools"
+  workloads:
+    idle:
+      constraint:
+        freq: 0.5
+        profile:
+          - low
+      command: "sleep §time"
+    big:
+      constraint:
+        freq: 0.25
+        mem:
+          min: 8
+      command: "big §target"
+    any:
+      constraint:
+        freq: 0.25
+      command: "any §target"
+"""
+
+
+class TestWorkloadBuilderAttribution(unittest.TestCase):
+    """Tests for mask based workload attribution."""
+
+    def setUp(self):
+        VmModel.vm_count = 0
+        np.random.seed(0)
+        with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False, encoding="utf-8") as f:
+            f.write(WORKLOAD_YAML)
+            self.yaml_path = f.name
+        self.builder = WorkloadBuilder(yaml_file=self.yaml_path, slice_duration=3600)
+
+    def tearDown(self):
+        os.unlink(self.yaml_path)
+
+    def _make_fleet(self, count):
+        fleet = VmFleet(cpu=[1] * count, mem=[4, 16] * (count // 2))
+        for index, vm in enumerate(fleet):
+            vm.set_profile("low" if index % 4 < 2 else "high")
+        return fleet
+
+    def _attribute(self, vm_list):
+        self.builder._WorkloadBuilder__attribute_workloads_to_vm_list(vm_list)
+
+    def test_every_vm_receives_a_conform_workload(self):
+        fleet = self._make_fleet(400)
+        self._attribute(fleet)
+        for vm in fleet:
+            self.assertIsNotNone(vm.get_workload())
+            self.assertTrue(self.builder.workloads[vm.get_workload()].does_vm_verify_constraints(vm))
+
+    def test_frequencies_are_respected(self):
+        fleet = self._make_fleet(400)
+        self._attribute(fleet)
+        names, counts = np.unique([vm.get_workload() for vm in fleet], return_counts=True)
+        self.assertEqual(dict(zip(names, counts.tolist())), {"idle": 200, "big": 100, "any": 100})
+
+    def test_vm_list_is_supported(self):
+        vm_list = self._make_fleet(8).to_vm_list()
+        self._attribute(vm_list)
+        self.assertTrue(all(vm.get_workload() is not None for vm in vm_list))
+
+    def test_unconstrained_leftovers_do_not_loop(self):
+        fleet = VmFleet(cpu=[1, 1], mem=[1, 1])
+        for vm in fleet:
+            vm.set_profile("high")
+        self.builder.workloads.pop("any")
+        self._attribute(fleet)
+        self.assertEqual([vm.get_workload() for vm in fleet], [None, None])
+
+    def test_generate_workload_commands_for_attributed_fleet(self):
+        fleet = VmFleet(cpu=[1, 1], mem=[1, 1])
+        fleet.set_temporality(slices_per_scope=2, number_of_scope=1)
+        fleet.get_vm(0).set_usage([10, 20])
+        fleet.get_vm(1).set_usage([30, 40])
+        fleet.get_vm(0).set_workload("idle")
+        fleet.get_vm(1).set_workload("any")
+        self.builder.generate_workload_commands(fleet, lazy=True)
+        self.assertEqual(list(fleet.get_vm(0).get_commands_list()), ["sleep 3600", "sleep 3600"])
+        self.assertEqual(list(fleet.get_vm(1).get_commands_list()), ["any 30", "any 40"])
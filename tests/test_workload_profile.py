@@ -1,4 +1,5 @@
 """Tests for generator.workloadprofile (WorkloadProfile)."""
+import pickle
 import unittest
 from generator.vmmodel import VmModel
 from generator.workloadprofile import WorkloadProfile
@@ -51,3 +52,64 @@ class TestWorkloadProfile(unittest.TestCase):
     def test_get_freq(self):
         profile = self._make_profile({"freq": 0.33})
         self.assertEqual(profile.get_freq(), 0.33)
+
+    def test_get_constraint_mask_fleet_matches_vm_test(self):
+        from generator.vmfleet import VmFleet
+        profile = self._make_profile({"freq": 0.2, "profile": ["low"], "mem": {"min": 2}, "cpu": {"max": 4}})
+        fleet = VmFleet(cpu=[2, 2, 8, 1], mem=[4, 1, 16, 2])
+        for vm, usage_profile in zip(fleet, ["low", "low", "low", "high"]):
+            vm.set_profile(usage_profile)
+        expected = [profile.does_vm_verify_constraints(vm) for vm in fleet]
+        self.assertEqual(profile.get_constraint_mask(fleet).tolist(), expected)
+        self.assertEqual(profile.get_constraint_mask(fleet.to_vm_list()).tolist(), expected)
+        self.assertEqual(expected, [True, False, False, False])
+
+    def test_get_command_interprets_standard_and_custom_acronyms(self):
+        profile = self._make_profile({"freq": 0.2}, command="run §name §time §cpu §mem §value",
+                                     acronyms={"§value": "math.ceil(§target/10) + §cpu"})
+        self.assertEqual(profile.get_command(2, 1.75, 42), "run §name 3600 2 1.75 7")
+
+    def test_get_command_is_memoized(self):
+        profile = self._make_profile({"freq": 0.2}, command="stress -l §target")
+        command = profile.get_command(1, 1, 50)
+        self.assertIs(profile.get_command(1, 1, 50), command)
+        self.assertEqual(len(profile.command_cache), 1)
+
+    def test_set_slice_duration_drops_memoized_commands(self):
+        profile = self._make_profile({"freq": 0.2}, command="sleep §time")
+        self.assertEqual(profile.get_command(1, 1, 50), "sleep 3600")
+        profile.set_slice_duration(600)
+        self.assertEqual(profile.get_command(1, 1, 50), "sleep 600")
+
+    def test_pickled_profile_compiles_acronyms_again(self):
+        profile = self._make_profile({"freq": 0.2}, command="run §value", acronyms={"§value": "§target*2"})
+        profile.get_command(1, 1, 21)
+        copy = pickle.loads(pickle.dumps(profile))
+        self.assertEqual(copy.command_cache, profile.command_cache)
+        self.assertEqual(copy.get_command(1, 1, 10), "run 20")
+
+    def test_generate_and_apply_worload_commands_on_fleet(self):
+        from generator.vmfleet import VmFleet
+        profile = self._make_profile({"freq": 0.2}, command="stress -c §cpu -l §target")
+        fleet = VmFleet(cpu=[2, 4], mem=[1, 1])
+        fleet.set_temporality(slices_per_scope=2, number_of_scope=1)
+        fleet.usage[:] = [[10, 20], [30, 40]]
+        fleet.get_vm(0).set_workload("test")
+        fleet.get_vm(1).set_workload("other")
+        profile.generate_and_apply_worload_commands(fleet)
+        self.assertEqual(fleet.get_vm(0).get_commands_list(), ["stress -c 2 -l 10", "stress -c 2 -l 20"])
+        self.assertEqual(fleet.get_vm(1).get_commands_list(), [])
+
+    def test_generate_and_apply_worload_commands_lazy(self):
+        from generator.lazycommands import LazyCommands
+        profile = self._make_profile({"freq": 0.2}, command="stress -l §target")
+        vm = VmModel(cpu=1, mem=1)
+        vm.set_workload("test")
+        vm.set_usage([10, 20])
+        profile.generate_and_apply_worload_commands([vm], lazy=True)
+        commands = vm.get_commands_list()
+        self.assertIsInstance(commands, LazyCommands)
+        self.assertEqual(len(commands), 2)
+        self.assertEqual(list(commands), ["stress -l 10", "stress -l 20"])
+        vm.set_usage([30])
+        self.assertEqual(list(commands), ["stress -l 30"])